@@ -0,0 +1,70 @@
+import sys
+import json
+import argparse
+
+# Compara dois resultados de bench/run.py e aponta regressões:
+#   python bench/compare.py bench/results/antes.json bench/results/depois.json --threshold 10
+# Sai com código 1 se algum cenário piorou mais que o limite (útil em scripts/CI).
+# (campo, maior é melhor?)
+FIELDS = (
+    ("throughput", True),
+    ("latency_ms.p50", False),
+    ("latency_ms.p95", False),
+    ("latency_ms.p99", False),
+    ("cpu_ms_per_op", False),
+)
+
+
+def _get(result, field):
+    value = result
+    for part in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def compare(base, new, threshold=10.0, min_ms=0.05):
+    # [(cenário, campo, antes, depois, variação %, regressão?)]
+    rows = []
+    for name, before in base.get("scenarios", {}).items():
+        after = new.get("scenarios", {}).get(name)
+        if after is None or "skipped" in before or "skipped" in after:
+            continue
+        for field, higher_is_better in FIELDS:
+            old, cur = _get(before, field), _get(after, field)
+            if not old or cur is None:
+                continue
+            change = (cur - old) / old * 100
+            worse = -change if higher_is_better else change
+            # Diferenças abaixo de min_ms em latência/CPU são ruído de medição
+            noise = not higher_is_better and abs(cur - old) < min_ms
+            rows.append((name, field, old, cur, change, worse > threshold and not noise))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara dois resultados do benchmark.")
+    parser.add_argument("base", help="resultado de referência (JSON)")
+    parser.add_argument("new", help="resultado novo (JSON)")
+    parser.add_argument("--threshold", type=float, default=10.0, help="piora máxima aceita, em %%")
+    parser.add_argument("--min-ms", type=float, default=0.05, help="ignora diferenças menores que isso (ms)")
+    args = parser.parse_args(argv)
+    with open(args.base, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, "r", encoding="utf-8") as f:
+        new = json.load(f)
+    if base.get("meta", {}).get("args") != new.get("meta", {}).get("args"):
+        print("Aviso: as execuções usaram parâmetros diferentes.", file=sys.stderr)
+    rows = compare(base, new, args.threshold, args.min_ms)
+    regressions = 0
+    for name, field, old, cur, change, regressed in rows:
+        regressions += regressed
+        mark = "  <-- regressão" if regressed else ""
+        print(f"{name:<30} {field:<16} {old:>12.3f} -> {cur:>12.3f}  {change:>+7.1f}%{mark}")
+    print(f"\n{regressions} regressão(ões) acima de {args.threshold:g}%", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import sys
+import json
+from pathlib import Path
+
+# Corpus fixo de "capturas de tela" para o benchmark de OCR: cada fixture é um PNG com o texto
+# esperado ao lado (<nome>.txt). As sintéticas abaixo são geradas uma vez com
+# `python bench/fixtures.py` e versionadas; capturas reais podem ser acrescentadas na mesma pasta
+# (PNG + .txt com a transcrição) e entram no benchmark automaticamente.
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "ocr"
+
+# nome -> (texto, tamanho da fonte, cor do texto, cor do fundo, rotação em graus)
+SYNTHETIC = {
+    "dialog_light": ("The file could not be saved because the disk is full.", 18, (20, 20, 20), (245, 245, 245), 0),
+    "dialog_dark": ("Connection lost. Trying to reconnect in 5 seconds...", 18, (230, 230, 230), (32, 33, 36), 0),
+    "menu_small": ("File  Edit  View  Window  Help", 11, (0, 0, 0), (240, 240, 240), 0),
+    "subtitle": ("I never thought we would make it this far.", 26, (255, 255, 255), (10, 10, 10), 0),
+    "paragraph": ("Your order has been shipped and should arrive within three business days.\n"
+                  "You can track the package at any time from your account page.\n"
+                  "If anything is missing, reply to this message.", 16, (30, 30, 30), (255, 255, 255), 0),
+    "skewed": ("Press the button below to continue the installation.", 20, (0, 0, 0), (255, 255, 255), 2.5),
+    "chat": ("anna: are we still meeting tomorrow at 10?\nmark: yes, see you at the office", 15, (220, 220, 220),
+             (54, 57, 63), 0),
+}
+
+
+def _font(size):
+    from PIL import ImageFont
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1: só a fonte bitmap fixa
+        return ImageFont.load_default()
+
+
+def render(text, size, fg, bg, angle=0.0, margin=16):
+    from PIL import Image, ImageDraw
+    font = _font(size)
+    probe = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+    left, top, right, bottom = probe.multiline_textbbox((0, 0), text, font=font, spacing=size // 3)
+    image = Image.new("RGB", (right - left + 2 * margin, bottom - top + 2 * margin), bg)
+    ImageDraw.Draw(image).multiline_text((margin - left, margin - top), text, font=font, fill=fg, spacing=size // 3)
+    if angle:
+        image = image.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=bg)
+    return image
+
+
+def generate(directory=FIXTURES_DIR, overwrite=False):
+    directory.mkdir(parents=True, exist_ok=True)
+    written = []
+    for name, (text, size, fg, bg, angle) in SYNTHETIC.items():
+        png = directory / f"{name}.png"
+        if png.exists() and not overwrite:
+            continue
+        render(text, size, fg, bg, angle).save(png, optimize=True)
+        (directory / f"{name}.txt").write_text(text + "\n", encoding="utf-8")
+        written.append(png.name)
+    return written
+
+
+def load(directory=FIXTURES_DIR):
+    # [(nome, array uint8 2D em tons de cinza, texto esperado)]; vazio sem Pillow/NumPy
+    try:
+        import numpy as np
+        from PIL import Image
+    except ImportError:
+        return []
+    fixtures = []
+    for png in sorted(directory.glob("*.png")):
+        truth = png.with_suffix(".txt")
+        if not truth.exists():
+            continue
+        with Image.open(png) as image:
+            gray = np.asarray(image.convert("L"))
+        fixtures.append((png.stem, gray, truth.read_text(encoding="utf-8").strip()))
+    return fixtures
+
+
+def char_error_rate(expected, got):
+    # Distância de edição (Levenshtein) por caractere, ignorando diferenças de espaço em branco
+    a, b = " ".join(expected.split()), " ".join((got or "").split())
+    if not a:
+        return 0.0 if not b else 1.0
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1] / len(a)
+
+
+if __name__ == "__main__":
+    print(json.dumps(generate(overwrite="--overwrite" in sys.argv)))
@@ -0,0 +1,160 @@
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Servidor falso dos provedores para o benchmark: responde como o Google Cloud Translate v2,
+# o Azure Translator (/translate) e o LibreTranslate, sem rede e com latência, jitter e erros
+# injetados de forma reprodutível (semente fixa). A "tradução" é o texto com o idioma de destino
+# na frente, suficiente para exercitar o caminho completo (requisição, lote, parse, cache).
+#   Google Cloud: http://127.0.0.1:<porta>/google/language/translate/v2  (GOOGLE_TRANSLATE_ENDPOINT)
+#   Azure:        http://127.0.0.1:<porta>/azure/translate               (AZURE_TRANSLATOR_ENDPOINT)
+#   Libre:        http://127.0.0.1:<porta>/libre                         (LIBRE_TRANSLATE_URL)
+PROVIDERS = ("google", "azure", "libre")
+
+
+def endpoints(port, host="127.0.0.1"):
+    base = f"http://{host}:{port}"
+    return {
+        "GOOGLE_TRANSLATE_ENDPOINT": f"{base}/google/language/translate/v2",
+        "AZURE_TRANSLATOR_ENDPOINT": f"{base}/azure/translate",
+        "LIBRE_TRANSLATE_URL": f"{base}/libre",
+    }
+
+
+def fake_translate(text, target):
+    return f"[{target}] {text}"
+
+
+class Faults:
+    # Latência ~ normal(latency, jitter) em ms, erro 500 e 429 com as probabilidades dadas
+    def __init__(self, latency=50.0, jitter=10.0, error_rate=0.0, throttle_rate=0.0, seed=1):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts = {name: {"requests": 0, "items": 0, "errors": 0, "throttled": 0} for name in PROVIDERS}
+
+    def draw(self, provider, items):
+        with self._lock:
+            delay = max(0.0, self._rng.gauss(self.latency, self.jitter)) / 1000.0
+            roll = self._rng.random()
+            counts = self.counts[provider]
+            counts["requests"] += 1
+            counts["items"] += items
+            if roll < self.throttle_rate:
+                counts["throttled"] += 1
+                return delay, 429
+            if roll < self.throttle_rate + self.error_rate:
+                counts["errors"] += 1
+                return delay, 500
+            return delay, 200
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Cabeçalho e corpo num só envio: com keep-alive, dois envios pequenos esbarram em Nagle + ACK atrasado (~40 ms)
+    wbufsize = 64 * 1024
+    faults = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        return self.rfile.read(length).decode("utf-8") if length else ""
+
+    def _form_or_json(self, body):
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            return json.loads(body or "{}")
+        return {k: v if len(v) > 1 else v[0] for k, v in parse_qs(body).items()}
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._reply(200, {"ok": True})
+        elif self.path == "/stats":
+            self._reply(200, self.faults.counts)
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = self._body()
+        if url.path == "/google/language/translate/v2":
+            form = parse_qs(body)
+            texts, target = form.get("q", []), form.get("target", ["pt"])[0]
+            provider = "google"
+            payload = {"data": {"translations": [
+                {"translatedText": fake_translate(t, target), "detectedSourceLanguage": "en"} for t in texts]}}
+        elif url.path == "/azure/translate":
+            texts = [item.get("text", "") for item in json.loads(body or "[]")]
+            # Vários destinos: "to" repetido na query, uma tradução por destino em cada item
+            targets = parse_qs(url.query).get("to", ["pt"])
+            provider = "azure"
+            payload = [{"detectedLanguage": {"language": "en", "score": 1.0},
+                        "translations": [{"text": fake_translate(t, target), "to": target} for target in targets]}
+                       for t in texts]
+        elif url.path == "/libre/translate":
+            form = self._form_or_json(body)
+            texts, target = [form.get("q", "")], form.get("target", "pt")
+            provider = "libre"
+            payload = {"translatedText": fake_translate(texts[0], target)}
+        else:
+            self._reply(404, {"error": "not found"})
+            return
+        delay, status = self.faults.draw(provider, len(texts))
+        time.sleep(delay)
+        if status == 429:
+            self._reply(429, {"error": "too many requests"}, {"Retry-After": "1"})
+        elif status != 200:
+            self._reply(status, {"error": "injected failure"})
+        else:
+            self._reply(200, payload)
+
+
+def make_server(port=0, host="127.0.0.1", **faults):
+    handler = type("Handler", (_Handler,), {"faults": Faults(**faults)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor falso de tradução para o benchmark.")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--latency", type=float, default=50.0, help="latência média em ms")
+    parser.add_argument("--jitter", type=float, default=10.0, help="desvio padrão da latência em ms")
+    parser.add_argument("--errors", type=float, default=0.0, help="fração de respostas 500")
+    parser.add_argument("--throttle", type=float, default=0.0, help="fração de respostas 429")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    server = make_server(args.port, latency=args.latency, jitter=args.jitter, error_rate=args.errors,
+                         throttle_rate=args.throttle, seed=args.seed)
+    print(json.dumps(endpoints(server.server_address[1])), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
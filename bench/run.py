@@ -0,0 +1,459 @@
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import tracemalloc
+from pathlib import Path
+from contextlib import contextmanager
+
+# Benchmark dos caminhos quentes, todo offline: traduções contra bench/mock_server.py (Google Cloud v2,
+# Azure e LibreTranslate falsos com latência/jitter/erros configuráveis), cache, identificação de idioma,
+# observador/pipeline do clipboard, pré-processamento e OCR das fixtures. Grava um JSON por execução
+# (vazão, p50/p95/p99, CPU, memória) para comparar com bench/compare.py.
+#   python bench/run.py                              # tudo, resultado em bench/results/<data>.json
+#   python bench/run.py -s translate_text batch -n 500 --latency 80 --jitter 30 --errors 0.02
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+RESULTS_DIR = BENCH_DIR / "results"
+sys.path.insert(0, str(ROOT))
+
+import fixtures  # noqa: E402  (bench/ já está no sys.path quando rodado como script)
+
+BACKENDS = ("google_cloud", "azure", "libre")
+LIMITED = ("google_web", "google_cloud", "azure", "libre")
+
+_WORDS = ("order shipped file saved window settings update network connection account message payment "
+          "download screen button user server error warning today tomorrow please check again the a "
+          "your our is was has been will not could should before after with from into").split()
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    def register(fn):
+        SCENARIOS[name] = fn
+        return fn
+    return register
+
+
+def sentence(rng, words=(6, 16)):
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(*words))).capitalize() + "."
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_mock(args):
+    # Processo separado: o servidor não disputa o GIL nem entra na conta de CPU do benchmark
+    port = _free_port()
+    cmd = [sys.executable, str(BENCH_DIR / "mock_server.py"), "--port", str(port), "--latency", str(args.latency),
+           "--jitter", str(args.jitter), "--errors", str(args.errors), "--throttle", str(args.throttle),
+           "--seed", str(args.seed)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    return proc, json.loads(proc.stdout.readline())
+
+
+def configure_env(endpoints, workdir, keep_limits=False):
+    # Precisa acontecer antes de importar os módulos translator_* (eles leem o ambiente na importação)
+    os.environ.update(endpoints)
+    os.environ.update({
+        "GOOGLE_TRANSLATE_KEY": "bench",
+        "AZURE_TRANSLATOR_KEY": "bench",
+        "AZURE_TRANSLATOR_REGION": "bench",
+        "TRANSLATOR_SERVICE": "0",
+        "TRANSLATOR_HISTORY": "0",
+        "TRANSLATOR_OFFLINE": "0",
+        "TRANSLATOR_CACHE_PATH": str(workdir / "cache.sqlite3"),
+        "TRANSLATOR_MEMORY_PATH": str(workdir / "memory.sqlite3"),
+        "TRANSLATOR_USAGE_PATH": str(workdir / "usage.json"),
+    })
+    if not keep_limits:
+        # Mede o código, não os limites de requisição do cliente
+        for name in LIMITED:
+            for kind in ("RATE", "CHARS", "QUOTA"):
+                os.environ[f"TRANSLATOR_{kind}_{name.upper()}"] = "0"
+
+
+def _rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2 ** 20
+    except ImportError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        return None
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def summarize(latencies):
+    import translator_metrics as metrics
+    histogram = metrics.Histogram(max(1, len(latencies)))
+    for value in latencies:
+        histogram.observe(value)
+    summary = histogram.summary()
+    summary.pop("sum", None)
+    return summary
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000
+
+
+class Context:
+    def __init__(self, args):
+        import translator_core as core
+        self.args = args
+        self.rng = random.Random(args.seed)
+        # Sem o Google web (scraping): o benchmark não pode sair para a rede
+        self.translator = core.Translator(core.Config.from_env(use_google_web=False, use_service=False))
+        self.registry = self.translator.registry()
+        self.window = None
+        self._seq = 0
+
+    @contextmanager
+    def measure(self):
+        # Cenários com preparação (aquecer cache, subir servidor) medem só o trecho dentro deste bloco
+        cpu, wall = time.process_time(), time.perf_counter()
+        try:
+            yield
+        finally:
+            self.window = (time.perf_counter() - wall, time.process_time() - cpu)
+
+    def texts(self, n, words=(6, 16)):
+        # Textos inéditos a cada chamada, para não acertar o cache sem querer
+        self._seq += 1
+        return [f"{sentence(self.rng, words)} #{self._seq}-{i}" for i in range(n)]
+
+
+def _translate_each(ctx, n, backend, use_cache=False):
+    latencies, errors = [], 0
+    for text in ctx.texts(n):
+        start = time.perf_counter()
+        try:
+            ctx.translator.translate(text, "pt", use_cache=use_cache, backend=backend)
+        except Exception:
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, errors, {}
+
+
+for _name in BACKENDS:
+    scenario(f"translate_text.{_name}")(lambda ctx, n, _backend=_name: _translate_each(ctx, n, _backend))
+
+
+@scenario("translate_text.failover")
+def bench_failover(ctx, n):
+    # Sem backend fixo: ordem por saúde, failover quando o servidor injeta erros
+    return _translate_each(ctx, n, None)
+
+
+@scenario("translate_text.cache_hit")
+def bench_cache_hit(ctx, n):
+    texts = ctx.texts(min(n, 200))
+    for text in texts:
+        ctx.translator.translate(text, "pt", backend="azure")
+    with ctx.measure():
+        latencies = [timed(ctx.translator.translate, texts[i % len(texts)], "pt", backend="azure")
+                     for i in range(n)]
+    return latencies, 0, {}
+
+
+@scenario("service.translate")
+def bench_service(ctx, n):
+    # Ida e volta UI -> serviço local (HTTP em 127.0.0.1) -> backend falso
+    import translator_service as service
+    from http.server import ThreadingHTTPServer
+    handler = type("Handler", (service._Handler,), {"service": service.TranslationService(ctx.registry),
+                                                    "token": service.service_token()})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        remote = service.RemoteBackend(f"http://127.0.0.1:{server.server_address[1]}")
+        latencies, errors = [], 0
+        texts = ctx.texts(n)
+        with ctx.measure():
+            for text in texts:
+                start = time.perf_counter()
+                try:
+                    remote.translate(text, "pt")
+                except Exception:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return latencies, errors, {}
+
+
+@scenario("async.concurrent")
+def bench_async(ctx, n):
+    # n traduções enviadas de uma vez ao motor assíncrono (limite TRANSLATOR_MAX_CONCURRENCY)
+    engine = ctx.translator.engine()
+    done = threading.Event()
+    latencies, errors, pending = [], [0], [n]
+    lock = threading.Lock()
+
+    def submit(text):
+        start = time.perf_counter()
+
+        def on_done(result, error):
+            with lock:
+                if error is None:
+                    latencies.append((time.perf_counter() - start) * 1000)
+                else:
+                    errors[0] += 1
+                pending[0] -= 1
+                if pending[0] == 0:
+                    done.set()
+
+        engine.submit(lambda: engine.translate(text, "pt", backend="azure", use_cache=False), on_done=on_done)
+
+    if n == 0:
+        return [], 0, {}
+    for text in ctx.texts(n):
+        submit(text)
+    done.wait(600)
+    return latencies, errors[0], {"concurrency": engine.max_concurrency}
+
+
+def _batch(ctx, n, backend):
+    # n documentos de 20 parágrafos; latência por documento
+    import translator_batch as batch
+    latencies, errors = [], 0
+    for _ in range(n):
+        document = "\n\n".join(ctx.texts(20, (10, 30)))
+        start = time.perf_counter()
+        try:
+            batch.translate_many([document], "pt", ctx.registry, None, backend=backend)
+        except Exception:
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, errors, {"paragraphs": 20}
+
+
+for _name in BACKENDS:
+    scenario(f"batch.{_name}")(lambda ctx, n, _backend=_name: _batch(ctx, max(1, n // 10), _backend))
+
+
+@scenario("langid.detect")
+def bench_langid(ctx, n):
+    import translator_langid as langid
+    texts = ctx.texts(n)
+    with ctx.measure():
+        latencies = [timed(langid.detect, text) for text in texts]
+    return latencies, 0, {}
+
+
+@scenario("clipboard.check")
+def bench_clipboard_check(ctx, n):
+    # Leitura + hash + disparo do observador, com textos curtos e um grande (20k caracteres)
+    from translator_clipwatch import ClipboardWatcher
+    texts = ctx.texts(n)
+    big = " ".join(ctx.texts(600))[:20000]
+    texts = [big + str(i) if i % 10 == 0 else text for i, text in enumerate(texts)]
+    current = [""]
+    watcher = ClipboardWatcher(lambda text: None, read=lambda: current[0])
+    latencies = []
+    for text in texts:
+        current[0] = text
+        latencies.append(timed(watcher.check))
+    return latencies, 0, {}
+
+
+@scenario("clipboard.pipeline")
+def bench_clipboard_pipeline(ctx, n):
+    # submit -> filtros (URL/número/código/idioma) -> handler, sem debounce
+    from translator_pipeline import ClipboardPipeline
+    arrived = threading.Event()
+    pipeline = ClipboardPipeline(lambda text: arrived.set(), target_lang=lambda: "pt", on_skip=lambda t, r: arrived.set(),
+                                 debounce=0.0)
+    pipeline.start()
+    latencies = []
+    for text in ctx.texts(n):
+        arrived.clear()
+        start = time.perf_counter()
+        pipeline.submit(text)
+        arrived.wait(5)
+        latencies.append((time.perf_counter() - start) * 1000)
+    pipeline.stop()
+    return latencies, 0, pipeline.stats()
+
+
+def _load_fixtures():
+    loaded = fixtures.load()
+    if not loaded:
+        raise RuntimeError("sem fixtures (requer Pillow e NumPy)")
+    return loaded
+
+
+@scenario("ocr.prepare")
+def bench_ocr_prepare(ctx, n):
+    from translator_capture import prepare
+    loaded = _load_fixtures()
+    with ctx.measure():
+        latencies = [timed(prepare, loaded[i % len(loaded)][1]) for i in range(n)]
+    return latencies, 0, {"fixtures": len(loaded)}
+
+
+@scenario("ocr.tesseract")
+def bench_ocr(ctx, n):
+    # Pré-processamento + OCR em cada fixture; CER = taxa de erro por caractere contra o texto esperado
+    from translator_capture import prepare
+    from translator_ocr import get_ocr_engine
+    loaded = _load_fixtures()
+    engine = get_ocr_engine()
+    engine.warm()
+    latencies, errors, texts = [], 0, {}
+    with ctx.measure():
+        for i in range(max(n // 10, len(loaded))):
+            name, gray, truth = loaded[i % len(loaded)]
+            start = time.perf_counter()
+            try:
+                image, _ = prepare(gray)
+                texts[name] = engine.image_to_string(image)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+    cer = {name: round(fixtures.char_error_rate(truth, texts[name]), 4) for name, _, truth in loaded if name in texts}
+    return latencies, errors, {"engine": engine.kind, "cer": cer,
+                               "mean_cer": round(sum(cer.values()) / len(cer), 4) if cer else None}
+
+
+def run_scenario(name, ctx, args):
+    fn = SCENARIOS[name]
+    if args.warmup:
+        fn(ctx, args.warmup)
+    if args.tracemalloc:
+        tracemalloc.start()
+    ctx.window = None
+    cpu, wall = time.process_time(), time.perf_counter()
+    latencies, errors, extra = fn(ctx, args.requests)
+    wall, cpu = ctx.window or (time.perf_counter() - wall, time.process_time() - cpu)
+    result = {
+        "ops": len(latencies),
+        "errors": errors,
+        "wall_s": round(wall, 4),
+        "throughput": round(len(latencies) / wall, 2) if wall else None,
+        "cpu_s": round(cpu, 4),
+        "cpu_ms_per_op": round(cpu * 1000 / len(latencies), 4) if latencies else None,
+        "latency_ms": summarize(latencies),
+        "rss_mb": round(_rss_mb(), 1) if _rss_mb() is not None else None,
+    }
+    if args.tracemalloc:
+        result["peak_alloc_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+    if extra:
+        result["extra"] = extra
+    return result
+
+
+def selected(patterns):
+    if not patterns:
+        return list(SCENARIOS)
+    return [name for name in SCENARIOS if any(name == p or name.startswith(p + ".") for p in patterns)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark offline do tradutor.")
+    parser.add_argument("-s", "--scenarios", nargs="*", help="cenários ou prefixos (ex.: translate_text batch ocr)")
+    parser.add_argument("-n", "--requests", type=int, default=200, help="operações por cenário")
+    parser.add_argument("--warmup", type=int, default=5, help="operações descartadas antes de medir")
+    parser.add_argument("--latency", type=float, default=50.0, help="latência média do servidor falso (ms)")
+    parser.add_argument("--jitter", type=float, default=10.0, help="desvio padrão da latência (ms)")
+    parser.add_argument("--errors", type=float, default=0.0, help="fração de respostas 500")
+    parser.add_argument("--throttle", type=float, default=0.0, help="fração de respostas 429")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep-limits", action="store_true", help="mantém os limites de requisição dos backends")
+    parser.add_argument("--tracemalloc", action="store_true", help="mede o pico de alocação (deixa tudo mais lento)")
+    parser.add_argument("-o", "--output", help="arquivo JSON de saída (padrão: bench/results/<data>.json)")
+    parser.add_argument("--list", action="store_true", help="lista os cenários e sai")
+    args = parser.parse_args(argv)
+    if args.list:
+        print("\n".join(SCENARIOS))
+        return 0
+    names = selected(args.scenarios)
+    if not names:
+        print("Nenhum cenário corresponde.", file=sys.stderr)
+        return 2
+
+    proc, endpoints = start_mock(args)
+    try:
+        with tempfile.TemporaryDirectory(prefix="translator-bench-") as workdir:
+            configure_env(endpoints, Path(workdir), args.keep_limits)
+            ctx = Context(args)
+            results = {}
+            for name in names:
+                try:
+                    results[name] = run_scenario(name, ctx, args)
+                except Exception as e:
+                    results[name] = {"skipped": f"{type(e).__name__}: {e}"}
+                shown = results[name]
+                if "skipped" in shown:
+                    print(f"{name:<30} pulado ({shown['skipped']})", file=sys.stderr)
+                else:
+                    lat = shown["latency_ms"]
+                    print(f"{name:<30} {shown['throughput'] or 0:>9.1f} op/s  p50 {lat['p50']:>8.3f}  p95 {lat['p95']:>8.3f}"
+                          f"  p99 {lat['p99']:>8.3f} ms  erros {shown['errors']}", file=sys.stderr)
+            ctx.translator.shutdown()
+            import translator_cache
+            cache = translator_cache.get_cache()
+            if cache is not None:
+                cache.close()
+        try:
+            import requests
+            server_stats = requests.get(endpoints["LIBRE_TRANSLATE_URL"].rsplit("/", 1)[0] + "/stats", timeout=2).json()
+        except Exception:
+            server_stats = None
+    finally:
+        proc.terminate()
+        proc.wait(5)
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "list")},
+        },
+        "server": server_stats,
+        "scenarios": results,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Resultado: {output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
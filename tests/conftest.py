@@ -0,0 +1,11 @@
+import pytest
+
+import translator_memory
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    # Arquivos de uso/cache/token relativos caem num diretório temporário; memória de tradução
+    # global desligada (os testes dela criam a própria instância)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(translator_memory, "MEMORY_ENABLED", False)
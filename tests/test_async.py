@@ -0,0 +1,41 @@
+import threading
+
+import translator_backends as backends
+from translator_async import AsyncTranslator
+from translator_cache import TranslationCache
+
+
+class ThreadRecordingCache(TranslationCache):
+    def __init__(self):
+        super().__init__(path=None)
+        self.threads = []
+
+    def get(self, *args):
+        self.threads.append(threading.current_thread())
+        return super().get(*args)
+
+    def put(self, *args):
+        self.threads.append(threading.current_thread())
+        return super().put(*args)
+
+
+class EchoBackend(backends.Backend):
+    name = "google_web"
+
+    def translate(self, text, target_lang, source_lang="auto"):
+        return text.upper(), "en"
+
+
+def test_cache_runs_off_the_event_loop_thread():
+    registry = backends.BackendRegistry()
+    registry.register(EchoBackend())
+    cache = ThreadRecordingCache()
+    engine = AsyncTranslator(registry, cache).start()
+    try:
+        first = engine.submit(lambda: engine.translate("Guten Morgen zusammen", "pt")).result(timeout=5)
+        second = engine.submit(lambda: engine.translate("Guten Morgen zusammen", "pt")).result(timeout=5)
+    finally:
+        engine.shutdown()
+    assert first == second == ("GUTEN MORGEN ZUSAMMEN", "en")
+    assert len(cache.threads) == 3  # get, put, get (acerto)
+    assert all(t is not engine._thread for t in cache.threads)
@@ -0,0 +1,36 @@
+import sys
+import types
+import threading
+
+import translator_backends as backends
+
+
+def fake_deep_translator(monkeypatch):
+    class GoogleTranslator:
+        def __init__(self, source, target):
+            self.source = source
+            self.target = target
+
+    module = types.ModuleType("deep_translator")
+    module.GoogleTranslator = GoogleTranslator
+    monkeypatch.setitem(sys.modules, "deep_translator", module)
+
+
+def test_google_web_client_is_reused_within_a_thread(monkeypatch):
+    fake_deep_translator(monkeypatch)
+    monkeypatch.setattr(backends, "_google_web_local", threading.local())
+    assert backends._google_web_client("auto", "pt") is backends._google_web_client("auto", "pt")
+    assert backends._google_web_client("auto", "pt") is not backends._google_web_client("auto", "en")
+
+
+def test_google_web_client_is_not_shared_between_threads(monkeypatch):
+    fake_deep_translator(monkeypatch)
+    monkeypatch.setattr(backends, "_google_web_local", threading.local())
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(backends._google_web_client("auto", "pt")))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(c) for c in clients}) == 4
@@ -0,0 +1,87 @@
+import threading
+
+import translator_backends as backends
+import translator_batch as batch
+from translator_backends import pack_batches
+from translator_cache import TranslationCache
+
+
+class EchoBackend(backends.Backend):
+    name = "libre"
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def translate(self, text, target_lang, source_lang="auto"):
+        with self.lock:
+            self.calls.append((text, target_lang))
+        return f"{target_lang}:{text}", "en"
+
+
+class MultiBackend(EchoBackend):
+    name = "azure"
+    multi_target = True
+
+    def translate_targets(self, text, target_langs, source_lang="auto"):
+        with self.lock:
+            self.calls.append((text, tuple(target_langs)))
+        return {t: f"{t}:{text}" for t in target_langs}, "en"
+
+
+def registry_with(backend):
+    registry = backends.BackendRegistry()
+    registry.register(backend)
+    return registry
+
+
+def test_pack_batches_respects_item_and_char_limits():
+    assert pack_batches(["a", "b", "c"], 2, 100) == [["a", "b"], ["c"]]
+    assert pack_batches(["aaaa", "bbbb", "cc"], 10, 8) == [["aaaa", "bbbb"], ["cc"]]
+    # Um item maior que o limite vai sozinho, sem ser descartado
+    assert pack_batches(["x" * 20, "y"], 10, 8) == [["x" * 20], ["y"]]
+    assert pack_batches([], 10, 8) == []
+
+
+def test_split_segments_keeps_paragraph_separators():
+    text = "First paragraph.\n\nSecond one. It has two sentences."
+    assert batch.split_segments(text, 1000) == [("First paragraph.", "\n\n"),
+                                                ("Second one. It has two sentences.", "")]
+    assert [s for s, _ in batch.split_segments(text, 20)] == ["First paragraph.", "Second one.",
+                                                              "It has two", "sentences."]
+
+
+def test_translate_many_dedupes_and_keeps_order():
+    backend = EchoBackend()
+    results = batch.translate_many(["Good morning everyone", "", "Good morning everyone"], "pt",
+                                   registry_with(backend), max_workers=1)
+    assert results == [("pt:Good morning everyone", "en"), None, ("pt:Good morning everyone", "en")]
+    assert len(backend.calls) == 1
+
+
+def test_iter_segments_matches_split_segments():
+    text = "First paragraph.\n\nSecond one. It has two sentences.\n\n\nThird."
+    for max_chars in (20, 1000):
+        assert list(batch.iter_segments(text, max_chars)) == batch.split_segments(text, max_chars)
+
+
+def test_translate_targets_single_request_on_multi_backend():
+    backend = MultiBackend()
+    seen = []
+    results = batch.translate_targets("Good morning everyone, how are you?", ["pt", "es", "pt", "de"],
+                                      registry_with(backend), on_result=lambda t, r: seen.append(t))
+    assert results == {t: (f"{t}:Good morning everyone, how are you?", "en") for t in ("pt", "es", "de")}
+    assert backend.calls == [("Good morning everyone, how are you?", ("pt", "es", "de"))]
+    assert sorted(seen) == ["de", "es", "pt"]
+
+
+def test_translate_targets_skips_source_language_and_uses_cache():
+    backend = EchoBackend()
+    cache = TranslationCache(path=None)
+    text = "Hello, how are you doing today? I hope everything is fine."
+    cache.put(text, "auto", "es", "auto", "cached", "en")
+    results = batch.translate_targets(text, ["en", "es", "pt"], registry_with(backend), cache)
+    assert results["en"] == (text, "en")
+    assert results["es"] == ("cached", "en")
+    assert results["pt"] == (f"pt:{text}", "en")
+    assert backend.calls == [(text, "pt")]
@@ -0,0 +1,43 @@
+from translator_cache import TranslationCache, make_key, normalize_text
+
+
+def test_normalize_text_collapses_spaces_but_keeps_lines():
+    assert normalize_text("  Hello   world \r\n second\tline ") == "Hello world\nsecond line"
+    assert make_key("Hello  world", "auto", "pt", "azure") == make_key("Hello world ", "auto", "pt", "azure")
+    assert make_key("Hello", "auto", "pt", "azure") != make_key("Hello", "auto", "es", "azure")
+
+
+def test_memory_lru_evicts_least_recently_used():
+    cache = TranslationCache(path=None, max_items=2)
+    cache.put("a", "auto", "pt", "x", "A")
+    cache.put("b", "auto", "pt", "x", "B")
+    assert cache.get("a", "auto", "pt", "x") == ("A", "")
+    cache.put("c", "auto", "pt", "x", "C")
+    assert cache.get("b", "auto", "pt", "x") is None
+    assert cache.get("a", "auto", "pt", "x") == ("A", "")
+    assert cache.get("c", "auto", "pt", "x") == ("C", "")
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    import translator_cache
+    now = [1000.0]
+    monkeypatch.setattr(translator_cache.time, "time", lambda: now[0])
+    cache = TranslationCache(path=None, ttl=60)
+    cache.put("a", "auto", "pt", "x", "A", "en")
+    now[0] += 59
+    assert cache.get("a", "auto", "pt", "x") == ("A", "en")
+    now[0] += 2
+    assert cache.get("a", "auto", "pt", "x") is None
+
+
+def test_disk_level_survives_a_new_instance(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = TranslationCache(path=path)
+    cache.put("Hello", "auto", "pt", "azure", "Olá", "en")
+    cache.close()
+    cache = TranslationCache(path=path)
+    assert cache.get("Hello", "auto", "pt", "azure") == ("Olá", "en")
+    assert cache.hits_disk == 1
+    cache.invalidate("Hello", "auto", "pt", "azure")
+    assert cache.get("Hello", "auto", "pt", "azure") is None
+    cache.close()
@@ -0,0 +1,123 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import translator_cli as cli
+from translator_ratelimit import TokenBucket
+
+
+def make_args(**overrides):
+    values = dict(chunk=2, workers=1, target="pt", source="auto", backend=None, quiet=True)
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+def run_texts(texts, translate_many, checkpoint, monkeypatch):
+    monkeypatch.setattr(cli.batch, "translate_many", translate_many)
+    stats = cli.Stats()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        out = cli.translate_texts(texts, "job", make_args(), None, None, pool, TokenBucket(0), checkpoint, stats)
+    return out, stats
+
+
+def test_failed_texts_count_and_stay_out_of_checkpoint(tmp_path, monkeypatch):
+    path = tmp_path / "job.ckpt"
+
+    def flaky(chunk, *args, **kwargs):
+        return [None if t == "b" else (t.upper(), "en") for t in chunk]
+
+    checkpoint = cli.Checkpoint(path)
+    out, stats = run_texts(["a", "b", "c", "d"], flaky, checkpoint, monkeypatch)
+    checkpoint.close()
+    assert out == ["A", None, "C", "D"]
+    assert stats.failed == 1
+    assert stats.translated == 3
+
+    # Ao retomar, só o bloco com falha volta à rede
+    calls = []
+
+    def working(chunk, *args, **kwargs):
+        calls.append(list(chunk))
+        return [(t.upper(), "en") for t in chunk]
+
+    checkpoint = cli.Checkpoint(path)
+    out, stats = run_texts(["a", "b", "c", "d"], working, checkpoint, monkeypatch)
+    checkpoint.close()
+    assert out == ["A", "B", "C", "D"]
+    assert calls == [["a", "b"]]
+    assert stats.failed == 0
+    assert stats.resumed == 2
+
+
+def test_txt_round_trip_keeps_blank_lines():
+    texts, render = cli.read_txt("one\n\ntwo\n", None)
+    assert texts == ["one", "two"]
+    assert render(["um", None]) == "um\n\ntwo\n"
+
+
+PO = '''msgid ""
+msgstr ""
+"Content-Type: text/plain; charset=UTF-8\\n"
+
+#: app.py:1
+msgid "Hello"
+msgstr ""
+
+msgid "Line \\"one\\"\\n"
+"two"
+msgstr "kept"
+
+msgid "One file"
+msgid_plural "%d files"
+msgstr[0] ""
+msgstr[1] ""
+'''
+
+
+def test_po_round_trip_fills_empty_msgstr():
+    texts, render = cli.read_po(PO, argparse.Namespace(overwrite=False))
+    assert texts == ["Hello", "One file", "%d files"]
+    out = render(["Olá", "Um arquivo", None])
+    assert '#: app.py:1\nmsgid "Hello"\nmsgstr "Olá"' in out
+    assert 'msgstr "kept"' in out
+    assert 'msgstr[0] "Um arquivo"\nmsgstr[1] ""' in out
+    assert cli.parse_po(out)[0]["fields"][1][1] == "Content-Type: text/plain; charset=UTF-8\n"
+
+
+def test_po_overwrite_and_escapes():
+    texts, render = cli.read_po(PO, argparse.Namespace(overwrite=True))
+    assert 'Line "one"\ntwo' in texts
+    out = render([f"t{i}" if i != 1 else 'Linha "um"\ndois' for i in range(len(texts))])
+    assert 'msgstr "Linha \\"um\\"\\ndois"' in out
+
+
+SRT = """1
+00:00:01,000 --> 00:00:02,000
+Hello there.
+
+2
+00:00:03,000 --> 00:00:04,500
+Two lines
+of text.
+"""
+
+
+def test_srt_round_trip_keeps_timings():
+    texts, render = cli.read_srt(SRT, None)
+    assert texts == ["Hello there.", "Two lines\nof text."]
+    out = render(["Olá.", "Duas linhas\nde texto."])
+    assert out == SRT.replace("Hello there.", "Olá.").replace("Two lines\nof text.", "Duas linhas\nde texto.")
+    _, render = cli.read_srt(SRT, None)
+    assert render([None, None]) == SRT
+
+
+def test_failed_chunk_counts_each_non_empty_text(monkeypatch):
+    def broken(chunk, *args, **kwargs):
+        if "c" in chunk or "f" in chunk:
+            raise RuntimeError("backend fora do ar")
+        return [(t.upper(), "en") for t in chunk]
+
+    # Blocos de 2: [a, b] ok, [c, d] falha (2 textos), ["  ", f] falha (1 texto com conteúdo)
+    out, stats = run_texts(["a", "b", "c", "d", "  ", "f"], broken, cli.Checkpoint(None), monkeypatch)
+    assert out == ["A", "B", None, None, None, None]
+    assert stats.failed == 3
+    assert stats.translated == 2
@@ -0,0 +1,71 @@
+import sys
+import types
+import socket
+import threading
+
+import pytest
+
+import translator_clipwatch as clipwatch
+
+
+class FakeDisplay:
+    def __init__(self):
+        self.sock, self.peer = socket.socketpair()
+        self.closed = False
+        self.waiting = threading.Event()
+        self.extension_event = types.SimpleNamespace(SetSelectionOwnerNotify=99)
+
+    def has_extension(self, name):
+        return True
+
+    def xfixes_query_version(self):
+        pass
+
+    def screen(self):
+        return types.SimpleNamespace(root=object())
+
+    def intern_atom(self, name):
+        return name
+
+    def xfixes_select_selection_input(self, root, atom, mask):
+        pass
+
+    def pending_events(self):
+        self.waiting.set()
+        return 0
+
+    def next_event(self):
+        raise AssertionError("next_event() bloquearia sem evento pendente")
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def close(self):
+        self.closed = True
+        self.sock.close()
+        self.peer.close()
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="XFixes só no X11")
+def test_xfixes_watcher_stops_without_events(monkeypatch):
+    disp = FakeDisplay()
+    xlib = types.ModuleType("Xlib")
+    xlib.display = types.SimpleNamespace(Display=lambda: disp)
+    ext = types.ModuleType("Xlib.ext")
+    ext.xfixes = types.SimpleNamespace(XFixesSetSelectionOwnerNotifyMask=1)
+    monkeypatch.setitem(sys.modules, "Xlib", xlib)
+    monkeypatch.setitem(sys.modules, "Xlib.ext", ext)
+    monkeypatch.setattr(sys, "platform", "linux")
+    monkeypatch.setenv("DISPLAY", ":0")
+    monkeypatch.setattr(clipwatch, "STOP_CHECK", 0.05)
+
+    watcher = clipwatch.ClipboardWatcher(lambda text: None, read=lambda: "")
+    result = []
+    thread = threading.Thread(target=lambda: result.append(watcher._watch_xfixes()), daemon=True)
+    thread.start()
+    assert disp.waiting.wait(timeout=2)
+    watcher.stop()
+    thread.join(timeout=2)
+    assert not thread.is_alive()
+    assert result == [True]
+    assert disp.closed
@@ -0,0 +1,12 @@
+from translator_core import parse_targets
+
+
+def test_parse_targets_splits_and_dedupes():
+    assert parse_targets("pt, en es;fr") == ["pt", "en", "es", "fr"]
+    assert parse_targets("en,en , pt") == ["en", "pt"]
+
+
+def test_parse_targets_falls_back_to_default():
+    assert parse_targets("") == ["pt"]
+    assert parse_targets(None, "es") == ["es"]
+    assert parse_targets("auto") == ["pt"]
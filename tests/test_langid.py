@@ -0,0 +1,24 @@
+import translator_langid as langid
+
+
+def test_detects_english_confidently():
+    lang, confidence = langid.detect("Hello, how are you doing today? I hope everything is fine.")
+    assert lang == "en"
+    assert confidence >= langid.MIN_CONFIDENCE
+
+
+def test_detects_non_latin_scripts():
+    assert langid.detect("Привет, как дела?")[0] == "ru"
+
+
+def test_short_text_is_undetermined():
+    assert langid.detect("ok") == (None, 0.0)
+    assert langid.confident_language("ok") is None
+
+
+def test_route_uses_explicit_source_and_skips_same_language():
+    assert langid.route("qualquer coisa", "pt", source_lang="pt") == ("pt", "pt", True)
+    text = "Hello, how are you doing today? I hope everything is fine."
+    assert langid.route(text, "en") == ("en", "en", True)
+    assert langid.route(text, "pt") == ("en", "en", False)
+    assert langid.route("ok", "pt") == ("auto", "", False)
@@ -0,0 +1,39 @@
+from translator_layout import layout_from_tsv, parse_tsv
+
+HEADER = "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext"
+
+
+def row(level, block, par, line, word, left, top, width, height, conf, text):
+    return "\t".join(str(v) for v in (level, 1, block, par, line, word, left, top, width, height, conf, text))
+
+
+TSV = "\n".join([
+    HEADER,
+    row(4, 1, 1, 1, 0, 10, 10, 100, 20, -1, ""),
+    row(5, 1, 1, 1, 1, 10, 10, 40, 20, 95.5, "Hello"),
+    row(5, 1, 1, 1, 2, 60, 12, 50, 20, 91, "world"),
+    row(5, 1, 1, 2, 1, 10, 40, 30, 20, 12, "~"),
+    row(5, 2, 1, 1, 1, 10, 80, 30, 18, 88, "Bye"),
+])
+
+
+def test_parse_tsv_keeps_only_words():
+    words = parse_tsv(TSV)
+    assert [w["text"] for w in words] == ["Hello", "world", "~", "Bye"]
+    assert words[0]["conf"] == 95.5
+    # Sem cabeçalho (tesserocr) dá o mesmo resultado
+    assert parse_tsv(TSV.split("\n", 1)[1]) == words
+
+
+def test_layout_groups_lines_and_drops_noise():
+    lines = layout_from_tsv(TSV)
+    assert list(lines) == [(1, 1, 1), (2, 1, 1)]
+    first = lines[(1, 1, 1)]
+    assert first["text"] == "Hello world"
+    assert (first["left"], first["top"], first["right"], first["bottom"]) == (10, 10, 110, 32)
+
+
+def test_layout_maps_back_to_screen_coordinates():
+    lines = layout_from_tsv(TSV, origin=(100, 200), scale=2.0)
+    first = lines[(1, 1, 1)]
+    assert (first["left"], first["top"], first["right"], first["bottom"]) == (105, 205, 155, 216)
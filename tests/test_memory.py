@@ -0,0 +1,54 @@
+import translator_memory as tm
+
+
+def make_memory(tmp_path):
+    return tm.TranslationMemory(path=tmp_path / "tm.sqlite3", threshold=1.0)
+
+
+def test_mask_replaces_values_with_tokens():
+    masked, values = tm.mask("Order 1234 shipped to a@b.com")
+    assert masked == "Order ⟦0⟧ shipped to ⟦1⟧"
+    assert values == ["1234", "a@b.com"]
+
+
+def test_mask_target_does_not_match_inside_inserted_tokens():
+    _, values = tm.mask("Batch 5 finished with 0 errors")
+    masked, complete = tm.mask_target("Lote 5 terminou com 0 erros", values)
+    assert masked == "Lote ⟦0⟧ terminou com ⟦1⟧ erros"
+    assert complete
+
+
+def test_mask_target_repeated_values_keep_order():
+    _, values = tm.mask("Page 3 of 3, item 7")
+    masked, complete = tm.mask_target("Página 3 de 3, item 7", values)
+    assert masked == "Página ⟦0⟧ de ⟦1⟧, item ⟦2⟧"
+    assert complete
+
+
+def test_mask_target_count_mismatch_is_incomplete():
+    _, values = tm.mask("Page 3 of 3")
+    _, complete = tm.mask_target("Página 3", values)
+    assert not complete
+
+
+def test_lookup_reinserts_numeric_placeholders(tmp_path):
+    memory = make_memory(tmp_path)
+    memory.add("Batch 5 finished with 0 errors", "Lote 5 terminou com 0 erros", "pt", "en")
+    assert memory.lookup("Batch 7 finished with 3 errors", "pt") == ("Lote 7 terminou com 3 erros", "en")
+    memory.close()
+
+
+def test_incomplete_entry_is_not_stored(tmp_path):
+    memory = make_memory(tmp_path)
+    memory.add("Item 10 of 20", "Item dez de 20", "pt", "en")
+    assert memory.lookup("Item 10 of 20", "pt") is None
+    assert memory.lookup("Item 11 of 21", "pt") is None
+    memory.close()
+
+
+def test_lookup_is_per_target_language(tmp_path):
+    memory = make_memory(tmp_path)
+    memory.add("Order 1234 shipped", "Pedido 1234 enviado", "pt", "en")
+    assert memory.lookup("Order 99 shipped", "pt") == ("Pedido 99 enviado", "en")
+    assert memory.lookup("Order 99 shipped", "es") is None
+    memory.close()
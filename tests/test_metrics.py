@@ -0,0 +1,22 @@
+import pytest
+
+import translator_metrics as metrics
+
+
+@pytest.mark.parametrize("values, p, expected", [
+    (list(range(1, 101)), 99, 99),
+    (list(range(1, 101)), 50, 50),
+    (list(range(1, 101)), 7, 7),
+    (list(range(1, 101)), 100, 100),
+    (list(range(1, 21)), 95, 19),
+    ([1, 2], 50, 1),
+    ([1, 2], 51, 2),
+    ([5], 99, 5),
+    (list(range(1, 11)), 0, 1),
+])
+def test_percentile_is_nearest_rank(values, p, expected):
+    assert metrics.percentile(values, p) == expected
+
+
+def test_percentile_of_nothing_is_zero():
+    assert metrics.percentile([], 95) == 0.0
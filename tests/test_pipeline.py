@@ -0,0 +1,38 @@
+import pytest
+
+from translator_pipeline import looks_like_code, skip_reason
+
+
+@pytest.mark.parametrize("text", [
+    "import os\nprint(os.getcwd())",
+    "from pathlib import Path\n\nPath('.')",
+    "def main(argv=None):\n    return 0",
+    "class Foo(Base):\n    pass",
+    "const total = items.length;",
+    "let x = 1;",
+    "#include <stdio.h>",
+    "SELECT id, name FROM users WHERE id = 1",
+    "<div class=\"x\">texto</div>",
+    "public static void main(String[] args) {",
+])
+def test_code_is_detected(text):
+    assert looks_like_code(text)
+
+
+@pytest.mark.parametrize("text", [
+    "Thanks for the update.\nlet me know if you need anything else.",
+    "Let me know when you arrive.",
+    "import duties apply to all orders over 50 dollars",
+    "The meeting is at 3pm.\nclass starts right after lunch, see you there.",
+    "We talked about it yesterday.\nfrom now on we meet on Mondays.",
+])
+def test_prose_is_not_code(text):
+    assert not looks_like_code(text)
+
+
+def test_skip_reason_filters_urls_numbers_and_empty():
+    assert skip_reason("   ") == "empty"
+    assert skip_reason("https://example.com/a?b=1") == "url"
+    assert skip_reason("1.234,56 €") == "number"
+    assert skip_reason("x" * 50, max_chars=10) == "too_large"
+    assert skip_reason("Let me know if the order arrived.") is None
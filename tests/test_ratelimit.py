@@ -0,0 +1,153 @@
+import pytest
+
+import translator_ratelimit as ratelimit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock)
+    return clock
+
+
+class Usage:
+    def __init__(self, chars=0):
+        self.chars = chars
+
+    def get(self, name):
+        return self.chars
+
+    def add(self, name, chars):
+        self.chars += chars
+
+
+class HTTPError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        if status is not None:
+            self.response = type("Response", (), {"status_code": status, "headers": {}})()
+
+
+def test_token_bucket_reserve_returns_wait_and_goes_negative(clock):
+    bucket = ratelimit.TokenBucket(2.0)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+    clock.now += 1.0
+    assert bucket.wait_time() == pytest.approx(0.5)
+
+
+def test_token_bucket_max_wait_does_not_consume(clock):
+    bucket = ratelimit.TokenBucket(1.0)
+    bucket.reserve()
+    assert bucket.reserve(max_wait=0.5) is None
+    clock.now += 1.0
+    assert bucket.reserve(max_wait=0.5) == 0.0
+
+
+def test_token_bucket_caps_requests_at_capacity(clock):
+    bucket = ratelimit.TokenBucket(10.0, capacity=100)
+    assert bucket.reserve(500) == 0.0
+    assert bucket.wait_time(500) == pytest.approx(10.0)
+
+
+def test_char_bucket_waits_beyond_max_wait(clock):
+    # Regressão: o padrão do google_web (30000 caracteres/min) com pedaços de 5000 não pode desistir
+    limiter = ratelimit.BackendLimiter("google_web", rps=2.0, chars_per_minute=30000)
+    waits = [limiter.reserve(5000) for _ in range(10)]
+    assert None not in waits
+    assert waits == sorted(waits)
+    assert waits[-1] > ratelimit.MAX_WAIT
+
+
+def test_reserve_now_skips_backend_without_chars(clock):
+    limiter = ratelimit.BackendLimiter("google_web", rps=100.0, chars_per_minute=6000)
+    assert limiter.reserve_now(6000) == 0.0
+    assert limiter.reserve_now(1000) is None
+    assert limiter.reserve(1000) == pytest.approx(10.0)
+
+
+def test_reserve_refuses_when_quota_exhausted(clock):
+    limiter = ratelimit.BackendLimiter("azure", rps=10.0, monthly_quota=1000, usage=Usage(900))
+    assert limiter.reserve(50) == 0.0
+    assert limiter.reserve(200) is None
+    assert limiter.wait_estimate(200) == float("inf")
+
+
+def test_reserve_refuses_while_blocked_by_429(clock):
+    limiter = ratelimit.BackendLimiter("libre", rps=5.0)
+    limiter.on_error(HTTPError("Too Many Requests", status=429))
+    assert limiter.throttled == 1
+    assert limiter.reserve(10) is None
+    clock.now += ratelimit.BAN_COOLDOWN
+    assert limiter.reserve(10) == 0.0
+
+
+def test_is_throttle_error_uses_status_and_type_only():
+    class TooManyRequests(Exception):
+        pass
+
+    assert ratelimit.is_throttle_error(HTTPError("boom", status=429))
+    assert ratelimit.is_throttle_error(TooManyRequests("slow down"))
+    assert not ratelimit.is_throttle_error(HTTPError("connection refused on 127.0.0.1:4290", status=500))
+    assert not ratelimit.is_throttle_error(ValueError("request id 84293 failed"))
+
+
+class CountingBackend:
+    name = "libre"
+    max_items = 1
+    max_chars = 5000
+    multi_target = False
+
+    def __init__(self):
+        self.calls = 0
+
+    def available(self):
+        return True
+
+    def translate(self, text, target_lang, source_lang="auto"):
+        self.calls += 1
+        return text, "en"
+
+
+def test_explicit_backend_goes_through_its_limiter(clock, monkeypatch):
+    import translator_backends as backends
+    slept = []
+    monkeypatch.setattr(backends.time, "sleep", slept.append)
+    registry = backends.BackendRegistry()
+    backend = CountingBackend()
+    limiter = ratelimit.BackendLimiter("libre", rps=1.0, monthly_quota=100, usage=Usage())
+    registry.register(backend, limiter=limiter)
+    registry.translate("x" * 10, "pt", backend="libre")
+    registry.translate("x" * 10, "pt", backend="libre")
+    assert slept == [pytest.approx(1.0)]
+    # Pausado por 429: o backend explícito não é chamado
+    limiter.on_error(HTTPError("Too Many Requests", status=429))
+    with pytest.raises(RuntimeError):
+        registry.translate("x", "pt", backend="libre")
+    assert backend.calls == 2
+
+
+def test_explicit_backend_respects_monthly_quota(clock):
+    import asyncio
+    import translator_backends as backends
+    from translator_async import AsyncTranslator
+    registry = backends.BackendRegistry()
+    backend = CountingBackend()
+    registry.register(backend, limiter=ratelimit.BackendLimiter("libre", rps=100.0, monthly_quota=10,
+                                                                usage=Usage(5)))
+    with pytest.raises(RuntimeError):
+        registry.translate("x" * 20, "pt", backend="libre")
+    engine = AsyncTranslator(registry)
+    with pytest.raises(RuntimeError):
+        asyncio.run(engine._translate_backends("x" * 20, "pt", "auto", "libre"))
+    assert backend.calls == 0
@@ -0,0 +1,69 @@
+import json
+import threading
+import http.client
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import translator_backends as backends
+import translator_service as service
+
+
+class ReverseBackend(backends.Backend):
+    name = "libre"
+
+    def translate(self, text, target_lang, source_lang="auto"):
+        return text[::-1], "en"
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(service, "TOKEN_PATH", tmp_path / "service.token")
+    monkeypatch.setattr(service, "_token", None)
+    registry = backends.BackendRegistry()
+    registry.register(ReverseBackend())
+    handler = type("Handler", (service._Handler,), {"service": service.TranslationService(registry),
+                                                    "token": service.service_token()})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def request(port, headers, method="POST", path="/translate"):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    body = json.dumps({"text": "abc", "target": "pt"}) if method == "POST" else None
+    conn.request(method, path, body=body, headers=headers)
+    status = conn.getresponse().status
+    conn.close()
+    return status
+
+
+def test_token_is_persisted_and_reused(tmp_path, monkeypatch):
+    monkeypatch.setattr(service, "TOKEN_PATH", tmp_path / "service.token")
+    monkeypatch.setattr(service, "_token", None)
+    token = service.service_token()
+    assert token and (tmp_path / "service.token").read_text() == token
+    monkeypatch.setattr(service, "_token", None)
+    assert service.service_token() == token
+
+
+def test_post_requires_token(server):
+    assert request(server, {"Content-Type": "text/plain"}) == 403
+    assert request(server, {service.TOKEN_HEADER: "wrong"}) == 403
+    assert request(server, {service.TOKEN_HEADER: service.service_token()}) == 200
+
+
+def test_rejects_foreign_host_and_origin(server):
+    token = service.service_token()
+    assert request(server, {service.TOKEN_HEADER: token, "Origin": "https://example.com"}) == 403
+    assert request(server, {service.TOKEN_HEADER: token, "Host": f"example.com:{server}"}) == 403
+    assert request(server, {"Host": "example.com"}, method="GET", path="/health") == 403
+    assert request(server, {}, method="GET", path="/health") == 200
+
+
+def test_remote_backend_sends_token(server):
+    remote = service.RemoteBackend(f"http://127.0.0.1:{server}")
+    assert remote.translate("hello", "pt") == ("olleh", "en")
@@ -0,0 +1,33 @@
+import json
+
+from translator_settings import SettingsStore, atomic_write_json
+
+
+def test_atomic_write_leaves_no_temp_file(tmp_path):
+    path = tmp_path / "settings.json"
+    atomic_write_json(path, {"a": 1})
+    assert json.loads(path.read_text(encoding="utf-8")) == {"a": 1}
+    assert not (tmp_path / "settings.json.tmp").exists()
+
+
+def test_burst_of_changes_becomes_one_write(tmp_path):
+    path = tmp_path / "settings.json"
+    store = SettingsStore(path, {"font_size": 14, "paused": False}, delay=60, max_delay=60)
+    for size in range(15, 30):
+        store["font_size"] = size
+    store["font_size"] = 29  # valor repetido não conta como mudança
+    assert store.toggle("paused") is True
+    assert not path.exists()
+    store.flush()
+    store.close()
+    assert store.writes == 1
+    assert json.loads(path.read_text(encoding="utf-8")) == {"font_size": 29, "paused": True}
+
+
+def test_values_on_disk_override_defaults(tmp_path):
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps({"font_size": 20}), encoding="utf-8")
+    store = SettingsStore(path, {"font_size": 14, "auto_clipboard": True})
+    assert store.snapshot() == {"font_size": 20, "auto_clipboard": True}
+    store.close()
+    assert store.writes == 0
@@ -0,0 +1,314 @@
+import os
+import time
+import asyncio
+import functools
+import threading
+from collections import Counter
+
+import translator_backends as backends
+import translator_batch as batch
+import translator_langid as langid
+import translator_memory as memory
+import translator_metrics as metrics
+
+# Motor assíncrono: um event loop próprio numa thread daemon, para que Flet/Tk só agendem
+# trabalho e recebam o resultado por callback, sem bloquear a thread da interface.
+MAX_CONCURRENCY = int(os.getenv("TRANSLATOR_MAX_CONCURRENCY", "4"))
+
+httpx = None  # opcional: cliente HTTP assíncrono; sem ele as chamadas rodam no executor
+_httpx_checked = False
+
+
+def _load_httpx():
+    # Importado na primeira tradução, não na abertura da janela
+    global httpx, _httpx_checked
+    if not _httpx_checked:
+        try:
+            import httpx as module
+            httpx = module
+        except ImportError:
+            pass
+        _httpx_checked = True
+    return httpx
+
+
+async def _notify(callback, *args):
+    # Callbacks podem ser funções comuns ou corrotinas (awaitables)
+    if callback is None:
+        return
+    result = callback(*args)
+    if asyncio.iscoroutine(result):
+        await result
+
+
+def _lookup(cache, text, source_lang, target_lang, cache_backend):
+    # (resultado, "cache" | "memory") ou (None, None); roda no executor
+    hit = cache.get(text, source_lang, target_lang, cache_backend)
+    if hit:
+        return hit, "cache"
+    remembered = memory.recall(text, target_lang)
+    return (remembered, "memory") if remembered else (None, None)
+
+
+def _store(cache, text, source_lang, target_lang, cache_backend, translated, src):
+    cache.put(text, source_lang, target_lang, cache_backend, translated, src)
+    memory.learn(text, target_lang, translated, src)
+
+
+async def _google_cloud(client, backend, text, target_lang, source_lang):
+    url, kwargs = backends.google_cloud_request([text], target_lang, backend.api_key, source_lang)
+    r = await client.post(url, **kwargs)
+    r.raise_for_status()
+    return backends.parse_google_cloud(r.json(), [text], source_lang)[0]
+
+
+async def _azure(client, backend, text, target_lang, source_lang):
+    url, kwargs = backends.azure_request([text], target_lang, backend.api_key, backend.region, source_lang)
+    r = await client.post(url, **kwargs)
+    r.raise_for_status()
+    return backends.parse_azure(r.json(), [text], source_lang)[0]
+
+
+async def _libre(client, backend, text, target_lang, source_lang):
+    url, kwargs = backends.libre_request(text, target_lang, backend.base_url, source_lang)
+    r = await client.post(url, **kwargs)
+    r.raise_for_status()
+    return backends.parse_libre(r.json())
+
+
+# Backends com implementação HTTP assíncrona nativa; os demais usam o executor
+ASYNC_BACKENDS = {
+    "google_cloud": _google_cloud,
+    "azure": _azure,
+    "libre": _libre,
+}
+
+
+class AsyncTranslator:
+    def __init__(self, registry, cache=None, max_concurrency=MAX_CONCURRENCY):
+        self.registry = registry
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self._loop = None
+        self._thread = None
+        self._semaphore = None
+        self._clients = {}
+        self._channels = {}
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="translator-async", daemon=True)
+                self._thread.start()
+        self._started.wait()
+        return self
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._started.set()
+        self._loop.run_forever()
+
+    def submit(self, coro_fn, channel=None, on_done=None):
+        # Agenda coro_fn() no loop do motor e retorna um concurrent.futures.Future.
+        # Um novo envio no mesmo canal (ex.: "clipboard") cancela o anterior ainda em andamento.
+        # on_done(resultado, erro) roda na thread do motor: a UI deve repassar para a própria thread.
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self._guarded(coro_fn, channel, on_done), self._loop)
+
+    async def _guarded(self, coro_fn, channel, on_done):
+        if channel is not None:
+            previous = self._channels.get(channel)
+            if previous is not None and not previous.done():
+                previous.cancel()
+            self._channels[channel] = asyncio.current_task()
+        start = time.perf_counter()
+        try:
+            result = await coro_fn()
+        except asyncio.CancelledError:
+            metrics.inc("job_cancelled", channel=channel)
+            raise
+        except Exception as e:
+            metrics.inc("job_errors", channel=channel)
+            await _notify(on_done, None, e)
+            raise
+        # Do envio pela UI até o resultado pronto (OCR + tradução, lote, streaming...)
+        metrics.observe("job", (time.perf_counter() - start) * 1000, channel=channel)
+        await _notify(on_done, result, None)
+        return result
+
+    def cancel(self, channel):
+        if self._loop is None:
+            return
+        task = self._channels.get(channel)
+        if task is not None:
+            self._loop.call_soon_threadsafe(task.cancel)
+
+    async def run_blocking(self, fn, *args, **kwargs):
+        # Trabalho síncrono (OCR, lotes) no executor, respeitando o limite de concorrência
+        async with self._semaphore:
+            return await asyncio.get_running_loop().run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+    def _client(self, name):
+        client = self._clients.get(name)
+        if client is None:
+            limits = httpx.Limits(max_connections=backends.POOL_SIZE, max_keepalive_connections=backends.POOL_SIZE)
+            transport = httpx.AsyncHTTPTransport(retries=backends.RETRIES)
+            client = httpx.AsyncClient(limits=limits, timeout=backends.TIMEOUT, transport=transport)
+            self._clients[name] = client
+        return client
+
+    async def _call(self, backend, text, target_lang, source_lang):
+        impl = ASYNC_BACKENDS.get(backend.name) if _load_httpx() is not None else None
+        start = time.perf_counter()
+        try:
+            if impl is not None:
+                result = await impl(self._client(backend.name), backend, text, target_lang, source_lang)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(None, backend.translate, text, target_lang, source_lang)
+            if result is None or result[0] is None:
+                raise ValueError(f"{backend.name}: resposta vazia")
+        except asyncio.CancelledError:
+            # Cancelamento não é falha do backend
+            raise
+        except Exception as e:
+            self.registry.record_result(backend, False, time.perf_counter() - start, error=e)
+            raise
+        self.registry.record_result(backend, True, time.perf_counter() - start, len(text))
+        return result[0], result[1], backend.name
+
+    async def _translate_backends(self, text, target_lang, source_lang, backend):
+        if backend:
+            chosen = self.registry.get(backend)
+            if chosen is None or not chosen.available():
+                raise RuntimeError(f"Backend não configurado: {backend}")
+            delay = self.registry.reserve(chosen, len(text))
+            if delay:
+                await asyncio.sleep(delay)
+            return await self._call(chosen, text, target_lang, source_lang)
+        candidates = self.registry.ordered()
+        if not candidates:
+            raise RuntimeError("Nenhum serviço de tradução configurado. Defina AZURE_* ou LIBRE_TRANSLATE_URL.")
+        last_error = None
+        if self.registry.mode == "race" and len(candidates) > 1:
+            # Só corre quem tem ficha agora (limites por backend); os outros ficam para o failover
+            racers = []
+            for b in candidates[:self.registry.race_n]:
+                limiter = self.registry.limits.get(b.name)
+                if limiter is None or limiter.reserve_now(len(text)) is not None:
+                    racers.append(b)
+            candidates = [b for b in candidates if b not in racers]
+            pending = {asyncio.ensure_future(self._call(b, text, target_lang, source_lang)) for b in racers}
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            return task.result()
+                        last_error = task.exception()
+            finally:
+                # Ao contrário do modo síncrono, aqui os perdedores são cancelados de verdade
+                for task in pending:
+                    task.cancel()
+        for b, delay in self.registry.admit(candidates, len(text)):
+            if delay:
+                # Espera pela ficha sem ocupar thread: o loop segue atendendo outras traduções
+                await asyncio.sleep(delay)
+            try:
+                return await self._call(b, text, target_lang, source_lang)
+            except Exception as e:
+                last_error = e
+        raise last_error or RuntimeError("Limite de requisições/cota atingido em todos os backends.")
+
+    async def translate(self, text, target_lang, source_lang="auto", backend=None, use_cache=True, on_progress=None):
+        # on_progress(etapa, info): "cache" (acerto; info "memory" se veio da memória de tradução), "request" (indo à rede), "done" (nome do backend ou "langid")
+        text = text.strip()
+        if not text:
+            return None
+        cache = self.cache if use_cache else None
+        cache_backend = backend or "auto"
+        loop = asyncio.get_running_loop()
+        if cache is not None:
+            # SQLite (cache e memória) no executor: disco lento ou banco travado não param o loop
+            hit, via = await loop.run_in_executor(None, _lookup, cache, text, source_lang, target_lang,
+                                                  cache_backend)
+            if hit:
+                metrics.inc("translate_local", via=via)
+                await _notify(on_progress, "cache", None if via == "cache" else via)
+                return hit
+        # Identificação local do idioma: pula o que já está no destino e passa a origem explícita ao backend
+        source, detected, same = langid.route(text, target_lang, source_lang)
+        if same:
+            metrics.inc("translate_local", via="langid")
+            await _notify(on_progress, "done", "langid")
+            return text, detected
+        start = time.perf_counter()
+        async with self._semaphore:
+            await _notify(on_progress, "request", None)
+            translated, src, name = await self._translate_backends(text, target_lang, source, backend)
+        metrics.observe("translate", (time.perf_counter() - start) * 1000, backend=name)
+        src = src or detected
+        if cache is not None:
+            await loop.run_in_executor(None, _store, cache, text, source_lang, target_lang, cache_backend,
+                                       translated, src)
+        await _notify(on_progress, "done", name)
+        return translated, src
+
+    async def translate_many(self, texts, target_lang, source_lang="auto", backend=None, use_cache=True, on_result=None):
+        # on_result(índice, resultado) roda na thread do lote, à medida que cada texto fica pronto
+        cache = self.cache if use_cache else None
+        return await self.run_blocking(batch.translate_many, texts, target_lang, self.registry, cache, source_lang,
+                                       backend, on_result=on_result)
+
+    async def translate_targets(self, text, target_langs, source_lang="auto", backend=None, use_cache=True,
+                                on_result=None):
+        # Vários idiomas de destino: {destino: (tradução, origem)}; on_result(destino, resultado) roda na
+        # thread do executor à medida que cada destino fica pronto
+        cache = self.cache if use_cache else None
+        return await self.run_blocking(batch.translate_targets, text, target_langs, self.registry, cache,
+                                       source_lang, backend, on_result=on_result)
+
+    async def translate_stream(self, text, target_lang, on_chunk, source_lang="auto", backend=None, use_cache=True):
+        # Textos grandes: on_chunk(trecho, origem) recebe a tradução em ordem, pedaço a pedaço,
+        # na thread do executor. Cancelar a tarefa (ex.: novo envio no canal) interrompe o gerador.
+        cache = self.cache if use_cache else None
+        cancelled = threading.Event()
+
+        def consume():
+            sources = Counter()
+            stream = batch.translate_stream(text, target_lang, self.registry, cache, source_lang, backend)
+            try:
+                for piece, src in stream:
+                    if cancelled.is_set():
+                        break
+                    if src:
+                        sources[src] += 1
+                    on_chunk(piece, src)
+            finally:
+                stream.close()
+            return sources.most_common(1)[0][0] if sources else ""
+
+        try:
+            return await self.run_blocking(consume)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    def shutdown(self):
+        if self._loop is None:
+            return
+
+        async def close():
+            for client in self._clients.values():
+                await client.aclose()
+            self._clients.clear()
+
+        try:
+            asyncio.run_coroutine_threadsafe(close(), self._loop).result(timeout=2)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
@@ -0,0 +1,613 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import translator_metrics as metrics
+import translator_ratelimit as ratelimit
+
+# Camada de backends: uma requests.Session por backend (keep-alive + pool + retry/backoff)
+# e instâncias de GoogleTranslator reaproveitadas por idioma, em vez de recriar tudo a cada tradução.
+POOL_SIZE = int(os.getenv("TRANSLATOR_POOL_SIZE", "4"))
+RETRIES = int(os.getenv("TRANSLATOR_RETRIES", "2"))
+BACKOFF = float(os.getenv("TRANSLATOR_BACKOFF", "0.3"))  # segundos; dobra a cada tentativa
+TIMEOUT = float(os.getenv("TRANSLATOR_TIMEOUT", "10"))
+# Seleção de backend: "failover" (um por vez, do mais saudável ao menos) ou "race" (N em paralelo, vence o primeiro)
+MODE = os.getenv("TRANSLATOR_MODE", "failover")
+RACE_N = int(os.getenv("TRANSLATOR_RACE_N", "2"))
+EWMA_ALPHA = 0.3
+DEFAULT_LATENCY = 0.5  # segundos assumidos para backends ainda sem medição
+FAILURE_COOLDOWN = 30.0  # segundos fora da rotação após falhas seguidas
+MAX_CONSECUTIVE_FAILURES = 3
+PRECONNECT_TIMEOUT = 3.0  # segundos; pré-conexão é só aquecimento, não pode segurar a fila
+
+# Endpoints configuráveis (proxy, endpoint regional do Azure ou o servidor falso de bench/mock_server.py)
+GOOGLE_CLOUD_ENDPOINT = os.getenv("GOOGLE_TRANSLATE_ENDPOINT", "https://translation.googleapis.com/language/translate/v2")
+AZURE_ENDPOINT = os.getenv("AZURE_TRANSLATOR_ENDPOINT", "https://api.cognitive.microsofttranslator.com/translate")
+
+_sessions = {}
+# GoogleTranslator guarda o texto em atributos antes de enviar: um cliente por thread, nunca compartilhado
+_google_web_local = threading.local()
+_lock = threading.Lock()
+
+
+def _make_retry():
+    from urllib3.util.retry import Retry
+    kwargs = dict(
+        total=RETRIES,
+        backoff_factor=BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False,
+    )
+    # Traduzir é idempotente, então POST também pode ser repetido
+    try:
+        return Retry(allowed_methods=frozenset(["GET", "POST"]), **kwargs)
+    except TypeError:
+        # urllib3 < 1.26
+        return Retry(method_whitelist=frozenset(["GET", "POST"]), **kwargs)
+
+
+def get_session(backend):
+    with _lock:
+        session = _sessions.get(backend)
+        if session is None:
+            # requests é carregado na primeira sessão, não na importação (abre as janelas mais rápido)
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=_make_retry())
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[backend] = session
+        return session
+
+
+def close_sessions():
+    with _lock:
+        for session in _sessions.values():
+            try:
+                session.close()
+            except Exception:
+                pass
+        _sessions.clear()
+
+
+def _google_web_client(source, target):
+    clients = _google_web_local.__dict__.setdefault("clients", {})
+    key = (source, target)
+    client = clients.get(key)
+    if client is None:
+        from deep_translator import GoogleTranslator
+        client = GoogleTranslator(source=source, target=target)
+        clients[key] = client
+    return client
+
+
+def translate_google_web(text, target_lang, source_lang="auto"):
+    # Google Translate via web (deep-translator). Não exige chave, mas depende de scraping.
+    translated = _google_web_client(source_lang, target_lang).translate(text)
+    return translated, ""
+
+
+# Montagem das requisições e leitura das respostas ficam separadas do transporte
+# para que o cliente síncrono (requests) e o assíncrono (translator_async) compartilhem o protocolo.
+def google_cloud_request(texts, target_lang, api_key, source_lang="auto"):
+    # Google Cloud Translate (v2) using API key; vários segmentos via parâmetros "q" repetidos
+    payload = {"q": list(texts), "target": target_lang, "format": "text"}
+    if source_lang != "auto":
+        payload["source"] = source_lang
+    return GOOGLE_CLOUD_ENDPOINT, {"params": {"key": api_key}, "data": payload}
+
+
+def parse_google_cloud(data, texts, source_lang="auto"):
+    translations = data.get("data", {}).get("translations", [])
+    if len(translations) != len(texts):
+        raise ValueError("google_cloud: número de traduções diferente do enviado")
+    fallback_src = "" if source_lang == "auto" else source_lang
+    return [(t.get("translatedText", ""), t.get("detectedSourceLanguage", "") or fallback_src) for t in translations]
+
+
+def azure_request(texts, target_lang, api_key, region, source_lang="auto"):
+    # Microsoft Translator (Azure); o corpo aceita um array de textos e "to" aceita vários destinos
+    targets = list(target_lang) if isinstance(target_lang, (list, tuple)) else [target_lang]
+    params = {"api-version": "3.0", "to": targets}
+    if source_lang != "auto":
+        params["from"] = source_lang
+    headers = {
+        "Ocp-Apim-Subscription-Key": api_key,
+        "Ocp-Apim-Subscription-Region": region,
+        "Content-type": "application/json"
+    }
+    body = [{"text": t} for t in texts]
+    return AZURE_ENDPOINT, {"params": params, "headers": headers, "content": json.dumps(body)}
+
+
+def parse_azure(data, texts, source_lang="auto"):
+    if len(data) != len(texts):
+        raise ValueError("azure: número de traduções diferente do enviado")
+    fallback_src = "" if source_lang == "auto" else source_lang
+    return [
+        (item["translations"][0]["text"], item.get("detectedLanguage", {}).get("language", "") or fallback_src)
+        for item in data
+    ]
+
+
+def parse_azure_targets(data, texts, target_langs, source_lang="auto"):
+    # Resposta com vários "to": [({destino: tradução}, idioma_origem), ...] na ordem de `texts`
+    if len(data) != len(texts):
+        raise ValueError("azure: número de traduções diferente do enviado")
+    fallback_src = "" if source_lang == "auto" else source_lang
+    results = []
+    for item in data:
+        by_target = {t.get("to"): t.get("text") for t in item.get("translations", [])}
+        if any(by_target.get(target) is None for target in target_langs):
+            raise ValueError("azure: resposta sem todos os idiomas de destino")
+        results.append(({target: by_target[target] for target in target_langs},
+                        item.get("detectedLanguage", {}).get("language", "") or fallback_src))
+    return results
+
+
+def libre_request(text, target_lang, base_url, source_lang="auto"):
+    # LibreTranslate (sem API key por padrão; alguns servidores exigem)
+    payload = {"q": text, "source": source_lang, "target": target_lang, "format": "text"}
+    return f"{base_url}/translate", {"data": payload}
+
+
+def parse_libre(data):
+    return data.get("translatedText"), ""
+
+
+def _post(backend, url, kwargs):
+    # "content" é o nome do corpo bruto no httpx; requests usa "data"
+    kwargs = dict(kwargs)
+    if "content" in kwargs:
+        kwargs["data"] = kwargs.pop("content")
+    r = get_session(backend).post(url, timeout=TIMEOUT, **kwargs)
+    r.raise_for_status()
+    return r.json()
+
+
+def translate_google_cloud(text, target_lang, api_key, source_lang="auto"):
+    return translate_google_cloud_batch([text], target_lang, api_key, source_lang)[0]
+
+
+def translate_google_cloud_batch(texts, target_lang, api_key, source_lang="auto"):
+    url, kwargs = google_cloud_request(texts, target_lang, api_key, source_lang)
+    return parse_google_cloud(_post("google_cloud", url, kwargs), texts, source_lang)
+
+
+def translate_azure(text, target_lang, api_key, region, source_lang="auto"):
+    return translate_azure_batch([text], target_lang, api_key, region, source_lang)[0]
+
+
+def translate_azure_batch(texts, target_lang, api_key, region, source_lang="auto"):
+    url, kwargs = azure_request(texts, target_lang, api_key, region, source_lang)
+    return parse_azure(_post("azure", url, kwargs), texts, source_lang)
+
+
+def translate_azure_targets(text, target_langs, api_key, region, source_lang="auto"):
+    url, kwargs = azure_request([text], target_langs, api_key, region, source_lang)
+    return parse_azure_targets(_post("azure", url, kwargs), [text], target_langs, source_lang)[0]
+
+
+def translate_libre(text, target_lang, base_url, source_lang="auto"):
+    url, kwargs = libre_request(text, target_lang, base_url, source_lang)
+    return parse_libre(_post("libre", url, kwargs))
+
+
+def pack_batches(items, max_items, max_chars):
+    # Agrupa itens em lotes respeitando limite de elementos e de caracteres por requisição
+    batches, current, size = [], [], 0
+    for item in items:
+        if current and (len(current) >= max_items or size + len(item) > max_chars):
+            batches.append(current)
+            current, size = [], 0
+        current.append(item)
+        size += len(item)
+    if current:
+        batches.append(current)
+    return batches
+
+
+class Backend:
+    # Interface comum: translate() devolve (tradução, idioma_origem) ou levanta exceção.
+    # translate_batch() recebe lotes dentro de max_items/max_chars; o padrão traduz um a um.
+    # multi_target: translate_targets() traduz para vários idiomas numa só requisição.
+    name = ""
+    max_items = 1
+    max_chars = 5000
+    multi_target = False
+
+    def available(self):
+        return True
+
+    def endpoint(self):
+        return None
+
+    def preconnect(self, timeout=PRECONNECT_TIMEOUT):
+        # Abre DNS + TCP + TLS antes do primeiro pedido; a conexão fica no pool da sessão
+        url = self.endpoint()
+        if url:
+            get_session(self.name).head(url, timeout=timeout)
+
+    def translate(self, text, target_lang, source_lang="auto"):
+        raise NotImplementedError
+
+    def translate_batch(self, texts, target_lang, source_lang="auto"):
+        return [self.translate(t, target_lang, source_lang) for t in texts]
+
+    def translate_targets(self, text, target_langs, source_lang="auto"):
+        # ({destino: tradução}, idioma_origem); só para backends com multi_target
+        raise NotImplementedError
+
+
+class GoogleWebBackend(Backend):
+    name = "google_web"
+
+    def translate(self, text, target_lang, source_lang="auto"):
+        return translate_google_web(text, target_lang, source_lang)
+
+
+class GoogleCloudBackend(Backend):
+    name = "google_cloud"
+    max_items = 128
+    max_chars = 30000
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+
+    def available(self):
+        return bool(self.api_key)
+
+    def endpoint(self):
+        return GOOGLE_CLOUD_ENDPOINT
+
+    def translate(self, text, target_lang, source_lang="auto"):
+        return translate_google_cloud(text, target_lang, self.api_key, source_lang)
+
+    def translate_batch(self, texts, target_lang, source_lang="auto"):
+        return translate_google_cloud_batch(texts, target_lang, self.api_key, source_lang)
+
+
+class AzureBackend(Backend):
+    name = "azure"
+    max_items = 1000
+    max_chars = 50000
+    multi_target = True
+
+    def __init__(self, api_key, region):
+        self.api_key = api_key
+        self.region = region
+
+    def available(self):
+        return bool(self.api_key and self.region)
+
+    def endpoint(self):
+        return AZURE_ENDPOINT
+
+    def translate(self, text, target_lang, source_lang="auto"):
+        return translate_azure(text, target_lang, self.api_key, self.region, source_lang)
+
+    def translate_batch(self, texts, target_lang, source_lang="auto"):
+        return translate_azure_batch(texts, target_lang, self.api_key, self.region, source_lang)
+
+    def translate_targets(self, text, target_langs, source_lang="auto"):
+        return translate_azure_targets(text, target_langs, self.api_key, self.region, source_lang)
+
+
+class LibreBackend(Backend):
+    name = "libre"
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def available(self):
+        return bool(self.base_url)
+
+    def endpoint(self):
+        return self.base_url
+
+    def translate(self, text, target_lang, source_lang="auto"):
+        return translate_libre(text, target_lang, self.base_url, source_lang)
+
+
+class BackendHealth:
+    # Latência e taxa de erro como médias móveis exponenciais (EWMA)
+    def __init__(self, alpha=EWMA_ALPHA):
+        self.alpha = alpha
+        self.latency = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.last_failure = 0.0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def record(self, success, elapsed):
+        with self._lock:
+            self.calls += 1
+            if success:
+                self.latency = elapsed if self.latency is None else self.alpha * elapsed + (1 - self.alpha) * self.latency
+                self.consecutive_failures = 0
+            else:
+                self.consecutive_failures += 1
+                self.last_failure = time.monotonic()
+            self.error_rate = self.alpha * (0.0 if success else 1.0) + (1 - self.alpha) * self.error_rate
+
+    def healthy(self):
+        if self.consecutive_failures < MAX_CONSECUTIVE_FAILURES:
+            return True
+        return time.monotonic() - self.last_failure > FAILURE_COOLDOWN
+
+    def score(self):
+        # Menor é melhor: latência esperada penalizada pela taxa de erro
+        latency = DEFAULT_LATENCY if self.latency is None else self.latency
+        return latency * (1 + 4 * self.error_rate)
+
+    def snapshot(self):
+        return {
+            "latency": self.latency,
+            "error_rate": round(self.error_rate, 4),
+            "consecutive_failures": self.consecutive_failures,
+            "calls": self.calls,
+            "healthy": self.healthy(),
+        }
+
+
+class BackendRegistry:
+    def __init__(self, mode=MODE, race_n=RACE_N):
+        self.mode = mode
+        self.race_n = max(1, race_n)
+        self._backends = []  # (prioridade, backend)
+        self.health = {}
+        self.limits = {}  # nome -> BackendLimiter (requisições/s, caracteres/min, cota mensal)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def register(self, backend, priority=None, limiter=None):
+        if priority is None:
+            priority = len(self._backends)
+        self._backends.append((priority, backend))
+        self.health.setdefault(backend.name, BackendHealth())
+        if limiter is not None:
+            self.limits[backend.name] = limiter
+        return backend
+
+    def get(self, name):
+        for _, backend in self._backends:
+            if backend.name == name:
+                return backend
+        return None
+
+    def ordered(self):
+        # Saudáveis primeiro, depois pelo score; prioridade configurada desempata
+        candidates = [(p, b) for p, b in self._backends if b.available()]
+        candidates.sort(key=lambda pb: (not self.health[pb[1].name].healthy(), self.health[pb[1].name].score(), pb[0]))
+        return [b for _, b in candidates]
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=max(4, self.race_n * 2), thread_name_prefix="backend")
+            return self._executor
+
+    def max_segment_chars(self):
+        # Maior segmento que qualquer backend disponível aceita sozinho (para failover sem erro de tamanho)
+        limits = [b.max_chars for _, b in self._backends if b.available()]
+        return min(limits) if limits else 5000
+
+    def preconnect(self):
+        # Aquecimento: uma conexão aberta por backend disponível, em paralelo; erros são ignorados
+        # (o primeiro pedido real conecta de novo e entra no EWMA como sempre)
+        def connect(backend):
+            try:
+                backend.preconnect()
+            except Exception:
+                pass
+
+        candidates = [b for _, b in self._backends if b.available() and b.endpoint()]
+        if candidates:
+            list(self._pool().map(connect, candidates))
+        return [b.name for b in candidates]
+
+    def admit(self, candidates, chars):
+        # Gera (backend, espera_em_s) na ordem de uso, já com a ficha reservada: primeiro quem pode
+        # enviar agora; se nenhum puder, os que liberam antes (até ratelimit.MAX_WAIT; a espera pelo
+        # limite de caracteres/min não tem teto). Backends com cota do mês esgotada ou pausados por 429
+        # ficam de fora.
+        deferred = []
+        for b in candidates:
+            limiter = self.limits.get(b.name)
+            wait = limiter.reserve_now(chars) if limiter is not None else 0.0
+            if wait is not None:
+                yield b, wait
+            else:
+                deferred.append(b)
+        deferred.sort(key=lambda b: self.limits[b.name].wait_estimate(chars))
+        for b in deferred:
+            wait = self.limits[b.name].reserve(chars)
+            if wait is not None:
+                yield b, wait
+
+    def reserve(self, backend, chars):
+        # Backend escolhido pelo chamador (sem failover): segundos a esperar, já com a ficha reservada;
+        # levanta exceção com a cota esgotada, pausado por 429 ou sem ficha dentro de MAX_WAIT
+        limiter = self.limits.get(backend.name)
+        if limiter is None:
+            return 0.0
+        delay = limiter.reserve(chars)
+        if delay is None:
+            raise RuntimeError(f"{backend.name}: limite de requisições/cota atingido")
+        return delay
+
+    def record_result(self, backend, ok, elapsed, chars=0, error=None):
+        self.health[backend.name].record(ok, elapsed)
+        metrics.observe("backend_request", elapsed * 1000, backend=backend.name)
+        if not ok:
+            metrics.inc("backend_errors", backend=backend.name)
+        limiter = self.limits.get(backend.name)
+        if limiter is None:
+            return
+        if ok:
+            limiter.record(chars)
+        else:
+            limiter.on_error(error)
+
+    def _call(self, backend, fn, *args):
+        start = time.perf_counter()
+        try:
+            result = fn(*args)
+            if result is None or result[0] is None:
+                raise ValueError(f"{backend.name}: resposta vazia")
+        except Exception as e:
+            self.record_result(backend, False, time.perf_counter() - start, error=e)
+            raise
+        self.record_result(backend, True, time.perf_counter() - start, len(args[0]))
+        return result
+
+    def translate(self, text, target_lang, source_lang="auto", backend=None, mode=None):
+        # Retorna (tradução, idioma_origem, nome_do_backend)
+        if backend:
+            chosen = self.get(backend)
+            if chosen is None or not chosen.available():
+                raise RuntimeError(f"Backend não configurado: {backend}")
+            delay = self.reserve(chosen, len(text))
+            if delay:
+                time.sleep(delay)
+            translated, src = self._call(chosen, chosen.translate, text, target_lang, source_lang)
+            return translated, src, chosen.name
+        candidates = self.ordered()
+        if not candidates:
+            raise RuntimeError("Nenhum serviço de tradução configurado. Defina AZURE_* ou LIBRE_TRANSLATE_URL.")
+        mode = mode or self.mode
+        last_error = None
+        if mode == "race" and len(candidates) > 1:
+            # Só corre quem tem ficha agora; os outros ficam para o failover
+            racers = []
+            for b in candidates[:self.race_n]:
+                limiter = self.limits.get(b.name)
+                if limiter is None or limiter.reserve_now(len(text)) is not None:
+                    racers.append(b)
+            candidates = [b for b in candidates if b not in racers]
+            pending = {self._pool().submit(self._call, b, b.translate, text, target_lang, source_lang): b for b in racers}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    b = pending.pop(future)
+                    try:
+                        translated, src = future.result()
+                        # Os perdedores seguem em segundo plano só para alimentar as métricas de saúde
+                        return translated, src, b.name
+                    except Exception as e:
+                        last_error = e
+        for b, delay in self.admit(candidates, len(text)):
+            if delay:
+                time.sleep(delay)
+            try:
+                translated, src = self._call(b, b.translate, text, target_lang, source_lang)
+                return translated, src, b.name
+            except Exception as e:
+                last_error = e
+        raise last_error or RuntimeError("Limite de requisições/cota atingido em todos os backends.")
+
+    def translate_batch(self, texts, target_lang, source_lang="auto", backend=None):
+        # Retorna ([(tradução, idioma_origem), ...], nome_do_backend); failover por lote inteiro
+        if backend:
+            chosen = self.get(backend)
+            if chosen is None or not chosen.available():
+                raise RuntimeError(f"Backend não configurado: {backend}")
+            candidates = [chosen]
+        else:
+            candidates = self.ordered()
+        if not candidates:
+            raise RuntimeError("Nenhum serviço de tradução configurado. Defina AZURE_* ou LIBRE_TRANSLATE_URL.")
+        last_error = None
+        chars = sum(len(t) for t in texts)
+        for b, delay in self.admit(candidates, chars):
+            if delay:
+                time.sleep(delay)
+            try:
+                results = []
+                for i, chunk in enumerate(pack_batches(texts, b.max_items, b.max_chars)):
+                    if i:
+                        # A primeira parte já tem ficha (admit); as seguintes pedem a sua
+                        delay = self.reserve(b, sum(len(t) for t in chunk))
+                        if delay:
+                            time.sleep(delay)
+                    results.extend(self._call_batch(b, chunk, target_lang, source_lang))
+                return results, b.name
+            except Exception as e:
+                last_error = e
+        raise last_error or RuntimeError("Limite de requisições/cota atingido em todos os backends.")
+
+    def multi_target_backend(self, backend=None):
+        # Backend para uma requisição com vários destinos: o escolhido, ou o primeiro da ordem de uso
+        # (o mesmo que o failover tentaria); None quando ele não aceita vários destinos
+        if backend:
+            chosen = self.get(backend)
+        else:
+            candidates = self.ordered()
+            chosen = candidates[0] if candidates else None
+        if chosen is None or not chosen.available() or not chosen.multi_target:
+            return None
+        return chosen
+
+    def translate_targets(self, text, target_langs, source_lang="auto", backend=None):
+        # Uma requisição para todos os destinos: ({destino: tradução}, idioma_origem, nome_do_backend).
+        # Sem failover aqui: quem chama cai para uma tradução por destino se isto falhar.
+        chosen = self.multi_target_backend(backend)
+        if chosen is None:
+            raise RuntimeError("Nenhum backend disponível aceita vários idiomas de destino.")
+        # O provedor cobra os caracteres uma vez por destino
+        chars = len(text) * len(target_langs)
+        delay = self.reserve(chosen, chars)
+        if delay:
+            time.sleep(delay)
+        start = time.perf_counter()
+        try:
+            translations, src = chosen.translate_targets(text, list(target_langs), source_lang)
+        except Exception as e:
+            self.record_result(chosen, False, time.perf_counter() - start, error=e)
+            raise
+        self.record_result(chosen, True, time.perf_counter() - start, chars)
+        return translations, src, chosen.name
+
+    def _call_batch(self, backend, texts, target_lang, source_lang):
+        start = time.perf_counter()
+        try:
+            results = backend.translate_batch(texts, target_lang, source_lang)
+            if len(results) != len(texts) or any(r is None or r[0] is None for r in results):
+                raise ValueError(f"{backend.name}: resposta de lote incompleta")
+        except Exception as e:
+            self.record_result(backend, False, time.perf_counter() - start, error=e)
+            raise
+        self.record_result(backend, True, time.perf_counter() - start, sum(len(t) for t in texts))
+        return results
+
+    def stats(self):
+        stats = {name: h.snapshot() for name, h in self.health.items()}
+        for name, limiter in self.limits.items():
+            stats[name]["limits"] = limiter.snapshot()
+        return stats
+
+
+def build_registry(use_google_web=True, google_key=None, azure_key=None, azure_region=None, libre_url=None,
+                   mode=MODE, race_n=RACE_N):
+    # Ordem de prioridade igual à cadeia antiga: Google web, Google Cloud, Azure, LibreTranslate (+ Argos offline)
+    registry = BackendRegistry(mode=mode, race_n=race_n)
+    from translator_offline import ArgosBackend, OFFLINE_MODE
+    argos = ArgosBackend()
+    if OFFLINE_MODE == "1":
+        # Offline preferido: sem rede, modelos já aquecidos no worker
+        registry.register(argos, priority=-1)
+        if argos.available():
+            argos.preload()
+    if use_google_web:
+        registry.register(GoogleWebBackend(), limiter=ratelimit.limiter_for(GoogleWebBackend.name))
+    registry.register(GoogleCloudBackend(google_key), limiter=ratelimit.limiter_for(GoogleCloudBackend.name))
+    registry.register(AzureBackend(azure_key, azure_region), limiter=ratelimit.limiter_for(AzureBackend.name))
+    registry.register(LibreBackend(libre_url), limiter=ratelimit.limiter_for(LibreBackend.name))
+    if OFFLINE_MODE != "1":
+        # Último recurso quando argostranslate estiver instalado (carregado sob demanda)
+        registry.register(argos)
+    return registry
@@ -0,0 +1,370 @@
+import os
+import re
+import time
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import translator_langid as langid
+import translator_memory as memory
+import translator_metrics as metrics
+from translator_backends import pack_batches
+
+# Tradução em lote: divide os textos em segmentos, remove duplicados, consulta o cache,
+# empacota o resto em lotes do tamanho aceito pelo backend e envia os lotes em paralelo.
+# translate_one() é o mesmo caminho para um texto só (cache -> memória -> idioma -> backends).
+MAX_WORKERS = int(os.getenv("TRANSLATOR_BATCH_WORKERS", "4"))
+# Streaming: quantos pedaços podem estar em tradução (ou prontos e ainda não consumidos) ao mesmo tempo
+STREAM_WINDOW = int(os.getenv("TRANSLATOR_STREAM_WINDOW", str(MAX_WORKERS * 2)))
+
+_PARAGRAPH_SPLIT = re.compile(r"(\n\s*\n)")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?…;:])\s+")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="batch")
+        return _executor
+
+
+def _hard_split(text, max_chars):
+    # Último recurso para "frases" maiores que o limite: corta no último espaço antes do limite
+    chunks = []
+    while len(text) > max_chars:
+        cut = text.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        chunks.append(text[:cut].strip())
+        text = text[cut:].strip()
+    if text:
+        chunks.append(text)
+    return chunks
+
+
+def split_long(paragraph, max_chars):
+    if len(paragraph) <= max_chars:
+        return [paragraph]
+    chunks, current = [], ""
+    for sentence in _SENTENCE_SPLIT.split(paragraph):
+        for piece in _hard_split(sentence, max_chars):
+            if current and len(current) + 1 + len(piece) > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_segments(text, max_chars):
+    # Lista de (segmento, separador_seguinte); parágrafos preservam o separador original
+    pieces = []
+    parts = _PARAGRAPH_SPLIT.split(text)
+    for i in range(0, len(parts), 2):
+        paragraph = parts[i].strip()
+        sep = parts[i + 1] if i + 1 < len(parts) else ""
+        if not paragraph:
+            if pieces and sep:
+                pieces[-1] = (pieces[-1][0], pieces[-1][1] + sep)
+            continue
+        chunks = split_long(paragraph, max_chars)
+        for j, chunk in enumerate(chunks):
+            pieces.append((chunk, sep if j == len(chunks) - 1 else " "))
+    return pieces
+
+
+def iter_segments(text, max_chars):
+    # Versão preguiçosa de split_segments: percorre o texto parágrafo a parágrafo sem montar a lista
+    # inteira, para colagens de vários MB não virarem milhares de strings de uma vez
+    position = 0
+    pending = None
+    for match in _PARAGRAPH_SPLIT.finditer(text):
+        paragraph = text[position:match.start()].strip()
+        position = match.end()
+        if not paragraph:
+            if pending is not None:
+                pending = (pending[0], pending[1] + match.group(0))
+            continue
+        if pending is not None:
+            yield pending
+        chunks = split_long(paragraph, max_chars)
+        for chunk in chunks[:-1]:
+            yield chunk, " "
+        pending = (chunks[-1], match.group(0))
+    paragraph = text[position:].strip()
+    if paragraph:
+        if pending is not None:
+            yield pending
+        chunks = split_long(paragraph, max_chars)
+        for chunk in chunks[:-1]:
+            yield chunk, " "
+        pending = (chunks[-1], "")
+    if pending is not None:
+        yield pending
+
+
+def _assemble(pieces, results):
+    parts = []
+    sources = Counter()
+    for segment, sep in pieces:
+        translated, src = results[segment]
+        parts.append(translated)
+        parts.append(sep)
+        if src:
+            sources[src] += 1
+    return "".join(parts).strip(), sources.most_common(1)[0][0] if sources else ""
+
+
+def translate_one(text, target_lang, registry, cache=None, source_lang="auto", backend=None):
+    # (tradução, idioma_origem) ou None para texto vazio. cache=None ignora cache e memória de tradução;
+    # backend=None deixa o registro escolher (failover/race), um nome força aquele backend.
+    text = (text or "").strip()
+    if not text:
+        return None
+    cache_backend = backend or "auto"
+    if cache is not None:
+        hit = cache.get(text, source_lang, target_lang, cache_backend)
+        if hit:
+            metrics.inc("translate_local", via="cache")
+            return hit
+        # Memória de tradução: mesmo texto com outros números/IDs (ou parecido, conforme o limiar)
+        remembered = memory.recall(text, target_lang)
+        if remembered:
+            metrics.inc("translate_local", via="memory")
+            return remembered
+    # Identificação local do idioma: pula o que já está no destino e passa a origem explícita ao backend
+    source, detected, same = langid.route(text, target_lang, source_lang)
+    if same:
+        metrics.inc("translate_local", via="langid")
+        return text, detected
+    start = time.perf_counter()
+    translated, src, name = registry.translate(text, target_lang, source, backend=backend)
+    # Tempo total até a resposta, incluindo failover e espera por ficha (backend_request mede cada chamada)
+    metrics.observe("translate", (time.perf_counter() - start) * 1000, backend=name)
+    src = src or detected
+    if cache is not None:
+        cache.put(text, source_lang, target_lang, cache_backend, translated, src)
+        memory.learn(text, target_lang, translated, src)
+    return translated, src
+
+
+def translate_targets(text, target_langs, registry, cache=None, source_lang="auto", backend=None, on_result=None):
+    # Um texto para vários idiomas: {destino: (tradução, idioma_origem)}. Uma detecção de idioma para
+    # todos, uma consulta de cache por destino e, para o que faltar, uma só requisição quando o backend
+    # aceita vários destinos (Azure) ou uma por destino em paralelo. on_result(destino, resultado) é
+    # chamado assim que cada destino fica pronto (cache primeiro), para a interface desenhar aos poucos.
+    text = (text or "").strip()
+    targets = list(dict.fromkeys(t for t in target_langs if t))
+    results = {}
+    if not text or not targets:
+        return results
+
+    def done(target, result, via=None):
+        results[target] = result
+        if via:
+            metrics.inc("translate_local", via=via)
+        if on_result is not None:
+            on_result(target, result)
+
+    cache_backend = backend or "auto"
+    missing = []
+    for target in targets:
+        if cache is not None:
+            hit = cache.get(text, source_lang, target, cache_backend)
+            if hit:
+                done(target, hit, "cache")
+                continue
+            remembered = memory.recall(text, target)
+            if remembered:
+                done(target, remembered, "memory")
+                continue
+        missing.append(target)
+    if not missing:
+        return results
+    # Detecção local feita uma vez; o destino igual à origem devolve o próprio texto
+    source, detected, _ = langid.route(text, missing[0], source_lang)
+    if detected and detected in missing:
+        missing.remove(detected)
+        done(detected, (text, detected), "langid")
+
+    def store(target, translated, src):
+        src = src or detected
+        if cache is not None:
+            cache.put(text, source_lang, target, cache_backend, translated, src)
+            memory.learn(text, target, translated, src)
+        done(target, (translated, src))
+
+    if len(missing) > 1 and registry.multi_target_backend(backend) is not None:
+        start = time.perf_counter()
+        try:
+            translations, src, name = registry.translate_targets(text, missing, source, backend=backend)
+        except Exception:
+            # Sem a requisição única (erro, cota): segue destino a destino com failover normal
+            pass
+        else:
+            metrics.observe("translate", (time.perf_counter() - start) * 1000, backend=name)
+            for target in missing:
+                store(target, translations[target], src)
+            return results
+
+    def one(target):
+        start = time.perf_counter()
+        translated, src, name = registry.translate(text, target, source, backend=backend)
+        metrics.observe("translate", (time.perf_counter() - start) * 1000, backend=name)
+        return translated, src
+
+    futures = {_pool().submit(one, target): target for target in missing}
+    errors = []
+    for future in as_completed(futures):
+        try:
+            translated, src = future.result()
+        except Exception as e:
+            errors.append(e)
+            continue
+        store(futures[future], translated, src)
+    if errors and not results:
+        raise errors[0]
+    # Destinos que falharam ficam de fora do resultado (os outros já foram entregues)
+    return results
+
+
+def translate_many(texts, target_lang, registry, cache=None, source_lang="auto", backend=None,
+                   max_workers=MAX_WORKERS, on_result=None):
+    # Retorna uma lista alinhada com `texts`: (tradução, idioma_origem) ou None para textos vazios.
+    # on_result(índice, resultado) é chamado assim que cada texto fica pronto (cache primeiro,
+    # depois conforme os lotes terminam), para a interface desenhar sem esperar o lote mais lento.
+    max_chars = registry.max_segment_chars()
+    layouts = []
+    unique = []
+    seen = set()
+    for text in texts:
+        pieces = split_segments(text.strip(), max_chars) if text and text.strip() else []
+        layouts.append(pieces)
+        for segment, _ in pieces:
+            if segment not in seen:
+                seen.add(segment)
+                unique.append(segment)
+
+    cache_backend = backend or "auto"
+    results = {}
+    pending = []
+    for segment in unique:
+        hit = cache.get(segment, source_lang, target_lang, cache_backend) if cache is not None else None
+        if not hit and cache is not None:
+            hit = memory.recall(segment, target_lang)
+        if hit:
+            results[segment] = hit
+        else:
+            pending.append(segment)
+
+    emitted = set()
+
+    def emit():
+        if on_result is None:
+            return
+        for i, pieces in enumerate(layouts):
+            if i in emitted or not pieces or any(segment not in results for segment, _ in pieces):
+                continue
+            emitted.add(i)
+            on_result(i, _assemble(pieces, results))
+
+    if pending:
+        primary = registry.get(backend) if backend else next(iter(registry.ordered()), None)
+        if primary is None:
+            raise RuntimeError("Nenhum serviço de tradução configurado. Defina AZURE_* ou LIBRE_TRANSLATE_URL.")
+        # Idioma por segmento: o que já está no destino não sai daqui; o resto é agrupado pela origem
+        groups = {}
+        detected = {}
+        for segment in pending:
+            source, lang, same = langid.route(segment, target_lang, source_lang)
+            if same:
+                results[segment] = (segment, lang)
+                continue
+            detected[segment] = lang
+            groups.setdefault(source, []).append(segment)
+        jobs = [(source, b) for source, segments in groups.items()
+                for b in pack_batches(segments, primary.max_items, primary.max_chars)]
+
+        def run(job):
+            source, segments = job
+            translated, _ = registry.translate_batch(segments, target_lang, source, backend=backend)
+            return segments, translated
+
+        def collect(segments, translated):
+            learned = []
+            for segment, (text, src) in zip(segments, translated):
+                result = (text, src or detected.get(segment, ""))
+                results[segment] = result
+                if cache is not None:
+                    cache.put(segment, source_lang, target_lang, cache_backend, result[0], result[1])
+                    learned.append((segment, result[0], result[1]))
+            # Uma transação por lote na memória de tradução
+            memory.learn_many(learned, target_lang)
+            emit()
+
+        emit()
+        if len(jobs) <= 1 or max_workers <= 1:
+            for j in jobs:
+                collect(*run(j))
+        else:
+            futures = [_pool().submit(run, j) for j in jobs]
+            for f in as_completed(futures):
+                collect(*f.result())
+    else:
+        emit()
+
+    return [_assemble(pieces, results) if pieces else None for pieces in layouts]
+
+
+def _stream_jobs(text, max_chars, max_items):
+    # Agrupa segmentos consecutivos em pedaços dentro dos limites do backend principal
+    job, size = [], 0
+    for segment, sep in iter_segments(text, max_chars):
+        if job and (len(job) >= max_items or size + len(segment) > max_chars):
+            yield job
+            job, size = [], 0
+        job.append((segment, sep))
+        size += len(segment)
+    if job:
+        yield job
+
+
+def translate_stream(text, target_lang, registry, cache=None, source_lang="auto", backend=None, window=STREAM_WINDOW):
+    # Gerador de (trecho_traduzido_com_separador, idioma_origem) na ordem do texto original.
+    # Os pedaços são traduzidos em paralelo, mas no máximo `window` ficam em voo/aguardando:
+    # a memória não cresce com o tamanho do texto e quem consome já recebe o começo.
+    primary = registry.get(backend) if backend else next(iter(registry.ordered()), None)
+    if primary is None:
+        raise RuntimeError("Nenhum serviço de tradução configurado. Defina AZURE_* ou LIBRE_TRANSLATE_URL.")
+    max_chars = min(registry.max_segment_chars(), primary.max_chars)
+
+    def run(job):
+        segments = [segment for segment, _ in job]
+        # Cada pedaço passa pelo mesmo caminho do lote (cache, idioma local, lotes do provedor)
+        return translate_many(segments, target_lang, registry, cache, source_lang, backend, max_workers=1)
+
+    in_flight = deque()
+    jobs = _stream_jobs(text, max_chars, primary.max_items)
+    try:
+        for job in jobs:
+            in_flight.append((job, _pool().submit(run, job)))
+            if len(in_flight) < max(1, window):
+                continue
+            yield from _drain(*in_flight.popleft())
+        while in_flight:
+            yield from _drain(*in_flight.popleft())
+    finally:
+        # Consumidor desistiu (gerador fechado): pedaços ainda não iniciados não vão à rede
+        for _, future in in_flight:
+            future.cancel()
+
+
+def _drain(job, future):
+    for (_, sep), result in zip(job, future.result()):
+        if result:
+            yield result[0] + sep, result[1]
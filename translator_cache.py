@@ -0,0 +1,210 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+# Cache de traduções em dois níveis: LRU em memória + SQLite em disco (ao lado do launcher_settings.json).
+# Chave: (texto normalizado, idioma origem, idioma destino, backend).
+CACHE_PATH = Path(os.getenv("TRANSLATOR_CACHE_PATH", "translation_cache.sqlite3"))
+CACHE_ENABLED = os.getenv("TRANSLATOR_CACHE", "1") != "0"  # TRANSLATOR_CACHE=0 desliga o cache
+MEMORY_MAX_ITEMS = int(os.getenv("TRANSLATOR_CACHE_MEMORY_ITEMS", "2000"))
+DISK_MAX_ITEMS = int(os.getenv("TRANSLATOR_CACHE_DISK_ITEMS", "200000"))
+TTL_SECONDS = float(os.getenv("TRANSLATOR_CACHE_TTL", str(30 * 24 * 3600)))  # 30 dias
+PRUNE_EVERY = 500  # a cada N gravações remove expirados/excedentes do disco
+
+
+def normalize_text(text):
+    # NFC + espaços colapsados por linha; quebras de linha são preservadas porque mudam a tradução
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+    return "\n".join(" ".join(line.split()) for line in text.strip().split("\n"))
+
+
+def make_key(text, source, target, backend):
+    raw = "\x1f".join((normalize_text(text), source or "auto", target or "", backend or ""))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    def __init__(self, path=CACHE_PATH, max_items=MEMORY_MAX_ITEMS, disk_max_items=DISK_MAX_ITEMS, ttl=TTL_SECONDS):
+        self.path = Path(path) if path else None
+        self.max_items = max_items
+        self.disk_max_items = disk_max_items
+        self.ttl = ttl
+        self._memory = OrderedDict()  # key -> (translated, source_lang, created)
+        self._lock = threading.RLock()
+        self._conn = None
+        self._disk_failed = False
+        self._puts = 0
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+    def _db(self):
+        # Abre o SQLite sob demanda; se falhar, o cache continua só em memória
+        if self._conn is None and self.path and not self._disk_failed:
+            try:
+                conn = sqlite3.connect(str(self.path), check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS translations ("
+                    " key TEXT PRIMARY KEY, translated TEXT NOT NULL, source_lang TEXT,"
+                    " created REAL NOT NULL, last_used REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations(last_used)")
+                conn.commit()
+                self._conn = conn
+                self._prune_disk()
+            except Exception:
+                self._disk_failed = True
+        return self._conn
+
+    def warm(self):
+        # Abre o SQLite (e faz a poda) no aquecimento, não na primeira consulta
+        with self._lock:
+            return self._db() is not None
+
+    def _expired(self, created, now):
+        return self.ttl > 0 and now - created > self.ttl
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def get(self, text, source, target, backend):
+        key = make_key(text, source, target, backend)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[2], now):
+                    self._memory.move_to_end(key)
+                    self.hits_memory += 1
+                    return entry[0], entry[1]
+                del self._memory[key]
+            db = self._db()
+            if db is not None:
+                try:
+                    row = db.execute(
+                        "SELECT translated, source_lang, created FROM translations WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row and not self._expired(row[2], now):
+                        db.execute("UPDATE translations SET last_used = ? WHERE key = ?", (now, key))
+                        db.commit()
+                        self._remember(key, (row[0], row[1] or "", row[2]))
+                        self.hits_disk += 1
+                        return row[0], row[1] or ""
+                except Exception:
+                    pass
+            self.misses += 1
+            return None
+
+    def put(self, text, source, target, backend, translated, source_lang=""):
+        if translated is None:
+            return
+        key = make_key(text, source, target, backend)
+        now = time.time()
+        with self._lock:
+            self._remember(key, (translated, source_lang or "", now))
+            db = self._db()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO translations (key, translated, source_lang, created, last_used)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, translated, source_lang or "", now, now),
+                )
+                db.commit()
+                self._puts += 1
+                if self._puts % PRUNE_EVERY == 0:
+                    self._prune_disk()
+            except Exception:
+                pass
+
+    def _prune_disk(self):
+        db = self._conn
+        if db is None:
+            return
+        try:
+            if self.ttl > 0:
+                db.execute("DELETE FROM translations WHERE created < ?", (time.time() - self.ttl,))
+            db.execute(
+                "DELETE FROM translations WHERE key IN ("
+                " SELECT key FROM translations ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.disk_max_items,),
+            )
+            db.commit()
+        except Exception:
+            pass
+
+    def invalidate(self, text, source, target, backend):
+        key = make_key(text, source, target, backend)
+        with self._lock:
+            self._memory.pop(key, None)
+            db = self._db()
+            if db is not None:
+                try:
+                    db.execute("DELETE FROM translations WHERE key = ?", (key,))
+                    db.commit()
+                except Exception:
+                    pass
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            db = self._db()
+            if db is not None:
+                try:
+                    db.execute("DELETE FROM translations")
+                    db.commit()
+                except Exception:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits_memory + self.hits_disk + self.misses
+            disk_items = None
+            if self._conn is not None:
+                try:
+                    disk_items = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+                except Exception:
+                    pass
+            return {
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "hit_rate": (self.hits_memory + self.hits_disk) / lookups if lookups else 0.0,
+                "memory_items": len(self._memory),
+                "disk_items": disk_items,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+                self._conn = None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    # Instância compartilhada do processo; None quando o cache está desligado
+    global _cache
+    if not CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = TranslationCache()
+        return _cache
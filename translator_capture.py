@@ -0,0 +1,147 @@
+import os
+import math
+import time
+import threading
+
+import numpy as np
+
+import translator_metrics as metrics
+
+# Captura de tela -> OCR sem cópias desnecessárias: o buffer BGRA do mss vira uma view NumPy
+# (zero-copy) e o pré-processamento (cinza, upscale, binarização, deskew) é todo vetorizado.
+# O resultado é um array uint8 2D entregue direto ao motor de OCR, sem PIL nem PNG no meio.
+UPSCALE_BELOW = int(os.getenv("OCR_UPSCALE_BELOW", "64"))  # regiões mais baixas que isso são ampliadas
+MAX_UPSCALE = 4
+DESKEW_MAX_ANGLE = 5.0  # graus
+DESKEW_STEP = 0.5
+DESKEW_SAMPLE = 40000  # pixels de texto amostrados para estimar o ângulo
+
+_local = threading.local()
+
+
+def _mss():
+    # mss não é thread-safe: uma instância por thread, reaproveitada entre capturas
+    sct = getattr(_local, "sct", None)
+    if sct is None:
+        import mss
+        sct = _local.sct = mss.mss()
+    return sct
+
+
+def grab(bbox):
+    # bbox: (x1, y1, x2, y2) em coordenadas de tela -> view (altura, largura, 4) BGRA sobre o buffer do mss
+    x1, y1, x2, y2 = bbox
+    left, top = min(x1, x2), min(y1, y2)
+    width, height = abs(x2 - x1), abs(y2 - y1)
+    with metrics.timer("capture"):
+        shot = _mss().grab({"left": left, "top": top, "width": width, "height": height})
+    return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+
+def to_gray(bgra):
+    # Luma BT.601 em aritmética inteira (pesos /256), sem passar por float
+    b = bgra[..., 0].astype(np.uint16)
+    g = bgra[..., 1].astype(np.uint16)
+    r = bgra[..., 2].astype(np.uint16)
+    return ((29 * b + 150 * g + 77 * r) >> 8).astype(np.uint8)
+
+
+def upscale(gray, min_height=UPSCALE_BELOW):
+    # Texto pequeno reconhece muito melhor ampliado; fator inteiro com vizinho mais próximo
+    height = gray.shape[0]
+    if height == 0 or height >= min_height:
+        return gray
+    factor = min(MAX_UPSCALE, math.ceil(min_height / height))
+    return np.repeat(np.repeat(gray, factor, axis=0), factor, axis=1)
+
+
+def otsu_threshold(gray):
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = hist.sum()
+    if total == 0:
+        return 128
+    levels = np.arange(256)
+    weight_bg = np.cumsum(hist)
+    weight_fg = total - weight_bg
+    cum_mean = np.cumsum(hist * levels)
+    mean_bg = cum_mean / np.maximum(weight_bg, 1)
+    mean_fg = (cum_mean[-1] - cum_mean) / np.maximum(weight_fg, 1)
+    between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.argmax(between))
+
+
+def binarize(gray):
+    # Otsu; se o fundo for escuro inverte para texto escuro sobre fundo claro (o que o Tesseract espera)
+    threshold = otsu_threshold(gray)
+    binary = np.where(gray > threshold, np.uint8(255), np.uint8(0))
+    if np.count_nonzero(binary) < binary.size / 2:
+        binary = 255 - binary
+    return binary
+
+
+def estimate_skew(binary):
+    # Perfil de projeção: o ângulo que deixa as linhas de texto mais "concentradas" nas linhas da imagem
+    ys, xs = np.nonzero(binary == 0)
+    if ys.size < 50:
+        return 0.0
+    if ys.size > DESKEW_SAMPLE:
+        pick = np.random.default_rng(0).choice(ys.size, DESKEW_SAMPLE, replace=False)
+        ys, xs = ys[pick], xs[pick]
+    height = binary.shape[0]
+    angles = np.arange(-DESKEW_MAX_ANGLE, DESKEW_MAX_ANGLE + DESKEW_STEP / 2, DESKEW_STEP)
+    best_angle, best_score = 0.0, -1.0
+    for angle in angles:
+        shifted = np.round(ys - xs * math.tan(math.radians(angle))).astype(np.int64)
+        shifted -= shifted.min()
+        profile = np.bincount(shifted, minlength=height)
+        score = float(np.sum(np.diff(profile.astype(np.float64)) ** 2))
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return best_angle
+
+
+def deskew(binary, angle=None):
+    # Para ângulos pequenos um cisalhamento vertical equivale à rotação e é só indexação vetorizada
+    if angle is None:
+        angle = estimate_skew(binary)
+    if abs(angle) < DESKEW_STEP / 2:
+        return binary
+    height, width = binary.shape
+    offsets = np.round(np.arange(width) * math.tan(math.radians(angle))).astype(np.int64)
+    rows = np.arange(height)[:, None] + offsets[None, :]
+    valid = (rows >= 0) & (rows < height)
+    out = np.full_like(binary, 255)
+    out[valid] = binary[rows[valid], np.broadcast_to(np.arange(width), rows.shape)[valid]]
+    return out
+
+
+def prepare(bgra, do_upscale=True, do_binarize=True, do_deskew=True):
+    # Retorna (array uint8 2D pronto para o OCR, tempos por etapa em ms)
+    timings = {}
+    start = time.perf_counter()
+    image = to_gray(bgra) if bgra.ndim == 3 else bgra
+    timings["gray"] = (time.perf_counter() - start) * 1000
+    if do_upscale:
+        start = time.perf_counter()
+        image = upscale(image)
+        timings["upscale"] = (time.perf_counter() - start) * 1000
+    if do_binarize:
+        start = time.perf_counter()
+        image = binarize(image)
+        timings["binarize"] = (time.perf_counter() - start) * 1000
+        if do_deskew:
+            start = time.perf_counter()
+            image = deskew(image)
+            timings["deskew"] = (time.perf_counter() - start) * 1000
+    for stage, ms in timings.items():
+        metrics.observe("ocr_prepare", ms, stage=stage)
+    return image, timings
+
+
+def capture_for_ocr(bbox, **options):
+    # Captura + pré-processamento em um passo; inclui o tempo da captura
+    start = time.perf_counter()
+    bgra = grab(bbox)
+    capture_ms = (time.perf_counter() - start) * 1000
+    image, timings = prepare(bgra, **options)
+    return image, dict(capture=capture_ms, **timings)
@@ -0,0 +1,391 @@
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+import multiprocessing
+from pathlib import Path
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import translator_batch as batch
+import translator_core as core
+from translator_cache import get_cache
+from translator_ratelimit import TokenBucket
+
+# Modo linha de comando: traduz arquivos, pastas e stdin (txt, jsonl, .po, .srt) com o mesmo
+# registro de backends, cache e lotes da interface. Exemplo:
+#   python translator_cli.py legendas/ -t pt -o saida/ --workers 8 --rate 20 --checkpoint job.ckpt
+FORMATS = ("txt", "jsonl", "po", "srt")
+DEFAULT_CHUNK = 50  # textos por unidade de trabalho (e por linha do checkpoint)
+
+
+# --- formatos -------------------------------------------------------------
+# Cada leitor devolve (textos, render): render(traduções) monta o arquivo de saída,
+# com traduções alinhadas a `textos` (None mantém o original).
+
+def read_txt(content, options):
+    lines = content.split("\n")
+    indices = [i for i, line in enumerate(lines) if line.strip()]
+
+    def render(translations):
+        out = list(lines)
+        for i, translated in zip(indices, translations):
+            if translated is not None:
+                out[i] = translated
+        return "\n".join(out)
+
+    return [lines[i] for i in indices], render
+
+
+def read_jsonl(content, options):
+    field = options.field
+    rows = []
+    indices = []
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        if isinstance(row, dict) and isinstance(row.get(field), str) and row[field].strip():
+            indices.append(len(rows))
+        rows.append(row)
+
+    def render(translations):
+        for i, translated in zip(indices, translations):
+            if translated is not None:
+                rows[i][options.output_field or field] = translated
+        return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+
+    return [rows[i][field] for i in indices], render
+
+
+_PO_KEYWORD = re.compile(r'^(msgctxt|msgid_plural|msgid|msgstr(?:\[\d+\])?)\s+"(.*)"\s*$')
+_PO_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\"}
+
+
+def _po_unescape(value):
+    return re.sub(r'\\(.)', lambda m: _PO_ESCAPES.get(m.group(1), m.group(0)), value)
+
+
+def _po_escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\t", "\\t").replace("\r", "\\r")
+
+
+def parse_po(content):
+    # Lista de entradas: {"comments": [...], "fields": [[chave, valor], ...]}; só o necessário para traduzir
+    entries = []
+    entry = None
+    for line in content.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            entry = None
+            continue
+        if entry is None:
+            entry = {"comments": [], "fields": []}
+            entries.append(entry)
+        if stripped.startswith("#"):
+            entry["comments"].append(line)
+            continue
+        match = _PO_KEYWORD.match(stripped)
+        if match:
+            entry["fields"].append([match.group(1), _po_unescape(match.group(2))])
+        elif stripped.startswith('"') and entry["fields"]:
+            entry["fields"][-1][1] += _po_unescape(stripped[1:-1])
+    return entries
+
+
+def render_po(entries):
+    blocks = []
+    for entry in entries:
+        lines = list(entry["comments"])
+        for key, value in entry["fields"]:
+            lines.append(f'{key} "{_po_escape(value)}"')
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks) + "\n"
+
+
+def read_po(content, options):
+    entries = parse_po(content)
+    texts = []
+    targets = []  # (entrada, chave msgstr) para cada texto
+    for entry in entries:
+        fields = dict(entry["fields"])
+        msgid = fields.get("msgid", "")
+        if not msgid:
+            continue  # cabeçalho
+        for key, value in entry["fields"]:
+            if not key.startswith("msgstr") or (value and not options.overwrite):
+                continue
+            # msgstr[0] vem do singular; as demais formas do plural
+            plural = key not in ("msgstr", "msgstr[0]") and "msgid_plural" in fields
+            texts.append(fields["msgid_plural"] if plural else msgid)
+            targets.append((entry, key))
+
+    def render(translations):
+        for (entry, key), translated in zip(targets, translations):
+            if translated is None:
+                continue
+            for field in entry["fields"]:
+                if field[0] == key:
+                    field[1] = translated
+        return render_po(entries)
+
+    return texts, render
+
+
+_SRT_TIMING = re.compile(r"^\d{1,2}:\d{2}:\d{2}[,.]\d{3}\s*-->")
+
+
+def read_srt(content, options):
+    blocks = re.split(r"\n\s*\n", content.replace("\r\n", "\n").strip("\n"))
+    cues = []
+    indices = []
+    for block in blocks:
+        lines = block.split("\n")
+        # número + tempo + texto; a linha de tempo localiza o início do texto
+        timing = next((i for i, line in enumerate(lines[:2]) if _SRT_TIMING.match(line)), None)
+        head, body = (lines[:timing + 1], lines[timing + 1:]) if timing is not None else ([], lines)
+        if body and any(line.strip() for line in body):
+            indices.append(len(cues))
+        cues.append([head, body])
+
+    def render(translations):
+        for i, translated in zip(indices, translations):
+            if translated is not None:
+                cues[i][1] = translated.split("\n")
+        return "\n\n".join("\n".join(head + body) for head, body in cues) + "\n"
+
+    return ["\n".join(cues[i][1]) for i in indices], render
+
+
+READERS = {"txt": read_txt, "jsonl": read_jsonl, "po": read_po, "srt": read_srt}
+
+
+def detect_format(path, default="txt"):
+    ext = Path(path).suffix.lower().lstrip(".")
+    return {"text": "txt", "json": "jsonl", "pot": "po"}.get(ext, ext) if ext else default
+
+
+# --- execução ---------------------------------------------------------------
+
+class Checkpoint:
+    # Arquivo JSONL só de acréscimo: uma linha por bloco concluído ({"job", "start", "out"}).
+    # Ao retomar, blocos já gravados não voltam à rede; a chave muda se o arquivo ou o destino mudar.
+    def __init__(self, path):
+        self.path = Path(path) if path else None
+        self.done = {}
+        self.lock = threading.Lock()
+        self._file = None
+        if self.path is None:
+            return
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        item = json.loads(line)
+                        self.done[(item["job"], item["start"])] = item["out"]
+                    except Exception:
+                        pass  # última linha truncada por interrupção
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def get(self, job, start):
+        return self.done.get((job, start))
+
+    def put(self, job, start, out):
+        if self._file is None:
+            return
+        with self.lock:
+            self._file.write(json.dumps({"job": job, "start": start, "out": out}, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class Stats:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.files = 0
+        self.texts = 0
+        self.chars = 0
+        self.translated = 0
+        self.resumed = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+
+    def add(self, **counts):
+        with self.lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def report(self, registry):
+        elapsed = max(1e-9, time.perf_counter() - self.start)
+        lines = [
+            f"arquivos: {self.files}  textos: {self.texts}  caracteres: {self.chars}",
+            f"traduzidos: {self.translated}  do checkpoint: {self.resumed}  falhas: {self.failed}",
+            f"tempo: {elapsed:.1f}s  {self.texts / elapsed:.1f} textos/s  {self.chars / elapsed:.0f} caracteres/s",
+        ]
+        for name, health in registry.stats().items():
+            if health["calls"]:
+                latency = f"{health['latency'] * 1000:.0f}ms" if health["latency"] is not None else "-"
+                lines.append(f"  {name}: {health['calls']} chamadas, latência {latency}, erro {health['error_rate']:.1%}")
+        return "\n".join(lines)
+
+
+def translate_texts(texts, job, args, registry, cache, pool, limiter, checkpoint, stats):
+    # Blocos de `chunk` textos no pool; no máximo 2x workers em voo para a memória ficar limitada
+    out = [None] * len(texts)
+
+    def run(start):
+        chunk = texts[start:start + args.chunk]
+        limiter.acquire(len(chunk))
+        results = batch.translate_many(chunk, args.target, registry, cache, args.source, args.backend, max_workers=1)
+        return start, [r[0] if r else None for r in results]
+
+    def collect(future):
+        try:
+            start, translated = future.result()
+        except Exception as e:
+            # Falhas contadas por texto, como os None abaixo (o bloco inteiro ficou sem tradução)
+            stats.add(failed=sum(1 for text in texts[starts[future]:starts[future] + args.chunk] if text.strip()))
+            if not args.quiet:
+                print(f"erro em {job}: {e}", file=sys.stderr)
+            return
+        out[start:start + len(translated)] = translated
+        # None para um texto com conteúdo é falha: conta e o bloco fica fora do checkpoint (repetido ao retomar)
+        missing = sum(1 for text, t in zip(texts[start:], translated) if t is None and text.strip())
+        stats.add(translated=len(translated) - missing, failed=missing)
+        if missing:
+            if not args.quiet:
+                print(f"{missing} texto(s) sem tradução em {job}", file=sys.stderr)
+            return
+        checkpoint.put(job, start, translated)
+
+    in_flight = deque()
+    starts = {}  # futuro -> início do bloco (para contar as falhas quando ele levanta exceção)
+    for start in range(0, len(texts), args.chunk):
+        saved = checkpoint.get(job, start)
+        if saved is not None:
+            out[start:start + len(saved)] = saved
+            stats.add(resumed=len(saved))
+            continue
+        future = pool.submit(run, start)
+        starts[future] = start
+        in_flight.append(future)
+        if len(in_flight) >= args.workers * 2:
+            collect(in_flight.popleft())
+    while in_flight:
+        collect(in_flight.popleft())
+    return out
+
+
+def job_key(name, content, args):
+    raw = "\x1f".join([name, hashlib.sha1(content.encode("utf-8")).hexdigest(), args.target, args.source,
+                       args.backend or "auto", str(args.chunk)])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def iter_inputs(paths):
+    # (nome, caminho ou None para stdin, raiz relativa para montar a saída)
+    for raw in paths:
+        if raw == "-":
+            yield "-", None, None
+            continue
+        path = Path(raw)
+        if path.is_dir():
+            for child in sorted(path.rglob("*")):
+                if child.is_file() and detect_format(child, "") in FORMATS:
+                    yield str(child), child, path
+        else:
+            yield raw, path, None
+
+
+def output_path(path, root, args, several):
+    if args.output and (root is not None or several):
+        relative = path.relative_to(root) if root is not None else Path(path.name)
+        return Path(args.output) / relative
+    if args.output:
+        return Path(args.output)
+    if several or root is not None:
+        return path.with_name(f"{path.stem}.{args.target}{path.suffix}")
+    return None  # arquivo único sem -o: stdout
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Tradução em lote de arquivos e stdin (sem interface).")
+    parser.add_argument("inputs", nargs="*", default=["-"], help="arquivos, pastas ou '-' para stdin")
+    parser.add_argument("-t", "--target", default="pt", help="idioma de destino (padrão: pt)")
+    parser.add_argument("-s", "--source", default="auto", help="idioma de origem (padrão: auto)")
+    parser.add_argument("-o", "--output", help="arquivo (uma entrada) ou pasta de saída")
+    parser.add_argument("-f", "--format", choices=FORMATS, help="formato (padrão: pela extensão; stdin = txt)")
+    parser.add_argument("--backend", help="força um backend (google_web, google_cloud, azure, libre, argos)")
+    parser.add_argument("--workers", type=int, default=batch.MAX_WORKERS, help="blocos traduzidos em paralelo")
+    parser.add_argument("--rate", type=float, default=0, help="máximo de textos por segundo (0 = sem limite)")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help="textos por bloco de trabalho")
+    parser.add_argument("--checkpoint", help="arquivo de progresso para retomar trabalhos interrompidos")
+    parser.add_argument("--field", default="text", help="campo traduzido no JSONL (padrão: text)")
+    parser.add_argument("--output-field", help="grava a tradução neste campo do JSONL em vez de substituir")
+    parser.add_argument("--overwrite", action="store_true", help=".po: retraduz entradas que já têm msgstr")
+    parser.add_argument("--no-cache", action="store_true", help="não usa o cache de traduções")
+    parser.add_argument("-q", "--quiet", action="store_true", help="sem progresso nem estatísticas")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.workers = max(1, args.workers)
+    args.chunk = max(1, args.chunk)
+    # Mesmos provedores das interfaces, mas sempre no próprio processo (lotes grandes não passam pelo serviço)
+    registry = core.Config.from_env(use_service=False).build_registry()
+    cache = None if args.no_cache else get_cache()
+    # Limite global do trabalho, além dos limites por backend aplicados pelo registro
+    limiter = TokenBucket(args.rate, capacity=max(args.rate, args.chunk))
+    checkpoint = Checkpoint(args.checkpoint)
+    stats = Stats()
+    inputs = list(iter_inputs(args.inputs))
+    several = len(inputs) > 1
+    pool = ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="cli")
+    try:
+        for name, path, root in inputs:
+            if path is None:
+                content = sys.stdin.read()
+                fmt = args.format or "txt"
+            else:
+                content = path.read_text(encoding="utf-8-sig")
+                fmt = args.format or detect_format(path)
+            if fmt not in READERS:
+                print(f"formato não suportado, ignorando: {name}", file=sys.stderr)
+                continue
+            texts, render = READERS[fmt](content, args)
+            stats.add(files=1, texts=len(texts), chars=sum(len(t) for t in texts))
+            if not args.quiet:
+                print(f"{name}: {len(texts)} texto(s)", file=sys.stderr)
+            translations = translate_texts(texts, job_key(name, content, args), args, registry, cache,
+                                           pool, limiter, checkpoint, stats)
+            result = render(translations)
+            target = output_path(path, root, args, several) if path is not None else (
+                Path(args.output) if args.output else None)
+            if target is None:
+                sys.stdout.write(result)
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_text(result, encoding="utf-8")
+    except KeyboardInterrupt:
+        # O checkpoint já tem os blocos concluídos; rodar de novo continua de onde parou
+        print("interrompido", file=sys.stderr)
+        return 130
+    finally:
+        pool.shutdown(wait=False)
+        checkpoint.close()
+        if not args.quiet:
+            print(stats.report(registry), file=sys.stderr)
+    return 1 if stats.failed else 0
+
+
+if __name__ == "__main__":
+    # Necessário no .exe (PyInstaller) para o worker do Argos em processo separado
+    multiprocessing.freeze_support()
+    sys.exit(main())
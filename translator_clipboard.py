@@ -1,76 +1,20 @@
-import os
+import translator_startup as startup  # primeiro: marca o início e mede as importações abaixo
+import sys
 import time
 import threading
-import json
-import pyperclip
+import multiprocessing
 import tkinter as tk
 from tkinter import ttk
-import requests
+
+import translator_history as history
+import translator_service as service
+from translator_clipwatch import ClipboardWatcher
+from translator_pipeline import ClipboardPipeline
+import translator_core as core
 
 TARGET_LANG = "pt"  # idioma de destino (ex.: 'pt', 'en', 'es')
 SHOW_SOURCE_LANG = True  # se quiser mostrar o idioma detectado
 
-AZURE_KEY = os.getenv("AZURE_TRANSLATOR_KEY")
-AZURE_REGION = os.getenv("AZURE_TRANSLATOR_REGION")
-LIBRE_URL = os.getenv("LIBRE_TRANSLATE_URL")  # ex.: https://libretranslate.com
-GOOGLE_KEY = os.getenv("GOOGLE_TRANSLATE_KEY")  # Google Cloud Translate API key (optional)
-# Usar Google Translate via web (deep-translator) por padrão para não exigir chave nem terminal
-USE_GOOGLE_WEB = True
-
-
-def translate_text(text, target_lang=TARGET_LANG):
-    text = text.strip()
-    if not text:
-        return None
-    if USE_GOOGLE_WEB:
-        # Google Translate via web (deep-translator). Não exige chave, mas depende de scraping.
-        try:
-            from deep_translator import GoogleTranslator
-            translated = GoogleTranslator(source='auto', target=target_lang).translate(text)
-            return translated, ""
-        except Exception:
-            # fallback para outras opções
-            pass
-    if GOOGLE_KEY:
-        # Google Cloud Translate (v2) using API key
-        endpoint = f"https://translation.googleapis.com/language/translate/v2?key={GOOGLE_KEY}"
-        payload = {"q": text, "target": target_lang, "format": "text", "source": ""}
-        r = requests.post(endpoint, data=payload, timeout=10)
-        r.raise_for_status()
-        data = r.json()
-        translations = data.get("data", {}).get("translations", [])
-        if translations:
-            translated = translations[0].get("translatedText", "")
-            source_lang = translations[0].get("detectedSourceLanguage", "")
-            return translated, source_lang
-        return None
-    if AZURE_KEY and AZURE_REGION:
-        # Microsoft Translator (Azure)
-        endpoint = "https://api.cognitive.microsofttranslator.com/translate"
-        params = {"api-version": "3.0", "to": [target_lang]}
-        headers = {
-            "Ocp-Apim-Subscription-Key": AZURE_KEY,
-            "Ocp-Apim-Subscription-Region": AZURE_REGION,
-            "Content-type": "application/json"
-        }
-        body = [{"text": text}]
-        r = requests.post(endpoint, params=params, headers=headers, data=json.dumps(body), timeout=10)
-        r.raise_for_status()
-        data = r.json()
-        translated = data[0]["translations"][0]["text"]
-        source_lang = data[0].get("detectedLanguage", {}).get("language", "")
-        return translated, source_lang
-    elif LIBRE_URL:
-        # LibreTranslate (sem API key por padrão; alguns servidores exigem)
-        endpoint = f"{LIBRE_URL}/translate"
-        payload = {"q": text, "source": "auto", "target": target_lang, "format": "text"}
-        r = requests.post(endpoint, data=payload, timeout=10)
-        r.raise_for_status()
-        translated = r.json().get("translatedText")
-        return translated, ""
-    else:
-        raise RuntimeError("Nenhum serviço de tradução configurado. Defina AZURE_* ou LIBRE_TRANSLATE_URL.")
-
 
 class Popup:
     def __init__(self):
@@ -99,27 +43,41 @@ class Popup:
 
 
 def monitor_clipboard(popup: Popup):
-    last = ""
-    while True:
-        try:
-            current = pyperclip.paste()
-        except Exception:
-            current = ""
-        if current and current != last:
-            try:
-                result = translate_text(current)
-                if result:
-                    translated, src = result
-                    header = f"[Idioma origem: {src}] " if (SHOW_SOURCE_LANG and src) else ""
-                    popup.show(f"{header}{translated}")
-            except Exception as e:
-                popup.show(f"Erro ao traduzir: {e}")
-            last = current
-        time.sleep(0.4)
+    engine = core.get_engine()
+
+    def on_change(current):
+        started = time.monotonic()
+
+        def on_done(result, error):
+            # Roda na thread do motor; a janela é atualizada pelo loop do Tk
+            if error is not None:
+                popup.root.after(0, popup.show, f"Erro ao traduzir: {error}")
+            elif result:
+                translated, src = result
+                header = f"[Idioma origem: {src}] " if (SHOW_SOURCE_LANG and src) else ""
+                popup.root.after(0, popup.show, f"{header}{translated}")
+                history.record(current, translated, source_lang=src, target_lang=TARGET_LANG,
+                               latency_ms=(time.monotonic() - started) * 1000, origin="clipboard")
+
+        # Tradução em segundo plano; um novo texto copiado cancela a tradução anterior
+        engine.submit(lambda: engine.translate(current, TARGET_LANG), channel="clipboard", on_done=on_done)
+
+    # Rajadas de cópias viram uma única tradução; URLs, números, código e texto já no idioma são ignorados
+    pipeline = ClipboardPipeline(on_change, target_lang=lambda: TARGET_LANG)
+    pipeline.start()
+    # Notificação nativa de mudança do clipboard quando disponível; polling adaptativo como fallback
+    ClipboardWatcher(pipeline.submit).run()
 
 
 if __name__ == "__main__":
+    # Necessário no .exe (PyInstaller) para o worker do Argos em processo separado
+    multiprocessing.freeze_support()
+    if service.SERVICE_FLAG in sys.argv:
+        # O mesmo executável também roda o serviço local de tradução
+        sys.exit(service.main())
     popup = Popup()
+    startup.mark("janela")
+    startup.warm_up(core.get_translator().warm_up_steps())
     t = threading.Thread(target=monitor_clipboard, args=(popup,), daemon=True)
     t.start()
     popup.loop()
@@ -0,0 +1,191 @@
+import os
+import sys
+import time
+import shutil
+import select
+import hashlib
+import threading
+import subprocess
+
+import translator_metrics as metrics
+
+# Observador de clipboard orientado a eventos. Usa a notificação nativa de cada sistema quando existe
+# e só lê o conteúdo quando ele mudou; polling fica apenas como fallback, com backoff quando ocioso.
+#   Windows: GetClipboardSequenceNumber (contador do sistema; não lê o conteúdo)
+#   macOS:   NSPasteboard.changeCount (pyobjc)
+#   Wayland: wl-paste --watch
+#   X11:     XFixes (python-xlib) ou o utilitário clipnotify
+POLL_MIN = float(os.getenv("CLIPBOARD_POLL_MIN", "0.25"))  # intervalo logo após uma mudança
+POLL_MAX = float(os.getenv("CLIPBOARD_POLL_MAX", "2.0"))  # intervalo máximo quando ocioso
+COUNTER_INTERVAL = 0.15  # contadores nativos são baratos, podem ser consultados com frequência
+STOP_CHECK = 0.5  # espera máxima por um evento do X antes de conferir stop()
+FORCE_POLLING = os.getenv("CLIPBOARD_POLLING", "0") == "1"
+
+
+def _default_read():
+    import pyperclip
+    return pyperclip.paste()
+
+
+def content_hash(text):
+    # Compara resumos em vez do texto inteiro (conteúdos grandes no clipboard)
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class ClipboardWatcher(threading.Thread):
+    def __init__(self, on_change, enabled=None, read=None):
+        super().__init__(daemon=True)
+        self.on_change = on_change
+        self.enabled = enabled or (lambda: True)
+        self.read = read or _default_read
+        self.strategy = None
+        self._last_hash = None
+        self._stop_event = threading.Event()
+        self._proc = None
+
+    def stop(self):
+        self._stop_event.set()
+        if self._proc is not None:
+            try:
+                self._proc.terminate()
+            except Exception:
+                pass
+
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    def check(self):
+        # Lê o clipboard e dispara on_change se o conteúdo for novo; retorna True se mudou
+        if not self.enabled():
+            return False
+        start = time.perf_counter()
+        try:
+            current = self.read()
+        except Exception:
+            current = ""
+        metrics.observe("clipboard_read", (time.perf_counter() - start) * 1000, strategy=self.strategy)
+        if not current:
+            return False
+        digest = content_hash(current)
+        if digest == self._last_hash:
+            return False
+        self._last_hash = digest
+        metrics.inc("clipboard_changes")
+        try:
+            self.on_change(current)
+        except Exception:
+            pass
+        return True
+
+    def run(self):
+        # Conteúdo já presente ao iniciar também é traduzido (como no loop antigo)
+        self.check()
+        strategies = [] if FORCE_POLLING else [
+            ("win32", self._watch_win32),
+            ("macos", self._watch_macos),
+            ("wayland", self._watch_wayland),
+            ("xfixes", self._watch_xfixes),
+            ("clipnotify", self._watch_clipnotify),
+        ]
+        for name, watch in strategies:
+            if self.stopped():
+                return
+            try:
+                if watch():
+                    return
+            except Exception:
+                # Estratégia indisponível ou quebrou: tenta a próxima
+                pass
+        self.strategy = "polling"
+        self._watch_polling()
+
+    def _watch_counter(self, read_counter):
+        last = read_counter()
+        while not self.stopped():
+            time.sleep(COUNTER_INTERVAL)
+            counter = read_counter()
+            if counter != last:
+                last = counter
+                self.check()
+        return True
+
+    def _watch_win32(self):
+        if sys.platform != "win32":
+            return False
+        import ctypes
+        user32 = ctypes.windll.user32
+        self.strategy = "win32"
+        return self._watch_counter(user32.GetClipboardSequenceNumber)
+
+    def _watch_macos(self):
+        if sys.platform != "darwin":
+            return False
+        from AppKit import NSPasteboard
+        board = NSPasteboard.generalPasteboard()
+        self.strategy = "macos"
+        return self._watch_counter(board.changeCount)
+
+    def _watch_wayland(self):
+        if not os.getenv("WAYLAND_DISPLAY") or not shutil.which("wl-paste"):
+            return False
+        # wl-paste executa o comando a cada mudança; cada linha impressa é um aviso de mudança
+        self._proc = subprocess.Popen(
+            ["wl-paste", "--watch", "echo", "changed"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+        )
+        self.strategy = "wayland"
+        for _ in self._proc.stdout:
+            if self.stopped():
+                break
+            self.check()
+        return self.stopped()
+
+    def _watch_xfixes(self):
+        if sys.platform.startswith("win") or sys.platform == "darwin" or not os.getenv("DISPLAY"):
+            return False
+        from Xlib import display
+        from Xlib.ext import xfixes
+        disp = display.Display()
+        if not disp.has_extension("XFIXES"):
+            return False
+        disp.xfixes_query_version()
+        root = disp.screen().root
+        mask = xfixes.XFixesSetSelectionOwnerNotifyMask
+        for atom_name in ("CLIPBOARD", "PRIMARY"):
+            if atom_name == "PRIMARY" and os.getenv("CLIPBOARD_WATCH_PRIMARY", "0") != "1":
+                continue
+            disp.xfixes_select_selection_input(root, disp.intern_atom(atom_name), mask)
+        self.strategy = "xfixes"
+        try:
+            while not self.stopped():
+                if not disp.pending_events():
+                    # Espera o socket do X com timeout (next_event() bloquearia sem poder parar)
+                    select.select([disp.fileno()], [], [], STOP_CHECK)
+                    continue
+                event = disp.next_event()
+                if event.type == disp.extension_event.SetSelectionOwnerNotify:
+                    self.check()
+        finally:
+            disp.close()
+        return True
+
+    def _watch_clipnotify(self):
+        if sys.platform.startswith("win") or sys.platform == "darwin" or not shutil.which("clipnotify"):
+            return False
+        self.strategy = "clipnotify"
+        while not self.stopped():
+            # clipnotify termina assim que a seleção muda
+            self._proc = subprocess.Popen(["clipnotify"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            if self._proc.wait() != 0:
+                return self.stopped()
+            self.check()
+        return True
+
+    def _watch_polling(self):
+        interval = POLL_MIN
+        while not self.stopped():
+            if self.check():
+                interval = POLL_MIN
+            else:
+                interval = min(POLL_MAX, interval * 1.5)
+            self._stop_event.wait(interval)
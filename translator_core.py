@@ -0,0 +1,164 @@
+import os
+import threading
+
+import translator_startup as startup
+import translator_backends as backends
+import translator_batch as batch
+import translator_service as service
+from translator_async import AsyncTranslator
+from translator_cache import get_cache
+
+# Núcleo de tradução compartilhado pelo launcher, pelo popup do clipboard, pelo app de OCR, pela CLI e
+# pelo benchmark: configuração dos provedores, registro de backends (cliente do serviço local ou
+# backends no próprio processo), cache, motor assíncrono e a API de tradução (um texto, lote, streaming).
+# As interfaces só cuidam da tela; cache, pool de conexões e métricas mudam aqui e valem para todas.
+DEFAULT_TARGET_LANG = "pt"
+
+
+class Config:
+    # Chaves dos provedores e modo de execução; from_env() lê as variáveis de sempre
+    def __init__(self, use_google_web=True, google_key=None, azure_key=None, azure_region=None, libre_url=None,
+                 use_service=True):
+        # Google web (deep-translator) ligado por padrão para não exigir chave nem terminal
+        self.use_google_web = use_google_web
+        self.google_key = google_key
+        self.azure_key = azure_key
+        self.azure_region = azure_region
+        self.libre_url = libre_url  # ex.: https://libretranslate.com
+        self.use_service = use_service
+
+    @classmethod
+    def from_env(cls, **overrides):
+        values = dict(
+            google_key=os.getenv("GOOGLE_TRANSLATE_KEY"),
+            azure_key=os.getenv("AZURE_TRANSLATOR_KEY"),
+            azure_region=os.getenv("AZURE_TRANSLATOR_REGION"),
+            libre_url=os.getenv("LIBRE_TRANSLATE_URL"),
+            use_service=service.SERVICE_ENABLED,
+        )
+        values.update(overrides)
+        return cls(**values)
+
+    def build_registry(self):
+        return backends.build_registry(self.use_google_web, self.google_key, self.azure_key, self.azure_region,
+                                       self.libre_url)
+
+
+class Translator:
+    # Registro, cache e motor montados sob demanda (a janela abre antes; veja translator_startup.py)
+    def __init__(self, config=None):
+        self.config = config or Config.from_env()
+        self._registry = None
+        self._engine = None
+        self._registry_lock = threading.Lock()
+        self._engine_lock = threading.Lock()
+
+    def registry(self):
+        # Cliente fino do serviço local (translator_service.py), iniciado se preciso;
+        # com TRANSLATOR_SERVICE=0 ou se ele não subir, os backends rodam neste processo
+        with self._registry_lock:
+            if self._registry is None:
+                remote = service.client_registry() if self.config.use_service else None
+                self._registry = remote or self.config.build_registry()
+            return self._registry
+
+    def uses_service(self):
+        return service.uses_service(self.registry())
+
+    def local_cache(self):
+        # Com o serviço o cache é o dele (compartilhado entre as interfaces); aqui só no modo em processo
+        return None if self.uses_service() else get_cache()
+
+    def engine(self):
+        # Motor assíncrono compartilhado (event loop em thread própria) para não travar a UI;
+        # com lock porque o aquecimento e o primeiro uso podem pedir o motor ao mesmo tempo
+        with self._engine_lock:
+            if self._engine is None:
+                self._engine = AsyncTranslator(self.registry(), self.local_cache()).start()
+            return self._engine
+
+    def translate(self, text, target_lang=DEFAULT_TARGET_LANG, source_lang="auto", use_cache=True, backend=None):
+        # (tradução, idioma_origem) ou None para texto vazio; use_cache=False força nova tradução
+        cache = self.local_cache() if use_cache else None
+        return batch.translate_one(text, target_lang, self.registry(), cache, source_lang, backend)
+
+    def translate_many(self, texts, target_lang=DEFAULT_TARGET_LANG, source_lang="auto", use_cache=True,
+                       backend=None, on_result=None):
+        # Vários textos/parágrafos em poucas requisições; resultado na mesma ordem de `texts`
+        # on_result(índice, resultado) avisa cada texto assim que ele fica pronto
+        cache = self.local_cache() if use_cache else None
+        return batch.translate_many(texts, target_lang, self.registry(), cache, source_lang, backend,
+                                    on_result=on_result)
+
+    def translate_targets(self, text, target_langs, source_lang="auto", use_cache=True, backend=None,
+                          on_result=None):
+        # Um texto para vários idiomas de uma vez: {destino: (tradução, idioma_origem)}
+        cache = self.local_cache() if use_cache else None
+        return batch.translate_targets(text, target_langs, self.registry(), cache, source_lang, backend,
+                                       on_result=on_result)
+
+    def translate_stream(self, text, target_lang=DEFAULT_TARGET_LANG, source_lang="auto", use_cache=True,
+                         backend=None):
+        # Textos grandes: gerador de (trecho_traduzido, origem) em ordem, com pedaços traduzidos em paralelo
+        cache = self.local_cache() if use_cache else None
+        return batch.translate_stream(text, target_lang, self.registry(), cache, source_lang, backend)
+
+    def warm_up_steps(self):
+        return startup.translation_steps(self.registry, self.engine, self.local_cache)
+
+    def shutdown(self):
+        with self._engine_lock:
+            engine, self._engine = self._engine, None
+        if engine is not None:
+            engine.shutdown()
+
+
+_translator = None
+_translator_lock = threading.Lock()
+
+
+def get_translator():
+    # Instância compartilhada do processo, configurada pelas variáveis de ambiente
+    global _translator
+    with _translator_lock:
+        if _translator is None:
+            _translator = Translator()
+        return _translator
+
+
+# Atalhos para a instância compartilhada (a API que as interfaces usam)
+
+def get_registry():
+    return get_translator().registry()
+
+
+def get_local_cache():
+    return get_translator().local_cache()
+
+
+def get_engine():
+    return get_translator().engine()
+
+
+def translate_text(text, target_lang=DEFAULT_TARGET_LANG, use_cache=True, backend=None):
+    return get_translator().translate(text, target_lang, use_cache=use_cache, backend=backend)
+
+
+def translate_many(texts, target_lang=DEFAULT_TARGET_LANG, use_cache=True, backend=None, on_result=None):
+    return get_translator().translate_many(texts, target_lang, use_cache=use_cache, backend=backend,
+                                           on_result=on_result)
+
+
+def translate_stream(text, target_lang=DEFAULT_TARGET_LANG, use_cache=True, backend=None):
+    return get_translator().translate_stream(text, target_lang, use_cache=use_cache, backend=backend)
+
+
+def translate_targets(text, target_langs, use_cache=True, backend=None, on_result=None):
+    return get_translator().translate_targets(text, target_langs, use_cache=use_cache, backend=backend,
+                                              on_result=on_result)
+
+
+def parse_targets(value, default=DEFAULT_TARGET_LANG):
+    # "pt, en es" -> ["pt", "en", "es"] (sem repetidos, na ordem digitada)
+    targets = [t.strip() for t in str(value or "").replace(";", ",").replace(" ", ",").split(",")]
+    return list(dict.fromkeys(t for t in targets if t and t != "auto")) or [default]
@@ -0,0 +1,214 @@
+import os
+import re
+import time
+import queue
+import atexit
+import sqlite3
+import threading
+from pathlib import Path
+
+# Histórico de traduções: SQLite só de acréscimo com índice de texto completo (FTS5). A gravação
+# é feita por uma thread própria, em lotes, para a interface nunca esperar o disco. As consultas
+# usam paginação por id (keyset), então continuam rápidas com centenas de milhares de entradas.
+HISTORY_PATH = Path(os.getenv("TRANSLATOR_HISTORY_PATH", "translation_history.sqlite3"))
+HISTORY_ENABLED = os.getenv("TRANSLATOR_HISTORY", "1") != "0"
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 0.5  # segundos que um registro pode esperar na fila antes de ir ao disco
+PAGE_SIZE = 50
+
+_COLUMNS = "id, created, source, translation, source_lang, target_lang, backend, latency_ms, origin"
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_query(text):
+    # Busca do usuário -> consulta FTS5 segura: cada palavra vira um prefixo entre aspas ("trad"*)
+    words = _WORD.findall(text or "")
+    return " ".join('"{}"*'.format(w.replace('"', '""')) for w in words)
+
+
+class HistoryStore:
+    def __init__(self, path=HISTORY_PATH):
+        self.path = Path(path)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._failed = False
+        self._fts = False
+        self._writer = None
+        self.written = 0
+
+    def _db(self):
+        if self._conn is None and not self._failed:
+            try:
+                conn = sqlite3.connect(str(self.path), check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS history ("
+                    " id INTEGER PRIMARY KEY, created REAL NOT NULL, source TEXT NOT NULL, translation TEXT NOT NULL,"
+                    " source_lang TEXT, target_lang TEXT, backend TEXT, latency_ms REAL, origin TEXT)"
+                )
+                try:
+                    # Índice externo (content=history): o texto não é duplicado, só os termos
+                    conn.execute(
+                        "CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5("
+                        " source, translation, content='history', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+                    )
+                    conn.execute(
+                        "CREATE TRIGGER IF NOT EXISTS history_ai AFTER INSERT ON history BEGIN"
+                        " INSERT INTO history_fts(rowid, source, translation) VALUES (new.id, new.source, new.translation);"
+                        " END"
+                    )
+                    self._fts = True
+                except sqlite3.OperationalError:
+                    # SQLite sem FTS5: a busca cai para LIKE (mais lenta, mas funciona)
+                    self._fts = False
+                conn.commit()
+                self._conn = conn
+            except Exception:
+                self._failed = True
+        return self._conn
+
+    def record(self, source, translation, source_lang="", target_lang="", backend="", latency_ms=None, origin=""):
+        # Não bloqueia: entra na fila e a thread de escrita grava em lote
+        if not source or not translation:
+            return
+        self._queue.put((time.time(), source, translation, source_lang or "", target_lang or "", backend or "",
+                         latency_ms, origin or ""))
+        self._ensure_writer()
+
+    def _ensure_writer(self):
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            rows, markers = [], []
+            # Junta o que chegar em seguida (até BATCH_SIZE ou FLUSH_INTERVAL) numa transação só
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while True:
+                if isinstance(item, threading.Event):
+                    markers.append(item)
+                    break  # flush(): grava já o que foi juntado
+                if item is None:
+                    self._queue.put(None)  # close(): grava o lote e encerra na próxima volta
+                    break
+                rows.append(item)
+                remaining = deadline - time.monotonic()
+                if len(rows) >= BATCH_SIZE or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if rows:
+                self._write(rows)
+            for marker in markers:
+                marker.set()
+
+    def _write(self, rows):
+        with self._lock:
+            db = self._db()
+            if db is None:
+                return
+            try:
+                db.executemany(
+                    "INSERT INTO history (created, source, translation, source_lang, target_lang, backend, latency_ms,"
+                    " origin) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                db.commit()
+                self.written += len(rows)
+            except Exception:
+                db.rollback()
+
+    def flush(self, timeout=5.0):
+        # Espera a thread de escrita gravar tudo o que já estava na fila (ex.: antes de consultar ou ao sair)
+        if self._writer is None:
+            return
+        marker = threading.Event()
+        self._queue.put(marker)
+        marker.wait(timeout)
+
+    def search(self, text="", limit=PAGE_SIZE, before_id=None):
+        # Página de resultados, do mais recente para o mais antigo. Próxima página: before_id = último id recebido.
+        # Cada item: dict com id, created, source, translation, source_lang, target_lang, backend, latency_ms, origin
+        with self._lock:
+            db = self._db()
+            if db is None:
+                return []
+            params = []
+            where = []
+            if before_id is not None:
+                where.append("h.id < ?")
+                params.append(before_id)
+            query = fts_query(text)
+            if query and self._fts:
+                sql = (f"SELECT {', '.join('h.' + c.strip() for c in _COLUMNS.split(','))} FROM history_fts"
+                       " JOIN history h ON h.id = history_fts.rowid WHERE history_fts MATCH ?")
+                params.insert(0, query)
+                if where:
+                    sql += " AND " + " AND ".join(where)
+            else:
+                sql = f"SELECT {_COLUMNS} FROM history h"
+                if text and text.strip():
+                    where.append("(h.source LIKE ? OR h.translation LIKE ?)")
+                    params += [f"%{text.strip()}%"] * 2
+                if where:
+                    sql += " WHERE " + " AND ".join(where)
+            sql += " ORDER BY h.id DESC LIMIT ?"
+            params.append(limit)
+            try:
+                rows = db.execute(sql, params).fetchall()
+            except Exception:
+                return []
+        names = [c.strip() for c in _COLUMNS.split(",")]
+        return [dict(zip(names, row)) for row in rows]
+
+    def count(self):
+        with self._lock:
+            db = self._db()
+            if db is None:
+                return 0
+            try:
+                return db.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+            except Exception:
+                return 0
+
+    def close(self):
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join(timeout=5)
+            self._writer = None
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+                self._conn = None
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_history():
+    # Instância compartilhada do processo; None quando o histórico está desligado
+    global _history
+    if not HISTORY_ENABLED:
+        return None
+    with _history_lock:
+        if _history is None:
+            _history = HistoryStore()
+            atexit.register(_history.close)  # grava o que ainda estiver na fila
+        return _history
+
+
+def record(source, translation, **meta):
+    history = get_history()
+    if history is not None:
+        history.record(source, translation, **meta)
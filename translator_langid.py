@@ -0,0 +1,180 @@
+import os
+import re
+import math
+import threading
+from collections import Counter
+
+# Identificação local de idioma (sem rede): perfis de trigramas de caracteres + stopwords para
+# idiomas de escrita latina e detecção por sistema de escrita para os demais.
+# Usada antes da tradução para pular textos que já estão no idioma de destino, passar a origem
+# explícita aos backends e preencher o "[Idioma origem: ...]" quando o backend não informa.
+MIN_CONFIDENCE = float(os.getenv("LANGID_MIN_CONFIDENCE", "0.8"))
+MIN_LETTERS = 12  # abaixo disso a detecção não é confiável
+
+# Amostras pequenas por idioma; suficientes para perfis de trigramas de textos do dia a dia
+SAMPLES = {
+    "pt": (
+        "Olá, tudo bem? Obrigado pela mensagem, vou verificar o pedido e te retorno ainda hoje. "
+        "A reunião foi adiada para amanhã de manhã porque o cliente não conseguiu acessar o sistema. "
+        "Não se esqueça de enviar o relatório até sexta-feira, ele é importante para a apresentação. "
+        "Você pode me ajudar com essa configuração? Não consigo encontrar a opção de exportação. "
+        "O pagamento foi aprovado e a nota fiscal será emitida em até dois dias úteis. "
+        "Estamos trabalhando na correção do problema e avisaremos quando a atualização estiver disponível. "
+        "Segue em anexo a planilha com as informações que você pediu na última conversa."
+    ),
+    "en": (
+        "Hello, how are you? Thanks for your message, I will check the order and get back to you today. "
+        "The meeting was moved to tomorrow morning because the customer could not access the system. "
+        "Please remember to send the report by Friday, it is important for the presentation. "
+        "Could you help me with this setting? I cannot find the export option anywhere. "
+        "The payment has been approved and the invoice will be issued within two business days. "
+        "We are working on a fix for the issue and will let you know when the update is available. "
+        "Attached is the spreadsheet with the information you asked for in our last conversation."
+    ),
+    "es": (
+        "Hola, ¿qué tal? Gracias por tu mensaje, voy a revisar el pedido y te respondo hoy mismo. "
+        "La reunión se pasó a mañana por la mañana porque el cliente no pudo acceder al sistema. "
+        "No olvides enviar el informe antes del viernes, es importante para la presentación. "
+        "¿Puedes ayudarme con esta configuración? No encuentro la opción de exportación. "
+        "El pago fue aprobado y la factura se emitirá en un plazo de dos días hábiles. "
+        "Estamos trabajando en la corrección del problema y avisaremos cuando la actualización esté disponible. "
+        "Adjunto la hoja de cálculo con la información que pediste en nuestra última conversación."
+    ),
+    "fr": (
+        "Bonjour, comment allez-vous ? Merci pour votre message, je vais vérifier la commande et je reviens vers vous. "
+        "La réunion a été reportée à demain matin parce que le client n'a pas pu accéder au système. "
+        "N'oubliez pas d'envoyer le rapport avant vendredi, il est important pour la présentation. "
+        "Pouvez-vous m'aider avec ce réglage ? Je ne trouve pas l'option d'exportation. "
+        "Le paiement a été approuvé et la facture sera émise dans un délai de deux jours ouvrables. "
+        "Nous travaillons sur une correction du problème et nous vous préviendrons quand la mise à jour sera disponible."
+    ),
+    "de": (
+        "Hallo, wie geht es dir? Danke für deine Nachricht, ich prüfe die Bestellung und melde mich heute noch. "
+        "Das Meeting wurde auf morgen früh verschoben, weil der Kunde nicht auf das System zugreifen konnte. "
+        "Bitte denk daran, den Bericht bis Freitag zu schicken, er ist wichtig für die Präsentation. "
+        "Kannst du mir bei dieser Einstellung helfen? Ich finde die Exportoption nicht. "
+        "Die Zahlung wurde genehmigt und die Rechnung wird innerhalb von zwei Werktagen ausgestellt. "
+        "Wir arbeiten an einer Lösung für das Problem und sagen Bescheid, sobald das Update verfügbar ist."
+    ),
+    "it": (
+        "Ciao, come stai? Grazie per il messaggio, controllo l'ordine e ti rispondo oggi stesso. "
+        "La riunione è stata spostata a domani mattina perché il cliente non è riuscito ad accedere al sistema. "
+        "Non dimenticare di inviare il rapporto entro venerdì, è importante per la presentazione. "
+        "Puoi aiutarmi con questa impostazione? Non trovo l'opzione di esportazione. "
+        "Il pagamento è stato approvato e la fattura sarà emessa entro due giorni lavorativi. "
+        "Stiamo lavorando alla correzione del problema e vi avviseremo quando l'aggiornamento sarà disponibile."
+    ),
+}
+
+# Palavras muito frequentes; reforçam o perfil de trigramas em textos curtos
+STOPWORDS = {
+    "pt": set("o a os as e é de do da dos das em no na nos nas um uma que não para com por se ao mais como mas "
+              "ou já também isso essa esse você está são foi pelo pela muito quando seu sua".split()),
+    "en": set("the and of to is in that it for you was with on as have be at this are from or by not but "
+              "what all were we when your can there an which their will would if has they".split()),
+    "es": set("el la los las y es de del en un una que no para con por se al más como pero o ya también "
+              "eso esta este usted está son fue muy cuando su sus lo le hay".split()),
+    "fr": set("le la les et est de des du en un une que ne pas pour avec par se au plus comme mais ou nous vous "
+              "il elle sont été dans sur ce cette qui".split()),
+    "de": set("der die das und ist von zu den mit sich des auf für nicht ein eine als auch es an er wir ich "
+              "sie dem wird bei oder aus".split()),
+    "it": set("il lo la gli le e è di del della in un una che non per con da si al più come ma o anche questo "
+              "sono stato nel alla".split()),
+}
+
+# Sistemas de escrita que identificam o idioma quase sozinhos
+_SCRIPTS = (
+    ("ja", re.compile(r"[぀-ヿ]")),
+    ("ko", re.compile(r"[가-힯]")),
+    ("zh", re.compile(r"[一-鿿]")),
+    ("ru", re.compile(r"[Ѐ-ӿ]")),
+    ("ar", re.compile(r"[؀-ۿ]")),
+    ("he", re.compile(r"[֐-׿]")),
+    ("el", re.compile(r"[Ͱ-Ͽ]")),
+    ("hi", re.compile(r"[ऀ-ॿ]")),
+    ("th", re.compile(r"[฀-๿]")),
+)
+_WORD_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+_profiles = None
+_profiles_lock = threading.Lock()
+
+
+def _trigrams(words):
+    for word in words:
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            yield padded[i:i + 3]
+
+
+def _build_profiles():
+    # log-probabilidades suavizadas (add-one) por trigrama, por idioma
+    global _profiles
+    with _profiles_lock:
+        if _profiles is None:
+            profiles = {}
+            for lang, sample in SAMPLES.items():
+                counts = Counter(_trigrams(w.lower() for w in _WORD_RE.findall(sample)))
+                total = sum(counts.values())
+                vocab = len(counts) + 1
+                profiles[lang] = (
+                    {gram: math.log((n + 1) / (total + vocab)) for gram, n in counts.items()},
+                    math.log(1 / (total + vocab)),
+                )
+            _profiles = profiles
+    return _profiles
+
+
+def warm():
+    # Monta os perfis fora do caminho da primeira tradução (fase de aquecimento das interfaces)
+    return len(_build_profiles())
+
+
+def _script_language(text):
+    letters = [c for c in text if c.isalpha()]
+    if not letters:
+        return None
+    for lang, pattern in _SCRIPTS:
+        if len(pattern.findall(text)) / len(letters) > 0.3:
+            return lang
+    return None
+
+
+def detect(text):
+    # Retorna (idioma, confiança 0..1) ou (None, 0.0) quando não há letras suficientes
+    text = text[:4000]
+    script_lang = _script_language(text)
+    if script_lang:
+        return script_lang, 0.99
+    words = [w.lower() for w in _WORD_RE.findall(text)]
+    if sum(len(w) for w in words) < MIN_LETTERS:
+        return None, 0.0
+    profiles = _build_profiles()
+    grams = list(_trigrams(words))
+    scores = {}
+    for lang, (logp, unseen) in profiles.items():
+        score = sum(logp.get(g, unseen) for g in grams) / len(grams)
+        # Cada stopword vale como um trigrama muito provável daquele idioma
+        hits = sum(1 for w in words if w in STOPWORDS[lang])
+        scores[lang] = score + 2.0 * hits / len(words)
+    ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+    best, best_score = ranked[0]
+    margin = best_score - ranked[1][1]
+    # Margem média por trigrama -> confiança; textos curtos ficam naturalmente menos confiantes
+    confidence = 1 - math.exp(-margin * 4 * min(1.0, len(grams) / 30))
+    return best, round(confidence, 3)
+
+
+def confident_language(text, min_confidence=MIN_CONFIDENCE):
+    lang, confidence = detect(text)
+    return lang if lang and confidence >= min_confidence else None
+
+
+def route(text, target_lang, source_lang="auto"):
+    # Decide como traduzir: (origem_para_o_backend, idioma_detectado, já_está_no_destino)
+    if source_lang and source_lang != "auto":
+        return source_lang, source_lang, source_lang == target_lang
+    detected = confident_language(text)
+    if detected is None:
+        return "auto", "", False
+    return detected, detected, detected == target_lang
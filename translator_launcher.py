@@ -1,18 +1,28 @@
+import translator_startup as startup  # primeiro: marca o início e mede as importações abaixo
 import os
 import json
-import threading
 import time
+import threading
+import multiprocessing
 from pathlib import Path
 import subprocess
 import sys
 
 import flet as ft
-import pyperclip
-from PIL import Image, ImageDraw
 
-from translator_clipboard import translate_text
+import translator_history as history
+from translator_settings import open_settings
+import translator_metrics as metrics
+from translator_clipwatch import ClipboardWatcher
+from translator_pipeline import ClipboardPipeline
 
 SETTINGS_PATH = Path("launcher_settings.json")
+METRICS_EXPORT = Path("translator_metrics")  # + .json / .prom ao exportar pelo painel de estatísticas
+STATS_REFRESH = 2.0  # segundos entre atualizações do painel de estatísticas aberto
+HISTORY_DEBOUNCE = 0.25  # segundos sem digitar antes de buscar no histórico
+# Colagens maiores que isso são traduzidas em streaming, com a saída aparecendo aos poucos
+STREAM_MIN_CHARS = int(os.getenv("TRANSLATOR_STREAM_MIN_CHARS", "2000"))
+STREAM_REFRESH = 0.2  # segundos entre atualizações da tela durante o streaming
 
 
 def load_settings():
@@ -24,59 +34,62 @@ def load_settings():
         "paused": False,
         "default_ui": "flet",
     }
-    if SETTINGS_PATH.exists():
-        try:
-            with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
-                s = json.load(f)
-            default.update(s)
-        except Exception:
-            pass
-    return default
-
+    # Estado em memória; o arquivo é regravado em segundo plano (veja translator_settings.py)
+    return open_settings(SETTINGS_PATH, default)
 
-def save_settings(s):
-    try:
-        with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
-            json.dump(s, f, ensure_ascii=False, indent=2)
-    except Exception:
-        pass
 
-
-class ClipboardMonitor(threading.Thread):
-    def __init__(self, page, settings, on_new_text):
-        super().__init__(daemon=True)
+class ClipboardMonitor(ClipboardWatcher):
+    def __init__(self, page, settings, on_new_text, target_lang=None, on_skip=None):
+        # Observador -> pipeline (debounce/coalesce/filtros) -> on_new_text na thread da UI
+        self.pipeline = ClipboardPipeline(
+            lambda text: self._call_ui(lambda: on_new_text(text)),
+            target_lang=target_lang,
+            on_skip=(lambda text, reason: self._call_ui(lambda: on_skip(text, reason))) if on_skip else None,
+        )
+        super().__init__(
+            self.pipeline.submit,
+            enabled=lambda: not settings.get("paused") and settings.get("auto_clipboard"),
+        )
         self.page = page
         self.settings = settings
         self.on_new_text = on_new_text
-        self._last = ""
-        self._stop = threading.Event()
 
-    def run(self):
-        while not self._stop.is_set():
-            if not self.settings.get("paused") and self.settings.get("auto_clipboard"):
-                try:
-                    current = pyperclip.paste()
-                except Exception:
-                    current = ""
-                if current and current != self._last:
-                    self._last = current
-                    # Call UI thread safely
-                    try:
-                        self.page.add_thread_safe_callback(lambda: self.on_new_text(current))
-                    except Exception:
-                        # older flet versions may not have add_thread_safe_callback
-                        try:
-                            self.page.call_from_thread(lambda: self.on_new_text(current))
-                        except Exception:
-                            pass
-            time.sleep(0.45)
+    def _call_ui(self, fn):
+        # Call UI thread safely
+        queued = time.perf_counter()
+
+        def timed():
+            # Atraso entre a thread do clipboard e a UI começar a tratar o texto
+            metrics.observe("ui_dispatch", (time.perf_counter() - queued) * 1000)
+            fn()
+
+        try:
+            self.page.add_thread_safe_callback(timed)
+        except Exception:
+            # older flet versions may not have add_thread_safe_callback
+            try:
+                self.page.call_from_thread(timed)
+            except Exception:
+                pass
+
+    def start(self):
+        self.pipeline.start()
+        super().start()
 
     def stop(self):
-        self._stop.set()
+        super().stop()
+        self.pipeline.stop()
+
+
+def core():
+    # translator_core (backends, serviço, motor) é importado no aquecimento, depois da janela aparecer
+    import translator_core
+    return translator_core
 
 
 def create_tray_icon(app):
     # Create a tiny monochrome icon in memory to avoid external assets
+    from PIL import Image, ImageDraw
     img = Image.new("RGBA", (64, 64), (0, 0, 0, 0))
     d = ImageDraw.Draw(img)
     d.rectangle((8, 8, 56, 56), fill=(30, 144, 255, 255))
@@ -108,6 +121,13 @@ def main(page: ft.Page):
     # Make text fields constrained and scrollable to avoid UI collapse on large paste
     input_field = ft.TextField(label="Texto de entrada", multiline=True, min_lines=3, max_lines=12, expand=True)
     output_field = ft.TextField(label="Tradução", multiline=True, read_only=True, min_lines=3, max_lines=12, expand=True)
+    # Vários idiomas de uma vez: uma coluna por destino, lado a lado, preenchida conforme cada um chega
+    multi_switch = ft.Switch(label="Vários idiomas", value=settings.get("multi_target", False))
+    multi_field = ft.TextField(label="Idiomas (ex.: pt, en, es)", value=settings.get("multi_targets", "pt, en, es"),
+                               width=220, dense=True, visible=bool(multi_switch.value))
+    multi_output = ft.Row([], expand=True, vertical_alignment=ft.CrossAxisAlignment.START,
+                          visible=bool(multi_switch.value))
+    output_field.visible = not multi_switch.value
 
     font_size_slider = ft.Slider(value=settings.get("font_size", 14), min=12, max=28, divisions=8, label="Tamanho da fonte")
 
@@ -115,15 +135,30 @@ def main(page: ft.Page):
         size = int(font_size_slider.value)
         input_field.style = ft.TextStyle(size=size)
         output_field.style = ft.TextStyle(size=size)
+        for box in multi_output.controls:
+            box.style = ft.TextStyle(size=size)
         status.style = ft.TextStyle(size=max(10, size-2))
         settings["font_size"] = size
-        save_settings(settings)
         page.update()
 
     font_size_slider.on_change = lambda e: apply_font_size()
 
     auto_checkbox = ft.Checkbox(label="Auto-colar (monitorar clipboard)", value=settings.get("auto_clipboard", True))
 
+    def submit(job, on_done):
+        # O motor é obtido fora do handler: na primeira vez (ou com o aquecimento segurando o registro)
+        # get_engine() pode esperar o serviço local subir, e a janela não pode congelar por isso.
+        # Canal único: um clique/cópia mais recente cancela a tradução anterior ainda em andamento
+        def work():
+            try:
+                engine = core().get_engine()
+            except Exception as err:
+                on_done(None, err)
+                return
+            engine.submit(lambda: job(engine), channel="launcher", on_done=on_done)
+
+        threading.Thread(target=work, daemon=True).start()
+
     def on_translate_click(e=None):
         text = input_field.value or ""
         if not text.strip():
@@ -133,17 +168,133 @@ def main(page: ft.Page):
             return
         status.value = "Traduzindo..."
         page.update()
-        try:
-            translated, src = translate_text(text, target_dropdown.value if target_dropdown.value != "auto" else "pt")
-            header = f"[Idioma origem: {src}]\n" if src else ""
-            output_field.value = f"{header}{translated}"
+        if multi_switch.value:
+            translate_targets(text)
+            return
+        target = target_dropdown.value if target_dropdown.value != "auto" else "pt"
+        started = time.monotonic()
+        used = {"backend": ""}
+
+        async def on_progress(stage, backend):
+            if stage == "done" and backend:
+                used["backend"] = backend
+                status.value = f"Pronto ({backend})"
+
+        async def stream_job(engine):
+            # Texto grande: output_field vai sendo preenchido na ordem, sem esperar o documento inteiro
+            parts = []
+            last = [time.monotonic()]
+
+            def flush():
+                output_field.value = "".join(parts)
+                try:
+                    page.update()
+                except Exception:
+                    pass
+
+            def on_chunk(piece, src):
+                parts.append(piece)
+                if time.monotonic() - last[0] >= STREAM_REFRESH:
+                    last[0] = time.monotonic()
+                    status.value = f"Traduzindo... {len(parts)} trecho(s)"
+                    flush()
+
+            output_field.value = ""
+            used["backend"] = "stream"
+            src = await engine.translate_stream(text, target, on_chunk)
             status.value = "Pronto"
-        except Exception as err:
-            status.value = "Erro"
-            page.snack_bar = ft.SnackBar(ft.Text(f"Erro ao traduzir: {err}"))
-            page.snack_bar.open = True
+            return "".join(parts).strip(), src
+
+        async def job(engine):
+            if len(text) > STREAM_MIN_CHARS:
+                return await stream_job(engine)
+            if "\n\n" in text.strip():
+                # Colagem com vários parágrafos: segmentos em lote e em paralelo
+                used["backend"] = "lote"
+                return (await engine.translate_many([text], target))[0]
+            return await engine.translate(text, target, on_progress=on_progress)
+
+        def on_done(result, err):
+            # Roda na thread do motor assíncrono; page.update() do Flet aceita chamadas de outras threads
+            if err is not None:
+                status.value = "Erro"
+                page.snack_bar = ft.SnackBar(ft.Text(f"Erro ao traduzir: {err}"))
+                page.snack_bar.open = True
+            elif result:
+                translated, src = result
+                header = f"[Idioma origem: {src}]\n" if src else ""
+                output_field.value = f"{header}{translated}"
+                if status.value == "Traduzindo...":
+                    status.value = "Pronto"
+                history.record(text, translated, source_lang=src, target_lang=target, backend=used["backend"],
+                               latency_ms=(time.monotonic() - started) * 1000, origin="launcher")
+            try:
+                page.update()
+            except Exception:
+                pass
+
+        submit(job, on_done)
+
+    def translate_targets(text):
+        # Um pedido para todos os idiomas (uma requisição no Azure, em paralelo nos outros backends);
+        # cada coluna é preenchida assim que o seu idioma fica pronto
+        targets = core().parse_targets(multi_field.value)
+        size = int(font_size_slider.value)
+        boxes = {lang: ft.TextField(label=lang, value="...", multiline=True, read_only=True, min_lines=3, max_lines=12,
+                                    expand=True, style=ft.TextStyle(size=size)) for lang in targets}
+        multi_output.controls = list(boxes.values())
+        page.update()
+        started = time.monotonic()
+
+        def on_result(lang, result):
+            # Thread do executor; page.update() do Flet aceita chamadas de outras threads
+            translated, src = result
+            boxes[lang].value = translated
+            boxes[lang].label = f"{lang} (origem: {src})" if src else lang
+            try:
+                page.update()
+            except Exception:
+                pass
+
+        async def job(engine):
+            return await engine.translate_targets(text, targets, on_result=on_result)
+
+        def on_done(results, err):
+            if err is not None:
+                status.value = "Erro"
+                page.snack_bar = ft.SnackBar(ft.Text(f"Erro ao traduzir: {err}"))
+                page.snack_bar.open = True
+            else:
+                latency = (time.monotonic() - started) * 1000
+                for lang in targets:
+                    if lang not in results:
+                        boxes[lang].value = "Falhou."
+                        continue
+                    translated, src = results[lang]
+                    history.record(text, translated, source_lang=src, target_lang=lang, backend="multi",
+                                   latency_ms=latency, origin="launcher")
+                status.value = f"Pronto ({len(results)}/{len(targets)} idiomas)"
+            try:
+                page.update()
+            except Exception:
+                pass
+
+        submit(job, on_done)
+
+    def on_multi_change(e=None):
+        multi = bool(multi_switch.value)
+        settings["multi_target"] = multi
+        multi_field.visible = multi_output.visible = multi
+        output_field.visible = not multi
         page.update()
 
+    def on_multi_targets(e=None):
+        settings["multi_targets"] = ", ".join(core().parse_targets(multi_field.value))
+
+    multi_switch.on_change = on_multi_change
+    multi_field.on_blur = on_multi_targets
+    multi_field.on_submit = on_multi_targets
+
     translate_button = ft.Button("Traduzir (Ctrl+Enter)", on_click=on_translate_click)
 
     def on_new_clipboard(text: str):
@@ -156,8 +307,16 @@ def main(page: ft.Page):
             page.snack_bar.open = True
         page.update()
 
+    def on_skipped_clipboard(text: str, reason: str):
+        # Conteúdo que não vale traduzir (URL, número, código, já no idioma...) só aparece na entrada
+        input_field.value = text
+        status.value = f"Ignorado ({reason})"
+        page.update()
+
     # Start clipboard monitor thread
-    monitor = ClipboardMonitor(page, settings, on_new_clipboard)
+    monitor = ClipboardMonitor(page, settings, on_new_clipboard,
+                               target_lang=lambda: None if multi_switch.value else target_dropdown.value,
+                               on_skip=on_skipped_clipboard)
     monitor.start()
 
     # --- UI switching helpers ---
@@ -182,7 +341,6 @@ def main(page: ft.Page):
 
     def set_default_ui(value: str):
         settings["default_ui"] = value
-        save_settings(settings)
         page.snack_bar = ft.SnackBar(ft.Text(f"Padrão salvo: {value}"))
         page.snack_bar.open = True
         page.update()
@@ -191,6 +349,8 @@ def main(page: ft.Page):
         other = settings.get("default_ui", "flet")
         # if default is flet, switch to tk, else to flet
         target = "translator_clipboard.py" if other == "flet" else Path(__file__).name
+        # O outro processo lê o arquivo: grava agora o que ainda estiver pendente
+        settings.flush()
         try:
             subprocess.Popen([sys.executable, str(Path(__file__).parent / target)], creationflags=0x00000008)
         except Exception:
@@ -208,7 +368,6 @@ def main(page: ft.Page):
     def toggle_theme(e):
         settings["theme"] = "dark" if page.theme_mode == ft.ThemeMode.LIGHT else "light"
         page.theme_mode = ft.ThemeMode.DARK if page.theme_mode == ft.ThemeMode.LIGHT else ft.ThemeMode.LIGHT
-        save_settings(settings)
         page.update()
 
     # Theme toggle button (text-based for maximum compatibility)
@@ -216,23 +375,20 @@ def main(page: ft.Page):
 
     def on_auto_change(e):
         settings["auto_clipboard"] = auto_checkbox.value
-        save_settings(settings)
 
     auto_checkbox.on_change = on_auto_change
 
     def on_pause_resume(e):
-        settings["paused"] = not settings.get("paused", False)
-        save_settings(settings)
-        status.value = "Pausado" if settings["paused"] else "Pronto"
+        paused = settings.toggle("paused")
+        status.value = "Pausado" if paused else "Pronto"
         page.update()
 
     pause_button = ft.Button("Pausar/Retomar (Tray)", on_click=on_pause_resume)
 
     # Tray (pystray) integration (runs isolated)
-    try:
-        import pystray
-
-        def tray_thread():
+    def tray_thread():
+        try:
+            import pystray  # na thread da bandeja: não atrasa a janela
             icon_image = create_tray_icon(None)
 
             def on_quit(icon, item):
@@ -244,14 +400,13 @@ def main(page: ft.Page):
                     pass
 
             def on_toggle(icon, item):
-                settings["paused"] = not settings.get("paused", False)
-                save_settings(settings)
+                paused = settings.toggle("paused")
                 # update UI from main thread
                 try:
-                    page.add_thread_safe_callback(lambda: setattr(status, "value", "Pausado" if settings["paused"] else "Pronto"))
+                    page.add_thread_safe_callback(lambda: setattr(status, "value", "Pausado" if paused else "Pronto"))
                 except Exception:
                     try:
-                        page.call_from_thread(lambda: setattr(status, "value", "Pausado" if settings["paused"] else "Pronto"))
+                        page.call_from_thread(lambda: setattr(status, "value", "Pausado" if paused else "Pronto"))
                     except Exception:
                         pass
 
@@ -261,12 +416,147 @@ def main(page: ft.Page):
             )
             icon = pystray.Icon("tradutor", icon_image, "Tradutor", menu)
             icon.run()
+        except Exception:
+            # tray optional; ignore failures
+            pass
+
+    threading.Thread(target=tray_thread, daemon=True).start()
+
+    # --- Histórico: busca de texto completo, uma página por vez (consulta fora da thread da UI) ---
+    history_search = ft.TextField(label="Buscar no histórico", dense=True, expand=True)
+    history_list = ft.ListView(height=180, spacing=2)
+    history_more = ft.TextButton("Carregar mais", visible=False)
+    history_state = {"query": "", "before": None, "seq": 0, "pending": None, "due": 0.0, "worker": None}
+    # Um lock para o estado e a lista; a condição acorda a thread única de busca
+    history_lock = threading.Lock()
+    history_wake = threading.Condition(history_lock)
+
+    def open_entry(entry):
+        input_field.value = entry["source"]
+        header = f"[Idioma origem: {entry['source_lang']}]\n" if entry["source_lang"] else ""
+        output_field.value = f"{header}{entry['translation']}"
+        page.update()
 
-        t = threading.Thread(target=tray_thread, daemon=True)
-        t.start()
-    except Exception:
-        # tray optional; ignore failures
-        pass
+    def history_tile(entry):
+        when = time.strftime("%d/%m %H:%M", time.localtime(entry["created"]))
+        return ft.ListTile(
+            dense=True,
+            title=ft.Text(entry["source"][:120].replace("\n", " "), max_lines=1),
+            subtitle=ft.Text(f"{when} · {entry['target_lang']} · {entry['translation'][:80]}".replace("\n", " "),
+                             max_lines=1, size=11),
+            on_click=lambda e: open_entry(entry),
+        )
+
+    def history_worker():
+        # Thread única: só a busca mais recente roda, depois do debounce; resultados antigos são descartados
+        while True:
+            with history_wake:
+                while history_state["pending"] is None or time.monotonic() < history_state["due"]:
+                    timeout = None if history_state["pending"] is None else history_state["due"] - time.monotonic()
+                    history_wake.wait(timeout)
+                seq, query, before, reset = history_state["pending"]
+                history_state["pending"] = None
+            store = history.get_history()
+            try:
+                store.flush()
+                entries = store.search(query, history.PAGE_SIZE, before_id=before)
+            except Exception:
+                continue
+            with history_lock:
+                if seq != history_state["seq"]:
+                    continue  # outra busca começou depois desta
+                if reset:
+                    history_list.controls.clear()
+                history_list.controls.extend(history_tile(entry) for entry in entries)
+                if entries:
+                    history_state["before"] = entries[-1]["id"]
+                history_more.visible = len(entries) == history.PAGE_SIZE
+                try:
+                    page.update()
+                except Exception:
+                    pass
+
+    def load_history(reset=True, delay=0.0):
+        if history.get_history() is None:
+            return
+        with history_wake:
+            if reset:
+                history_state["query"] = history_search.value or ""
+                history_state["before"] = None
+            history_state["seq"] += 1
+            history_state["pending"] = (history_state["seq"], history_state["query"], history_state["before"], reset)
+            history_state["due"] = time.monotonic() + delay
+            if history_state["worker"] is None:
+                history_state["worker"] = threading.Thread(target=history_worker, name="history-search", daemon=True)
+                history_state["worker"].start()
+            history_wake.notify()
+
+    history_search.on_submit = lambda e: load_history()
+    history_search.on_change = lambda e: load_history(delay=HISTORY_DEBOUNCE)
+    history_more.on_click = lambda e: load_history(reset=False)
+    history_refresh = ft.TextButton("Atualizar", on_click=lambda e: load_history())
+
+    # --- Estatísticas: percentis por etapa (neste processo e no serviço local), atualizados enquanto abertos ---
+    stats_text = ft.Text("", selectable=True, font_family="monospace", size=11)
+    stats_panel = ft.Column([stats_text], visible=False)
+    stats_state = {"open": False}
+
+    def collect_stats():
+        snapshots = {"launcher": metrics.get_metrics().snapshot()}
+        if core().get_translator().uses_service():
+            import translator_service as service
+            snapshots["service"] = service.fetch_metrics()
+        return snapshots
+
+    def render_stats():
+        snapshots = collect_stats()
+        parts = []
+        for process, snapshot in snapshots.items():
+            body = metrics.format_table(snapshot) if snapshot else "Indisponível."
+            parts.append(f"== {process} ==\n{body}")
+        stats_text.value = "\n\n".join(parts)
+        try:
+            page.update()
+        except Exception:
+            pass
+
+    def stats_loop():
+        while stats_state["open"]:
+            render_stats()
+            time.sleep(STATS_REFRESH)
+
+    def toggle_stats(e):
+        stats_state["open"] = not stats_state["open"]
+        stats_panel.visible = stats_state["open"]
+        page.update()
+        if stats_state["open"]:
+            threading.Thread(target=stats_loop, daemon=True).start()
+
+    def export_stats(kind):
+        def work():
+            merged = metrics.merge(collect_stats())
+            path = METRICS_EXPORT.with_suffix(".prom" if kind == "prometheus" else ".json")
+            try:
+                if kind == "prometheus":
+                    path.write_text(metrics.to_prometheus(merged), encoding="utf-8")
+                else:
+                    path.write_text(json.dumps(merged, ensure_ascii=False, indent=2), encoding="utf-8")
+                page.snack_bar = ft.SnackBar(ft.Text(f"Métricas salvas em {path.resolve()}"))
+            except Exception as err:
+                page.snack_bar = ft.SnackBar(ft.Text(f"Falha ao salvar métricas: {err}"))
+            page.snack_bar.open = True
+            try:
+                page.update()
+            except Exception:
+                pass
+
+        threading.Thread(target=work, daemon=True).start()
+
+    stats_panel.controls.append(ft.Row([
+        ft.TextButton("Exportar JSON", on_click=lambda e: export_stats("json")),
+        ft.TextButton("Exportar Prometheus", on_click=lambda e: export_stats("prometheus")),
+    ]))
+    stats_button = ft.TextButton("Estatísticas", on_click=toggle_stats)
 
     # Layout
     ui_choice = ft.Dropdown(width=180, value=settings.get("default_ui", "flet"), options=[
@@ -283,6 +573,7 @@ def main(page: ft.Page):
         translate_button,
         pause_button,
         theme_toggle,
+        stats_button,
     ], alignment=ft.MainAxisAlignment.START)
 
     # Use a scrollable, expanding column so the UI adapts to large content
@@ -291,11 +582,18 @@ def main(page: ft.Page):
             [
                 ft.Text("Tradutor — Clipboard", size=18, weight=ft.FontWeight.BOLD),
                 controls,
+                ft.Row([multi_switch, multi_field], alignment=ft.MainAxisAlignment.START),
                 input_field,
                 output_field,
+                multi_output,
                 ft.Row([auto_checkbox, ft.Column([font_size_slider])], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
                 ft.Row([ui_choice, launch_alt_btn, save_default_btn, switch_btn], alignment=ft.MainAxisAlignment.START),
                 ft.Divider(),
+                ft.Row([history_search, history_refresh]),
+                history_list,
+                history_more,
+                stats_panel,
+                ft.Divider(),
                 ft.Row([status], alignment=ft.MainAxisAlignment.START),
             ],
             spacing=12,
@@ -306,7 +604,17 @@ def main(page: ft.Page):
 
     # apply initial font size
     apply_font_size()
+    startup.mark("janela")
+    load_history()
+    # Janela na tela: serviço/motor, cache, conexões com os provedores e modelos carregam em segundo plano
+    startup.warm_up(lambda: core().get_translator().warm_up_steps())
 
 
 if __name__ == "__main__":
+    # Necessário no .exe (PyInstaller) para o worker do Argos em processo separado
+    multiprocessing.freeze_support()
+    if "--service" in sys.argv:  # translator_service.SERVICE_FLAG, sem importar o serviço na abertura
+        # O mesmo executável também roda o serviço local de tradução
+        import translator_service as service
+        sys.exit(service.main())
     ft.app(target=main)
@@ -0,0 +1,69 @@
+from collections import OrderedDict
+
+# Layout do OCR: lê o TSV do Tesseract (palavras com caixa) e agrupa em linhas e blocos,
+# no formato que o OverlayWindow desenha ({chave: {'left', 'top', 'right', 'bottom', ...}}).
+MIN_CONFIDENCE = 30  # palavras com confiança menor são ruído (bordas, ícones)
+WORD_LEVEL = 5
+
+
+def parse_tsv(tsv):
+    # O TSV do pytesseract traz cabeçalho; o do tesserocr/API C não
+    words = []
+    for row in tsv.splitlines():
+        fields = row.split("\t")
+        if len(fields) < 12 or fields[0] == "level":
+            continue
+        try:
+            level = int(fields[0])
+            block, par, line = int(fields[2]), int(fields[3]), int(fields[4])
+            left, top, width, height = (int(v) for v in fields[6:10])
+            conf = float(fields[10])
+        except ValueError:
+            continue
+        text = "\t".join(fields[11:]).strip()
+        if level != WORD_LEVEL or not text:
+            continue
+        words.append({
+            "block": block, "par": par, "line": line,
+            "left": left, "top": top, "width": width, "height": height,
+            "conf": conf, "text": text,
+        })
+    return words
+
+
+def group_lines(words, min_confidence=MIN_CONFIDENCE):
+    # Chave (bloco, parágrafo, linha) -> caixa que envolve as palavras + texto da linha
+    lines = OrderedDict()
+    for word in words:
+        if word["conf"] < min_confidence:
+            continue
+        key = (word["block"], word["par"], word["line"])
+        right, bottom = word["left"] + word["width"], word["top"] + word["height"]
+        info = lines.get(key)
+        if info is None:
+            lines[key] = {
+                "block": word["block"], "left": word["left"], "top": word["top"],
+                "right": right, "bottom": bottom, "words": [word["text"]],
+            }
+            continue
+        info["left"] = min(info["left"], word["left"])
+        info["top"] = min(info["top"], word["top"])
+        info["right"] = max(info["right"], right)
+        info["bottom"] = max(info["bottom"], bottom)
+        info["words"].append(word["text"])
+    for info in lines.values():
+        info["text"] = " ".join(info.pop("words"))
+    return lines
+
+
+def to_screen(lines, origin, scale=1.0):
+    # Caixas vêm em pixels da imagem (talvez ampliada): volta para coordenadas da tela
+    x0, y0 = origin
+    for info in lines.values():
+        for key, offset in (("left", x0), ("right", x0), ("top", y0), ("bottom", y0)):
+            info[key] = int(round(info[key] / scale)) + offset
+    return lines
+
+
+def layout_from_tsv(tsv, origin=(0, 0), scale=1.0, min_confidence=MIN_CONFIDENCE):
+    return to_screen(group_lines(parse_tsv(tsv), min_confidence), origin, scale)
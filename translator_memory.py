@@ -0,0 +1,396 @@
+import os
+import re
+import sys
+import time
+import zlib
+import random
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from difflib import SequenceMatcher
+
+from translator_cache import normalize_text
+
+# Memória de tradução: pares origem/destino já traduzidos, com números, IDs, URLs e e-mails
+# mascarados ("Order 1234 shipped" e "Order 5678 shipped" viram o mesmo segmento). A busca
+# aproximada usa MinHash + LSH em SQLite (consulta por índice, rápida mesmo com milhões de
+# entradas) e a similaridade final é conferida no texto mascarado. Exporta/importa TMX.
+MEMORY_PATH = Path(os.getenv("TRANSLATOR_MEMORY_PATH", "translation_memory.sqlite3"))
+MEMORY_ENABLED = os.getenv("TRANSLATOR_MEMORY", "1") != "0"
+# Similaridade mínima para reaproveitar sem ir à rede; 1.0 = só quando o texto mascarado é idêntico
+REUSE_THRESHOLD = float(os.getenv("TRANSLATOR_MEMORY_THRESHOLD", "1.0"))
+NUM_PERM = 32
+BANDS = 8  # 8 faixas de 4 hashes: pares com similaridade ~0.6+ quase sempre caem na mesma faixa
+ROWS = NUM_PERM // BANDS
+SHINGLE = 3
+MAX_CANDIDATES = 20
+_PRIME = (1 << 61) - 1
+
+_rng = random.Random(20240601)  # semente fixa: as assinaturas precisam ser estáveis entre execuções
+# Coeficientes < 2^31 com hashes de 32 bits: a*h+b cabe em uint64, então NumPy e Python dão o mesmo resultado
+_PERMS = [(_rng.randrange(1, 1 << 31), _rng.randrange(0, 1 << 31)) for _ in range(NUM_PERM)]
+_np = None  # NumPy (acelera o MinHash em importações grandes), carregado no primeiro uso; False se ausente
+
+_PLACEHOLDER = re.compile(
+    r"https?://\S+|www\.\S+"  # URLs
+    r"|[\w.+-]+@[\w-]+\.[\w.-]+"  # e-mails
+    r"|\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"  # UUIDs
+    r"|\b(?=[\w-]*\d)[A-Za-z0-9]+(?:[-_/][A-Za-z0-9]+)*\b"  # números e IDs com dígitos (INV-2023, 0x1f, 1234)
+    r"|\d+(?:[.,]\d+)*"  # números com separadores
+)
+_TOKEN = "⟦{}⟧"  # ⟦n⟧
+_TOKEN_RE = re.compile("⟦(\\d+)⟧")
+
+
+def mask(text):
+    # (texto com ⟦0⟧, ⟦1⟧... no lugar dos valores variáveis, lista dos valores)
+    values = []
+
+    def repl(match):
+        values.append(match.group(0))
+        return _TOKEN.format(len(values) - 1)
+
+    return _PLACEHOLDER.sub(repl, normalize_text(text)), values
+
+
+def mask_target(target, values):
+    # Marca no destino os mesmos valores da origem numa passada só (um marcador já inserido nunca é
+    # buscado de novo: "0" não casa dentro de ⟦0⟧); completo=False se algum valor aparece um número
+    # de vezes diferente na origem e no destino
+    indexes = {}
+    for i, value in enumerate(values):
+        indexes.setdefault(value, []).append(i)
+    seen = {}
+
+    def repl(match):
+        value = match.group(0)
+        n = seen.get(value, 0)
+        seen[value] = n + 1
+        positions = indexes.get(value, ())
+        return _TOKEN.format(positions[n]) if n < len(positions) else value
+
+    masked = _PLACEHOLDER.sub(repl, normalize_text(target))
+    complete = all(seen.get(value, 0) == len(positions) for value, positions in indexes.items())
+    return masked, complete
+
+
+def unmask(masked, values):
+    return _TOKEN_RE.sub(lambda m: values[int(m.group(1))] if int(m.group(1)) < len(values) else m.group(0), masked)
+
+
+def _shingles(masked):
+    text = masked.lower()
+    if len(text) <= SHINGLE:
+        return {text}
+    return {text[i:i + SHINGLE] for i in range(len(text) - SHINGLE + 1)}
+
+
+def _numpy():
+    # Importar NumPy custa ~100 ms: fica fora da abertura do app e só acontece na primeira consulta
+    global _np, _PERM_A, _PERM_B
+    if _np is None:
+        try:
+            import numpy
+            _PERM_A = numpy.array([a for a, _ in _PERMS], dtype=numpy.uint64)[:, None]
+            _PERM_B = numpy.array([b for _, b in _PERMS], dtype=numpy.uint64)[:, None]
+            _np = numpy
+        except ImportError:
+            _np = False
+    return _np or None
+
+
+def minhash(masked):
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in _shingles(masked)]
+    np = _numpy()
+    if np is not None:
+        values = (_PERM_A * np.array(hashes, dtype=np.uint64)[None, :] + _PERM_B) % np.uint64(_PRIME)
+        return values.min(axis=1).tolist()
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS]
+
+
+def band_keys(signature, target_lang):
+    # Um inteiro de 63 bits por faixa (o idioma de destino entra no hash: cada par de idiomas tem seu índice)
+    keys = []
+    for band in range(BANDS):
+        chunk = signature[band * ROWS:(band + 1) * ROWS]
+        raw = f"{target_lang}|{band}|" + ",".join(map(str, chunk))
+        keys.append(int.from_bytes(hashlib.blake2b(raw.encode(), digest_size=8).digest(), "big") >> 1)
+    return keys
+
+
+def _masked_hash(masked, target_lang):
+    return hashlib.sha1(f"{target_lang}\x1f{masked}".encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    def __init__(self, path=MEMORY_PATH, threshold=REUSE_THRESHOLD):
+        self.path = Path(path)
+        self.threshold = threshold
+        self._lock = threading.RLock()
+        self._conn = None
+        self._failed = False
+        self.hits_exact = 0
+        self.hits_fuzzy = 0
+        self.misses = 0
+
+    def warm(self):
+        # Aquecimento: abre o SQLite e carrega o NumPy antes da primeira consulta
+        _numpy()
+        with self._lock:
+            return self._db() is not None
+
+    def _db(self):
+        if self._conn is None and not self._failed:
+            try:
+                conn = sqlite3.connect(str(self.path), check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS tm_entries ("
+                    " id INTEGER PRIMARY KEY, masked_hash TEXT NOT NULL UNIQUE,"
+                    " source TEXT NOT NULL, target TEXT NOT NULL, masked_source TEXT NOT NULL,"
+                    " masked_target TEXT NOT NULL, source_lang TEXT, target_lang TEXT NOT NULL,"
+                    " placeholders INTEGER NOT NULL, complete INTEGER NOT NULL, created REAL NOT NULL)"
+                )
+                conn.execute("CREATE TABLE IF NOT EXISTS tm_bands (hash INTEGER NOT NULL, entry_id INTEGER NOT NULL)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_tm_bands_hash ON tm_bands(hash)")
+                conn.commit()
+                self._conn = conn
+            except Exception:
+                self._failed = True
+        return self._conn
+
+    def _insert(self, db, source, target, target_lang, source_lang):
+        masked, values = mask(source)
+        if not masked.strip() or not target:
+            return
+        masked_target, complete = mask_target(target, values)
+        if not complete:
+            # Valores que não batem um a um com a origem: não dá para reaproveitar com outros valores
+            return
+        key = _masked_hash(masked, target_lang)
+        row = db.execute("SELECT id, complete FROM tm_entries WHERE masked_hash = ?", (key,)).fetchone()
+        if row is not None:
+            # Mesmo segmento mascarado: mantém o primeiro, a não ser que ele seja incompleto (versões antigas)
+            if not row[1]:
+                db.execute("UPDATE tm_entries SET source = ?, target = ?, masked_target = ?, complete = 1 WHERE id = ?",
+                           (source, target, masked_target, row[0]))
+            return
+        cur = db.execute(
+            "INSERT INTO tm_entries (masked_hash, source, target, masked_source, masked_target, source_lang,"
+            " target_lang, placeholders, complete, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, source, target, masked, masked_target, source_lang or "", target_lang, len(values),
+             int(complete), time.time()),
+        )
+        db.executemany("INSERT INTO tm_bands (hash, entry_id) VALUES (?, ?)",
+                       [(h, cur.lastrowid) for h in band_keys(minhash(masked), target_lang)])
+
+    def add(self, source, target, target_lang, source_lang=""):
+        self.add_many([(source, target)], target_lang, source_lang)
+
+    def add_many(self, pairs, target_lang, source_lang=""):
+        # pairs: [(origem, tradução)] ou [(origem, tradução, idioma_origem)]; uma transação só
+        with self._lock:
+            db = self._db()
+            if db is None:
+                return
+            try:
+                for pair in pairs:
+                    self._insert(db, pair[0], pair[1], target_lang, pair[2] if len(pair) > 2 else source_lang)
+                db.commit()
+            except Exception:
+                db.rollback()
+
+    def search(self, text, target_lang, min_score=0.6, limit=5):
+        # Sugestões ordenadas por similaridade: [{"score", "source", "target", "translation", "source_lang"}]
+        masked, values = mask(text)
+        with self._lock:
+            db = self._db()
+            if db is None:
+                return []
+            try:
+                row = db.execute(
+                    "SELECT masked_source, masked_target, source, target, source_lang, placeholders, complete"
+                    " FROM tm_entries WHERE masked_hash = ?", (_masked_hash(masked, target_lang),)
+                ).fetchone()
+                rows = [row] if row else []
+                # Com limiar 1.0 basta a busca exata pelo texto mascarado
+                if min_score < 1.0 and (not row or limit > 1):
+                    keys = band_keys(minhash(masked), target_lang)
+                    ids = [r[0] for r in db.execute(
+                        f"SELECT entry_id FROM tm_bands WHERE hash IN ({','.join('?' * len(keys))})"
+                        " GROUP BY entry_id ORDER BY COUNT(*) DESC LIMIT ?", (*keys, MAX_CANDIDATES)
+                    )]
+                    if ids:
+                        rows += db.execute(
+                            "SELECT masked_source, masked_target, source, target, source_lang, placeholders, complete"
+                            f" FROM tm_entries WHERE id IN ({','.join('?' * len(ids))})", ids
+                        ).fetchall()
+            except Exception:
+                return []
+        results = {}
+        for masked_source, masked_target, source, target, source_lang, placeholders, complete in rows:
+            if masked_source in results:
+                continue
+            score = 1.0 if masked_source == masked else SequenceMatcher(None, masked, masked_source).ratio()
+            if score < min_score:
+                continue
+            # Valores reinseridos só quando batem um a um com os da origem; senão, a tradução original
+            reusable = complete and placeholders == len(values)
+            results[masked_source] = {
+                "score": round(score, 4),
+                "source": source,
+                "target": target,
+                "translation": unmask(masked_target, values) if reusable else target,
+                "source_lang": source_lang or "",
+                "reusable": reusable,
+            }
+        ranked = sorted(results.values(), key=lambda r: r["score"], reverse=True)
+        return ranked[:limit]
+
+    def lookup(self, text, target_lang, threshold=None):
+        # Melhor correspondência reaproveitável acima do limiar: (tradução, idioma_origem) ou None
+        threshold = self.threshold if threshold is None else threshold
+        for match in self.search(text, target_lang, min_score=threshold, limit=1):
+            if match["reusable"]:
+                if match["score"] >= 1.0:
+                    self.hits_exact += 1
+                else:
+                    self.hits_fuzzy += 1
+                return match["translation"], match["source_lang"]
+        self.misses += 1
+        return None
+
+    def export_tmx(self, path, source_lang="*all*"):
+        # Escrita em streaming: não carrega a memória inteira para gerar o arquivo
+        from xml.sax.saxutils import escape, quoteattr  # só no export (puxa urllib.request)
+        with self._lock:
+            db = self._db()
+            if db is None:
+                return 0
+            count = 0
+            with open(path, "w", encoding="utf-8") as f:
+                f.write('<?xml version="1.0" encoding="UTF-8"?>\n<tmx version="1.4">\n')
+                f.write(f'  <header creationtool="translator_memory" creationtoolversion="1" datatype="plaintext"'
+                        f' segtype="sentence" adminlang="en" srclang={quoteattr(source_lang)} o-tmf="sqlite"/>\n')
+                f.write("  <body>\n")
+                for source, target, src_lang, tgt_lang in db.execute(
+                        "SELECT source, target, source_lang, target_lang FROM tm_entries ORDER BY id"):
+                    f.write("    <tu>\n")
+                    f.write(f'      <tuv xml:lang={quoteattr(src_lang or "und")}><seg>{escape(source)}</seg></tuv>\n')
+                    f.write(f'      <tuv xml:lang={quoteattr(tgt_lang)}><seg>{escape(target)}</seg></tuv>\n')
+                    f.write("    </tu>\n")
+                    count += 1
+                f.write("  </body>\n</tmx>\n")
+            return count
+
+    def import_tmx(self, path, batch_size=1000):
+        # iterparse + clear(): arquivos TMX grandes sem montar a árvore inteira em memória
+        from xml.etree import ElementTree as ET
+        lang_attr = "{http://www.w3.org/XML/1998/namespace}lang"
+        header_src = None
+        pending = {}
+        count = 0
+        for _, elem in ET.iterparse(str(path), events=("end",)):
+            if elem.tag == "header":
+                header_src = elem.get("srclang")
+                continue
+            if elem.tag != "tu":
+                continue
+            segs = []
+            for tuv in elem.iter("tuv"):
+                lang = (tuv.get(lang_attr) or tuv.get("lang") or "").split("-")[0].lower()
+                seg = tuv.find("seg")
+                if seg is not None and lang:
+                    segs.append((lang, "".join(seg.itertext())))
+            elem.clear()
+            if len(segs) < 2:
+                continue
+            src = next((s for s in segs if header_src and s[0] == header_src.split("-")[0].lower()), segs[0])
+            for lang, text in segs:
+                if (lang, text) != src:
+                    pending.setdefault(lang, []).append((src[1], text, src[0]))
+                    count += 1
+            if sum(len(v) for v in pending.values()) >= batch_size:
+                for lang, pairs in pending.items():
+                    self.add_many(pairs, lang)
+                pending = {}
+        for lang, pairs in pending.items():
+            self.add_many(pairs, lang)
+        return count
+
+    def stats(self):
+        with self._lock:
+            entries = None
+            if self._conn is not None:
+                try:
+                    entries = self._conn.execute("SELECT COUNT(*) FROM tm_entries").fetchone()[0]
+                except Exception:
+                    pass
+            return {"hits_exact": self.hits_exact, "hits_fuzzy": self.hits_fuzzy, "misses": self.misses,
+                    "entries": entries}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+                self._conn = None
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_memory():
+    # Instância compartilhada do processo; None quando a memória de tradução está desligada
+    global _memory
+    if not MEMORY_ENABLED:
+        return None
+    with _memory_lock:
+        if _memory is None:
+            _memory = TranslationMemory()
+        return _memory
+
+
+def recall(text, target_lang):
+    memory = get_memory()
+    return memory.lookup(text, target_lang) if memory is not None else None
+
+
+def learn(text, target_lang, translated, source_lang=""):
+    memory = get_memory()
+    if memory is not None and translated and translated != text:
+        memory.add(text, translated, target_lang, source_lang)
+
+
+def learn_many(pairs, target_lang):
+    # pairs: [(origem, tradução, idioma_origem)]
+    memory = get_memory()
+    if memory is not None:
+        memory.add_many([p for p in pairs if p[1] and p[1] != p[0]], target_lang)
+
+
+def main(argv=None):
+    # python translator_memory.py export arquivo.tmx | import arquivo.tmx | stats
+    args = sys.argv[1:] if argv is None else argv
+    memory = TranslationMemory()
+    if len(args) == 2 and args[0] == "export":
+        print(f"{memory.export_tmx(args[1])} unidade(s) exportada(s)")
+    elif len(args) == 2 and args[0] == "import":
+        print(f"{memory.import_tmx(args[1])} par(es) importado(s)")
+    elif args == ["stats"]:
+        memory._db()
+        print(memory.stats())
+    else:
+        print("uso: translator_memory.py export|import arquivo.tmx | stats", file=sys.stderr)
+        return 2
+    memory.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
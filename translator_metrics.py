@@ -0,0 +1,234 @@
+import os
+import sys
+import json
+import math
+import time
+import threading
+from collections import deque
+
+# Instrumentação leve: temporizadores (ms) e contadores por nome + rótulos (ex.: backend="azure").
+# Cada temporizador guarda só as últimas SAMPLE_SIZE amostras num anel, então os percentis
+# (p50/p95/p99) refletem o uso recente e o custo por medição é um append; a ordenação só
+# acontece quando alguém pede o resumo (painel do launcher, /metrics do serviço, dump).
+METRICS_ENABLED = os.getenv("TRANSLATOR_METRICS", "1") != "0"
+SAMPLE_SIZE = int(os.getenv("TRANSLATOR_METRICS_SAMPLES", "1024"))
+PERCENTILES = (50, 95, 99)
+PROM_PREFIX = "translator_"
+
+
+def percentile(values, p):
+    # values já ordenados; nearest-rank: o menor valor com pelo menos p% das amostras até ele
+    # (p * n antes da divisão: 7 / 100 * 100 daria 7.000000000000001 e subiria uma posição)
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, math.ceil(p * len(values) / 100.0) - 1))
+    return values[index]
+
+
+class Histogram:
+    def __init__(self, size=SAMPLE_SIZE):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def summary(self):
+        values = sorted(self.samples)
+        summary = {"count": self.count, "sum": round(self.total, 3),
+                   "mean": round(self.total / self.count, 3) if self.count else 0.0, "max": round(self.max, 3)}
+        for p in PERCENTILES:
+            summary[f"p{p}"] = round(percentile(values, p), 3)
+        return summary
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "labels", "start")
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.name, (time.perf_counter() - self.start) * 1000, **self.labels)
+        if exc_type is not None:
+            self.metrics.inc(self.name + "_errors", **self.labels)
+        return False
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    def __init__(self, sample_size=SAMPLE_SIZE):
+        self.sample_size = sample_size
+        self.started = time.time()
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+    def observe(self, name, ms, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.sample_size)
+            histogram.observe(ms)
+
+    def inc(self, name, n=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + n
+
+    def timer(self, name, **labels):
+        # with metrics.timer("ocr", engine="capi"): ...  (exceções contam em <nome>_errors)
+        return _Timer(self, name, labels)
+
+    def snapshot(self):
+        with self._lock:
+            histograms = [(key, h.count, h.total, h.max, list(h.samples)) for key, h in self._histograms.items()]
+            counters = list(self._counters.items())
+        timers = []
+        for (name, labels), count, total, peak, samples in sorted(histograms):
+            h = Histogram(0)
+            h.samples, h.count, h.total, h.max = samples, count, total, peak
+            timers.append(dict(name=name, labels=dict(labels), **h.summary()))
+        return {
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started, 1),
+            "timers": timers,
+            "counters": [{"name": name, "labels": dict(labels), "value": value}
+                         for (name, labels), value in sorted(counters)],
+        }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+def merge(snapshots):
+    # {"launcher": snapshot, "service": snapshot} -> um snapshot só, com o rótulo process em cada série
+    merged = {"timers": [], "counters": []}
+    for process, snapshot in snapshots.items():
+        if not snapshot:
+            continue
+        for kind in ("timers", "counters"):
+            for entry in snapshot.get(kind, []):
+                merged[kind].append(dict(entry, labels=dict(entry["labels"], process=process)))
+    for kind in ("timers", "counters"):
+        # Séries da mesma métrica precisam ficar juntas no formato do Prometheus
+        merged[kind].sort(key=lambda entry: entry["name"])
+    return merged
+
+
+def _labels(labels, extra=None):
+    items = list(labels.items()) + (list(extra.items()) if extra else [])
+    if not items:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in items)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + "}"
+
+
+def to_prometheus(snapshot):
+    # Formato texto do Prometheus: temporizadores como summary (quantis + _sum/_count), contadores como _total
+    lines = []
+    typed = set()
+    for timer in snapshot.get("timers", []):
+        metric = f"{PROM_PREFIX}{timer['name']}_ms"
+        if metric not in typed:
+            typed.add(metric)
+            lines.append(f"# TYPE {metric} summary")
+        for p in PERCENTILES:
+            lines.append(f"{metric}{_labels(timer['labels'], {'quantile': p / 100.0})} {timer[f'p{p}']}")
+        lines.append(f"{metric}_sum{_labels(timer['labels'])} {timer['sum']}")
+        lines.append(f"{metric}_count{_labels(timer['labels'])} {timer['count']}")
+    for counter in snapshot.get("counters", []):
+        metric = f"{PROM_PREFIX}{counter['name']}_total"
+        if metric not in typed:
+            typed.add(metric)
+            lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric}{_labels(counter['labels'])} {counter['value']}")
+    return "\n".join(lines) + "\n"
+
+
+def format_table(snapshot):
+    # Texto de largura fixa para o painel de estatísticas
+    rows = []
+    for timer in snapshot.get("timers", []):
+        label = ",".join(f"{k}={v}" for k, v in timer["labels"].items())
+        name = f"{timer['name']}[{label}]" if label else timer["name"]
+        rows.append(f"{name[:38]:<38} {timer['count']:>7} {timer['p50']:>9.1f} {timer['p95']:>9.1f} {timer['p99']:>9.1f}")
+    if rows:
+        rows.insert(0, f"{'etapa':<38} {'n':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    counters = []
+    for counter in snapshot.get("counters", []):
+        label = ",".join(f"{k}={v}" for k, v in counter["labels"].items())
+        name = f"{counter['name']}[{label}]" if label else counter["name"]
+        counters.append(f"{name[:38]:<38} {counter['value']:>7}")
+    if counters:
+        rows += [""] + counters
+    return "\n".join(rows) or "Sem medições ainda."
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    return _metrics
+
+
+def observe(name, ms, **labels):
+    if METRICS_ENABLED:
+        _metrics.observe(name, ms, **labels)
+
+
+def inc(name, n=1, **labels):
+    if METRICS_ENABLED:
+        _metrics.inc(name, n, **labels)
+
+
+def timer(name, **labels):
+    return _metrics.timer(name, **labels) if METRICS_ENABLED else _NULL_TIMER
+
+
+def main(argv=None):
+    # Dump do serviço local em execução: python translator_metrics.py [--prometheus]
+    import translator_service as service
+    argv = sys.argv[1:] if argv is None else argv
+    snapshot = service.fetch_metrics()
+    if snapshot is None:
+        print("Serviço de tradução não está rodando.", file=sys.stderr)
+        return 1
+    if "--prometheus" in argv:
+        sys.stdout.write(to_prometheus(snapshot))
+    else:
+        print(json.dumps(snapshot, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+import os
+import sys
+import glob
+import queue
+import ctypes
+import ctypes.util
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import translator_metrics as metrics
+
+# Motor de OCR com workers "quentes": cada worker mantém uma instância do Tesseract já inicializada
+# (modelo carregado), recebe a imagem como buffer em memória e várias capturas rodam em paralelo.
+# Ordem de preferência: tesserocr -> API C do libtesseract via ctypes -> pytesseract (um processo por chamada).
+TESSERACT_LANG = os.getenv("TESSERACT_LANG", "eng")  # ex.: "eng+por"
+TESSERACT_PSM = int(os.getenv("TESSERACT_PSM", "3"))  # 3 = segmentação automática (padrão do tesseract)
+TESSERACT_LIBRARY = os.getenv("TESSERACT_LIBRARY")  # caminho explícito do libtesseract (.so/.dll/.dylib)
+TESSERACT_CMD = os.getenv("TESSERACT_CMD")  # executável, só para o fallback pytesseract
+TESSDATA_PREFIX = os.getenv("TESSDATA_PREFIX")
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(max(1, min(4, os.cpu_count() or 1)))))
+
+# Caminhos comuns no Windows, onde o find_library raramente encontra a DLL
+_WINDOWS_DIRS = [r"C:\Program Files\Tesseract-OCR", r"C:\Program Files (x86)\Tesseract-OCR"]
+
+
+def to_raw(image):
+    # Normaliza a imagem para (buffer, largura, altura, bytes_por_pixel, bytes_por_linha)
+    if isinstance(image, tuple):
+        return image
+    if hasattr(image, "__array_interface__") and not hasattr(image, "mode"):
+        import numpy as np
+        arr = np.ascontiguousarray(image)
+        height, width = arr.shape[:2]
+        bpp = 1 if arr.ndim == 2 else arr.shape[2]
+        # O próprio array vai adiante: a API C lê direto da memória dele, sem cópia
+        return arr, width, height, bpp, arr.strides[0]
+    # PIL.Image
+    if image.mode not in ("L", "RGB"):
+        image = image.convert("RGB")
+    bpp = 1 if image.mode == "L" else 3
+    width, height = image.size
+    return image.tobytes(), width, height, bpp, width * bpp
+
+
+def _find_library():
+    if TESSERACT_LIBRARY:
+        return TESSERACT_LIBRARY
+    name = ctypes.util.find_library("tesseract")
+    if name:
+        return name
+    if sys.platform == "win32":
+        for folder in _WINDOWS_DIRS:
+            matches = sorted(glob.glob(os.path.join(folder, "libtesseract*.dll")))
+            if matches:
+                os.environ["PATH"] = folder + os.pathsep + os.environ.get("PATH", "")
+                return matches[-1]
+    for candidate in ("libtesseract.so.5", "libtesseract.so.4", "libtesseract.5.dylib"):
+        try:
+            ctypes.CDLL(candidate)
+            return candidate
+        except OSError:
+            pass
+    return None
+
+
+class _CApi:
+    # Binding mínimo da API C do Tesseract (capi.h)
+    _lib = None
+
+    @classmethod
+    def load(cls):
+        if cls._lib is None:
+            path = _find_library()
+            if not path:
+                raise OSError("libtesseract não encontrado")
+            lib = ctypes.CDLL(path)
+            lib.TessBaseAPICreate.restype = ctypes.c_void_p
+            lib.TessBaseAPIInit3.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p]
+            lib.TessBaseAPIInit3.restype = ctypes.c_int
+            lib.TessBaseAPISetPageSegMode.argtypes = [ctypes.c_void_p, ctypes.c_int]
+            lib.TessBaseAPISetImage.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int, ctypes.c_int,
+                                                ctypes.c_int, ctypes.c_int]
+            lib.TessBaseAPISetSourceResolution.argtypes = [ctypes.c_void_p, ctypes.c_int]
+            lib.TessBaseAPIGetUTF8Text.argtypes = [ctypes.c_void_p]
+            lib.TessBaseAPIGetUTF8Text.restype = ctypes.c_void_p
+            lib.TessBaseAPIGetTsvText.argtypes = [ctypes.c_void_p, ctypes.c_int]
+            lib.TessBaseAPIGetTsvText.restype = ctypes.c_void_p
+            lib.TessDeleteText.argtypes = [ctypes.c_void_p]
+            lib.TessBaseAPIClear.argtypes = [ctypes.c_void_p]
+            lib.TessBaseAPIDelete.argtypes = [ctypes.c_void_p]
+            cls._lib = lib
+        return cls._lib
+
+    def __init__(self, lang, psm):
+        lib = self.load()
+        self.handle = lib.TessBaseAPICreate()
+        datapath = TESSDATA_PREFIX.encode() if TESSDATA_PREFIX else None
+        if lib.TessBaseAPIInit3(self.handle, datapath, lang.encode()) != 0:
+            lib.TessBaseAPIDelete(self.handle)
+            raise RuntimeError(f"Tesseract não inicializou o idioma '{lang}'")
+        lib.TessBaseAPISetPageSegMode(self.handle, psm)
+
+    def _set(self, raw):
+        data, width, height, bpp, bpl = raw
+        if hasattr(data, "ctypes"):
+            buf = data  # numpy: ponteiro direto para o buffer
+            pointer = ctypes.c_void_p(data.ctypes.data)
+        elif isinstance(data, bytes):
+            buf = pointer = data
+        else:
+            buf = pointer = bytes(data)
+        self._lib.TessBaseAPISetImage(self.handle, pointer, width, height, bpp, bpl)
+        self._lib.TessBaseAPISetSourceResolution(self.handle, 70)
+        return buf
+
+    def _take_text(self, ptr):
+        try:
+            return ctypes.string_at(ptr).decode("utf-8", "replace") if ptr else ""
+        finally:
+            if ptr:
+                self._lib.TessDeleteText(ptr)
+
+    def text(self, raw):
+        buf = self._set(raw)  # mantém o buffer vivo durante o reconhecimento
+        try:
+            return self._take_text(self._lib.TessBaseAPIGetUTF8Text(self.handle))
+        finally:
+            del buf
+            self._lib.TessBaseAPIClear(self.handle)
+
+    def tsv(self, raw):
+        buf = self._set(raw)
+        try:
+            return self._take_text(self._lib.TessBaseAPIGetTsvText(self.handle, 0))
+        finally:
+            del buf
+            self._lib.TessBaseAPIClear(self.handle)
+
+
+class _TesserocrApi:
+    def __init__(self, lang, psm):
+        import tesserocr
+        kwargs = {"lang": lang, "psm": psm}
+        if TESSDATA_PREFIX:
+            kwargs["path"] = TESSDATA_PREFIX
+        self.api = tesserocr.PyTessBaseAPI(**kwargs)
+
+    def _set(self, raw):
+        data, width, height, bpp, bpl = raw
+        self.api.SetImageBytes(bytes(data), width, height, bpp, bpl)
+
+    def text(self, raw):
+        self._set(raw)
+        try:
+            return self.api.GetUTF8Text()
+        finally:
+            self.api.Clear()
+
+    def tsv(self, raw):
+        self._set(raw)
+        try:
+            return self.api.GetTSVText(0)
+        finally:
+            self.api.Clear()
+
+
+class _PytesseractApi:
+    # Fallback sem worker quente: cada chamada ainda inicia um processo tesseract
+    def __init__(self, lang, psm):
+        import pytesseract
+        if TESSERACT_CMD:
+            pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+        self.pytesseract = pytesseract
+        self.lang = lang
+        self.config = f"--psm {psm}"
+
+    def _image(self, raw):
+        from PIL import Image
+        data, width, height, bpp, bpl = raw
+        mode = {1: "L", 3: "RGB", 4: "RGBA"}[bpp]
+        return Image.frombuffer(mode, (width, height), bytes(data), "raw", mode, bpl, 1)
+
+    def text(self, raw):
+        return self.pytesseract.image_to_string(self._image(raw), lang=self.lang, config=self.config)
+
+    def tsv(self, raw):
+        return self.pytesseract.image_to_data(self._image(raw), lang=self.lang, config=self.config)
+
+
+_APIS = (("tesserocr", _TesserocrApi), ("capi", _CApi), ("pytesseract", _PytesseractApi))
+
+
+class OcrEngine:
+    def __init__(self, lang=TESSERACT_LANG, psm=TESSERACT_PSM, workers=OCR_WORKERS):
+        self.lang = lang
+        self.psm = psm
+        self.workers = max(1, workers)
+        self.kind = None
+        self._api_cls = None
+        self._apis = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _select(self):
+        for kind, cls in _APIS:
+            try:
+                api = cls(self.lang, self.psm)
+            except Exception:
+                continue
+            self.kind, self._api_cls = kind, cls
+            return api
+        raise RuntimeError("Nenhum OCR disponível. Instale o Tesseract (e opcionalmente tesserocr).")
+
+    def _acquire(self):
+        # Reaproveita instâncias já inicializadas; cria até `workers` sob demanda
+        try:
+            return self._apis.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._api_cls is None:
+                api = self._select()
+                self._created += 1
+                return api
+            if self._created < self.workers:
+                api = self._api_cls(self.lang, self.psm)
+                self._created += 1
+                return api
+        return self._apis.get()
+
+    def _release(self, api):
+        self._apis.put(api)
+
+    def warm(self):
+        # Inicializa todos os workers de uma vez (ex.: em segundo plano ao abrir o app)
+        apis = [self._acquire() for _ in range(self.workers)]
+        for api in apis:
+            self._release(api)
+        return self.kind
+
+    def _run(self, method, image):
+        raw = to_raw(image)
+        start = time.perf_counter()
+        api = self._acquire()
+        # Espera por um worker livre (ou pela inicialização do primeiro) separada do tempo do tesseract
+        metrics.observe("ocr_wait", (time.perf_counter() - start) * 1000)
+        try:
+            with metrics.timer("ocr", engine=self.kind, method=method):
+                return getattr(api, method)(raw)
+        finally:
+            self._release(api)
+
+    def image_to_string(self, image):
+        return self._run("text", image)
+
+    def image_to_tsv(self, image):
+        return self._run("tsv", image)
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr")
+            return self._executor
+
+    def submit(self, image):
+        # OCR concorrente entre núcleos; retorna concurrent.futures.Future com o texto
+        return self._pool().submit(self.image_to_string, image)
+
+    def submit_tsv(self, image):
+        # Idem, mas com o layout (palavras e caixas em TSV) para desenhar a tradução no lugar
+        return self._pool().submit(self.image_to_tsv, image)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_ocr_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = OcrEngine()
+        return _engine
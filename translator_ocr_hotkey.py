@@ -1,76 +1,40 @@
-import os
+import translator_startup as startup  # primeiro: marca o início e mede as importações abaixo
+import sys
 import io
-import json
+import asyncio
 import threading
+import multiprocessing
 import time
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
-import mss
-import pytesseract
-import requests
-from pynput import keyboard
-
-# Ajuste o caminho do Tesseract no Windows se necessário
-# pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
-
-DEFAULT_TARGET_LANG = "pt"
-AZURE_KEY = os.getenv("AZURE_TRANSLATOR_KEY")
-AZURE_REGION = os.getenv("AZURE_TRANSLATOR_REGION")
-LIBRE_URL = os.getenv("LIBRE_TRANSLATE_URL")
-GOOGLE_KEY = os.getenv("GOOGLE_TRANSLATE_KEY")  # Google Cloud Translate API key (optional)
-# Usar Google web (deep-translator) por padrão
-USE_GOOGLE_WEB = True
-
-
-def translate_text(text, target_lang=DEFAULT_TARGET_LANG):
-    text = text.strip()
-    if not text:
-        return None
-    if USE_GOOGLE_WEB:
+
+import translator_core as core
+import translator_metrics as metrics
+import translator_history as history
+from translator_ocr import get_ocr_engine
+import translator_service as service
+from translator_layout import layout_from_tsv
+
+# OCR: workers do Tesseract ficam carregados (veja translator_ocr.py). No Windows, se necessário,
+# defina TESSERACT_LIBRARY (libtesseract*.dll) ou TESSERACT_CMD (tesseract.exe para o fallback pytesseract).
+
+DEFAULT_TARGET_LANG = core.DEFAULT_TARGET_LANG
+
+
+_capture = None
+
+
+def capture_module():
+    # translator_capture puxa o NumPy (~100 ms): importado no aquecimento ou na primeira captura.
+    # None sem NumPy: captura antiga via PIL e sem o modo de observação.
+    global _capture
+    if _capture is None:
         try:
-            from deep_translator import GoogleTranslator
-            translated = GoogleTranslator(source='auto', target=target_lang).translate(text)
-            return translated, ""
-        except Exception:
-            pass
-    if GOOGLE_KEY:
-        # Google Cloud Translate (v2) using API key
-        endpoint = f"https://translation.googleapis.com/language/translate/v2?key={GOOGLE_KEY}"
-        payload = {"q": text, "target": target_lang, "format": "text", "source": ""}
-        r = requests.post(endpoint, data=payload, timeout=10)
-        r.raise_for_status()
-        data = r.json()
-        translations = data.get("data", {}).get("translations", [])
-        if translations:
-            translated = translations[0].get("translatedText", "")
-            source_lang = translations[0].get("detectedSourceLanguage", "")
-            return translated, source_lang
-        return None
-    if AZURE_KEY and AZURE_REGION:
-        endpoint = "https://api.cognitive.microsofttranslator.com/translate"
-        params = {"api-version": "3.0", "to": [target_lang]}
-        headers = {
-            "Ocp-Apim-Subscription-Key": AZURE_KEY,
-            "Ocp-Apim-Subscription-Region": AZURE_REGION,
-            "Content-type": "application/json"
-        }
-        body = [{"text": text}]
-        r = requests.post(endpoint, params=params, headers=headers, data=json.dumps(body), timeout=10)
-        r.raise_for_status()
-        data = r.json()
-        translated = data[0]["translations"][0]["text"]
-        source_lang = data[0].get("detectedLanguage", {}).get("language", "")
-        return translated, source_lang
-    elif LIBRE_URL:
-        endpoint = f"{LIBRE_URL}/translate"
-        payload = {"q": text, "source": "auto", "target": target_lang, "format": "text"}
-        r = requests.post(endpoint, data=payload, timeout=10)
-        r.raise_for_status()
-        translated = r.json().get("translatedText")
-        return translated, ""
-    else:
-        raise RuntimeError("Nenhum serviço de tradução configurado. Defina AZURE_* ou LIBRE_TRANSLATE_URL.")
+            import translator_capture
+            _capture = translator_capture
+        except ImportError:
+            _capture = False
+    return _capture or None
 
 
 class TranslatorApp(tk.Tk):
@@ -83,9 +47,9 @@ class TranslatorApp(tk.Tk):
         # UI
         frm = ttk.Frame(self)
         frm.pack(fill="both", expand=True, padx=8, pady=8)
-        ttk.Label(frm, text="Idioma de destino (ex.: pt, en, es):").grid(row=0, column=0, sticky="w")
+        ttk.Label(frm, text="Idioma(s) de destino (ex.: pt ou pt, en, es):").grid(row=0, column=0, sticky="w")
         self.target_var = tk.StringVar(value=DEFAULT_TARGET_LANG)
-        ttk.Entry(frm, textvariable=self.target_var, width=8).grid(row=0, column=1, sticky="w")
+        ttk.Entry(frm, textvariable=self.target_var, width=14).grid(row=0, column=1, sticky="w")
         ttk.Label(frm, text="Mensagem para traduzir:").grid(row=1, column=0, columnspan=2, sticky="w", pady=(8,2))
         self.input_txt = tk.Text(frm, height=6, wrap="word")
         self.input_txt.grid(row=2, column=0, columnspan=2, sticky="nsew")
@@ -100,15 +64,35 @@ class TranslatorApp(tk.Tk):
         self.btn_translate.pack(side="left")
         self.btn_ocr = ttk.Button(btn_frm, text="OCR da Tela (Ctrl+Alt+O)", command=self.start_ocr_selection)
         self.btn_ocr.pack(side="left", padx=8)
+        self.btn_watch = ttk.Button(btn_frm, text="Observar região", command=self.toggle_watch)
+        self.btn_watch.pack(side="left")
+        # Tradução desenhada sobre a tela, no lugar de cada linha reconhecida
+        self.overlay_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(btn_frm, text="Sobrepor na tela", variable=self.overlay_var).pack(side="left", padx=8)
+        self.watcher = None
+        self.overlay = None
+        self.targets_frm = None
         self.bind_all("<Control-Return>", lambda e: self.translate_message())
         self.geometry_selector = None
+        self.last_ocr_timings = {}
         # Hotkey global (Ctrl+Alt+O) para abrir seleção de área
         threading.Thread(target=self.hotkey_listener, daemon=True).start()
+        # Serviço de tradução, captura/NumPy, workers de OCR e modelos aquecem depois da janela aparecer
+        self.after_idle(self._window_ready)
         # If requested, start OCR in fullscreen automatically once UI is ready
         if self.fullscreen_ocr_default:
             self.after(500, self.start_ocr_selection)
 
+    def _window_ready(self):
+        startup.mark("janela")
+        steps = core.get_translator().warm_up_steps()
+        # Logo depois do registro: a primeira captura precisa do NumPy e dos workers do OCR
+        # (sem Tesseract instalado o erro aparece na primeira captura)
+        steps[1:1] = [("captura", capture_module), ("ocr", lambda: get_ocr_engine().warm())]
+        startup.warm_up(steps)
+
     def hotkey_listener(self):
+        from pynput import keyboard  # na thread do atalho: não atrasa a janela
         COMBO = {keyboard.Key.ctrl_l, keyboard.Key.alt_l, keyboard.KeyCode.from_char('o')}
         current = set()
         def on_press(key):
@@ -126,49 +110,259 @@ class TranslatorApp(tk.Tk):
         with keyboard.Listener(on_press=on_press, on_release=on_release) as listener:
             listener.join()
 
-    def translate_message(self):
-        text = self.input_txt.get("1.0", "end").strip()
-        target = self.target_var.get().strip() or DEFAULT_TARGET_LANG
+    def show_output(self, content):
+        if self.targets_frm is not None:
+            self.targets_frm.destroy()
+            self.targets_frm = None
+            self.output_txt.grid()
         self.output_txt.delete("1.0", "end")
+        self.output_txt.insert("1.0", content)
+
+    def targets(self):
+        # "pt, en, es" -> vários destinos; observação e sobreposição usam só o primeiro
+        return core.parse_targets(self.target_var.get(), DEFAULT_TARGET_LANG)
+
+    def show_targets(self, targets, placeholder):
+        # Uma coluna por idioma, lado a lado, no lugar da saída única
+        self.show_output("")
+        self.output_txt.grid_remove()
+        self.targets_frm = ttk.Frame(self.output_txt.master)
+        self.targets_frm.grid(row=3, column=0, columnspan=2, sticky="nsew", pady=(8, 0))
+        self.targets_frm.rowconfigure(1, weight=1)
+        boxes = {}
+        for i, lang in enumerate(targets):
+            ttk.Label(self.targets_frm, text=lang).grid(row=0, column=i, sticky="w")
+            box = tk.Text(self.targets_frm, height=8, width=1, wrap="word")
+            box.grid(row=1, column=i, sticky="nsew", padx=(0 if i == 0 else 4, 0))
+            box.insert("1.0", placeholder)
+            self.targets_frm.columnconfigure(i, weight=1, uniform="targets")
+            boxes[lang] = box
+        return boxes
+
+    def _set_target(self, box, content):
         try:
-            result = translate_text(text, target)
-            if result:
-                translated, src = result
-                header = f"[origem: {src}] " if src else ""
-                self.output_txt.insert("1.0", f"{header}{translated}")
-        except Exception as e:
-            self.output_txt.insert("1.0", f"Erro: {e}")
+            box.delete("1.0", "end")
+            box.insert("1.0", content)
+        except tk.TclError:
+            # Coluna de uma tradução anterior, já substituída
+            pass
+
+    def _format_result(self, result):
+        translated, src = result
+        header = f"[origem: {src}] " if src else ""
+        return f"{header}{translated}"
+
+    def submit(self, job, channel, on_done):
+        # job(motor) -> corrotina. O motor é obtido fora do loop do Tk: na primeira vez (ou com o
+        # aquecimento segurando o registro) get_engine() pode esperar o serviço local subir
+        def work():
+            try:
+                engine = core.get_engine()
+            except Exception as err:
+                on_done(None, err)
+                return
+            engine.submit(lambda: job(engine), channel=channel, on_done=on_done)
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def translate_message(self):
+        text = self.input_txt.get("1.0", "end").strip()
+        targets = self.targets()
+        if len(targets) > 1:
+            self.translate_targets(text, targets)
+            return
+        target = targets[0]
+        self.show_output("Traduzindo...")
+        started = time.monotonic()
+
+        def on_done(result, error):
+            # Roda na thread do motor; a atualização do Text fica com o loop do Tk
+            if error is not None:
+                self.after(0, self.show_output, f"Erro: {error}")
+            else:
+                self.after(0, self.show_output, self._format_result(result) if result else "")
+                if result:
+                    history.record(text, result[0], source_lang=result[1], target_lang=target,
+                                   latency_ms=(time.monotonic() - started) * 1000, origin="message")
+
+        self.submit(lambda engine: engine.translate(text, target), "message", on_done)
+
+    def translate_targets(self, text, targets):
+        # Um pedido para todos os idiomas; cada coluna é preenchida assim que o seu fica pronto
+        boxes = self.show_targets(targets, "Traduzindo...")
+        started = time.monotonic()
+
+        def on_result(lang, result):
+            self.after(0, self._set_target, boxes[lang], self._format_result(result))
+
+        def on_done(results, error):
+            if error is not None:
+                self.after(0, self.show_output, f"Erro: {error}")
+                return
+            for lang in targets:
+                if lang not in results:
+                    self.after(0, self._set_target, boxes[lang], "Falhou.")
+                    continue
+                history.record(text, results[lang][0], source_lang=results[lang][1], target_lang=lang,
+                               backend="multi", latency_ms=(time.monotonic() - started) * 1000, origin="message")
+
+        self.submit(lambda engine: engine.translate_targets(text, targets, on_result=on_result), "message", on_done)
 
     def start_ocr_selection(self):
         if self.geometry_selector and tk.Toplevel.winfo_exists(self.geometry_selector):
             return
         self.geometry_selector = SelectionOverlay(self, self.on_region_selected)
 
+    def toggle_watch(self):
+        # Observação contínua de uma região (legendas, chats): só linhas novas são traduzidas
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+            self.btn_watch.config(text="Observar região")
+            return
+        if capture_module() is None:
+            self.show_output("Observar região requer NumPy.")
+            return
+        if self.geometry_selector and tk.Toplevel.winfo_exists(self.geometry_selector):
+            return
+        self.geometry_selector = SelectionOverlay(self, self.start_watch)
+
+    def start_watch(self, bbox):
+        from translator_watch import RegionWatcher
+        self.show_output("")
+        self.watcher = RegionWatcher(
+            bbox,
+            core.translate_many,
+            lambda: self.targets()[0],
+            on_lines=lambda pairs: self.after(0, self.append_watch_lines, pairs),
+            on_error=lambda e: self.after(0, self.on_watch_error, e),
+        )
+        self.watcher.start()
+        self.btn_watch.config(text="Parar observação")
+
+    def append_watch_lines(self, pairs):
+        for _, translated in pairs:
+            if translated:
+                self.output_txt.insert("end", translated + "\n")
+        self.output_txt.see("end")
+
+    def on_watch_error(self, error):
+        self.watcher = None
+        self.btn_watch.config(text="Observar região")
+        self.show_output(f"Observação interrompida: {error}")
+
     def on_region_selected(self, bbox):
         # bbox: (x1, y1, x2, y2)
+        capture = capture_module()
         try:
-            with mss.mss() as sct:
-                x1, y1, x2, y2 = bbox
-                left, top, width, height = x1, y1, x2 - x1, y2 - y1
-                img = sct.grab({"left": left, "top": top, "width": width, "height": height})
-                # Convert to PIL
-                pil_img = Image.frombytes("RGB", img.size, img.bgra, "raw", "BGRX")
+            if capture is not None:
+                # View NumPy direto sobre o buffer BGRA do mss (sem cópia)
+                bgra = capture.grab(bbox)
+            else:
+                import mss
+                from PIL import Image
+                with mss.mss() as sct, metrics.timer("capture", path="pil"):
+                    x1, y1, x2, y2 = bbox
+                    left, top, width, height = x1, y1, x2 - x1, y2 - y1
+                    img = sct.grab({"left": left, "top": top, "width": width, "height": height})
+                    # Convert to PIL
+                    pil_img = Image.frombytes("RGB", img.size, img.bgra, "raw", "BGRX")
         except Exception as e:
-            self.output_txt.delete("1.0", "end")
-            self.output_txt.insert("1.0", f"Falha ao capturar tela: {e}")
+            self.show_output(f"Falha ao capturar tela: {e}")
             return
-        try:
-            ocr_text = pytesseract.image_to_string(pil_img)
-            target = self.target_var.get().strip() or DEFAULT_TARGET_LANG
-            result = translate_text(ocr_text, target)
-            self.output_txt.delete("1.0", "end")
+        targets = self.targets()
+        target = targets[0]
+        if self.overlay_var.get() and capture is not None:
+            self.show_output("Reconhecendo texto...")
+            self.overlay_region(bbox, bgra, target)
+            return
+        if len(targets) > 1:
+            boxes = self.show_targets(targets, "Reconhecendo texto...")
+        else:
+            self.show_output("Reconhecendo texto...")
+
+        async def ocr_and_translate(engine):
+            timings = {}
+            if capture is not None:
+                # Cinza/upscale/binarização/deskew vetorizados; o OCR recebe os pixels crus
+                image, timings = await engine.run_blocking(capture.prepare, bgra)
+            else:
+                image = pil_img
+            start = time.perf_counter()
+            # OCR no pool de workers já inicializados (sem novo processo tesseract por captura)
+            ocr_text = await asyncio.wrap_future(get_ocr_engine().submit(image))
+            timings["ocr"] = (time.perf_counter() - start) * 1000
+            self.last_ocr_timings = timings
+            start = time.perf_counter()
+            if len(targets) > 1:
+                results = await engine.translate_targets(
+                    ocr_text, targets,
+                    on_result=lambda lang, r: self.after(0, self._set_target, boxes[lang], self._format_result(r)))
+                for lang, (translated, src) in results.items():
+                    history.record(ocr_text.strip(), translated, source_lang=src, target_lang=lang, backend="multi",
+                                   latency_ms=(time.perf_counter() - start) * 1000, origin="ocr")
+                return results
+            # OCR costuma trazer vários parágrafos: traduz todos em lote
+            result = (await engine.translate_many([ocr_text], target))[0]
             if result:
-                translated, src = result
-                header = f"[origem: {src}] " if src else ""
-                self.output_txt.insert("1.0", f"{header}{translated}")
-        except Exception as e:
-            self.output_txt.delete("1.0", "end")
-            self.output_txt.insert("1.0", f"Erro no OCR/Tradução: {e}")
+                history.record(ocr_text.strip(), result[0], source_lang=result[1], target_lang=target, backend="lote",
+                               latency_ms=(time.perf_counter() - start) * 1000, origin="ocr")
+            return result
+
+        def on_done(result, error):
+            if error is not None:
+                self.after(0, self.show_output, f"Erro no OCR/Tradução: {error}")
+            elif len(targets) > 1 and result:
+                # Só faltam os que falharam (os demais já chegaram por on_result)
+                for lang in targets:
+                    if lang not in result:
+                        self.after(0, self._set_target, boxes[lang], "Falhou.")
+            elif len(targets) > 1:
+                # Nenhum texto reconhecido
+                self.after(0, self.show_output, "")
+            else:
+                self.after(0, self.show_output, self._format_result(result) if result else "")
+
+        self.submit(ocr_and_translate, "ocr", on_done)
+
+    def overlay_region(self, bbox, bgra, target):
+        # OCR com layout -> linhas com caixa -> um lote de tradução -> desenho incremental no OverlayWindow
+        origin = (min(bbox[0], bbox[2]), min(bbox[1], bbox[3]))
+
+        async def ocr_layout_and_translate(engine):
+            image, _ = await engine.run_blocking(capture_module().prepare, bgra)
+            tsv = await asyncio.wrap_future(get_ocr_engine().submit_tsv(image))
+            # prepare() pode ampliar a imagem: as caixas voltam para a escala da tela
+            lines = layout_from_tsv(tsv, origin, image.shape[1] / max(1, bgra.shape[1]))
+            if not lines:
+                return 0
+            keys = list(lines.keys())
+            self.after(0, self._open_overlay, lines)
+
+            def on_result(i, result):
+                if result:
+                    self.after(0, self._overlay_line, keys[i], result[0])
+
+            await engine.translate_many([lines[k]["text"] for k in keys], target, on_result=on_result)
+            return len(keys)
+
+        def on_done(count, error):
+            if error is not None:
+                self.after(0, self.show_output, f"Erro no OCR/Tradução: {error}")
+            else:
+                self.after(0, self.show_output, f"{count} linha(s) traduzida(s) na tela." if count else "Nenhum texto reconhecido.")
+
+        self.submit(ocr_layout_and_translate, "ocr", on_done)
+
+    def _open_overlay(self, lines):
+        if self.overlay is not None and self.overlay.winfo_exists():
+            self.overlay.destroy()
+        size = (self.winfo_screenwidth(), self.winfo_screenheight())
+        self.overlay = OverlayWindow(size, lines, {})
+
+    def _overlay_line(self, key, text):
+        if self.overlay is not None and self.overlay.winfo_exists():
+            self.overlay.set_translation(key, text)
 
 
 class SelectionOverlay(tk.Toplevel):
@@ -237,28 +431,53 @@ class OverlayWindow(tk.Toplevel):
         self.geometry(f"{w}x{h}+0+0")
         self.canvas = tk.Canvas(self, width=w, height=h, highlightthickness=0, bg='')
         self.canvas.pack(fill="both", expand=True)
-        # Draw translations
+        self.lines = lines
+        self.timeout = timeout
+        self._tags = {key: f"line{i}" for i, key in enumerate(sorted(lines.keys()))}
+        self._timer = None
+        # Draw translations (the map may start empty and be filled with set_translation)
         for key in sorted(lines.keys()):
-            info = lines[key]
-            left = info.get('left', 0)
-            top = info.get('top', 0)
             text = translations_map.get(key, '')
-            if not text:
-                continue
-            # Draw a semi-opaque background box if possible (approximate using a filled rectangle)
-            try:
-                rect = self.canvas.create_rectangle(left, top, info.get('right', left)+4, info.get('bottom', top)+4, fill='yellow', outline='')
-            except Exception:
-                rect = None
-            # Place text on top
-            self.canvas.create_text(left+2, top+2, anchor='nw', text=text, fill='black', font=(None, 12))
+            if text:
+                self._draw(key, text)
         # Close on click or Escape
         self.bind('<Button-1>', lambda e: self.destroy())
         self.bind('<Escape>', lambda e: self.destroy())
-        # Auto destroy after timeout seconds
-        self.after(int(timeout*1000), self.destroy)
+        self._restart_timer()
+
+    def _restart_timer(self):
+        # Auto destroy after timeout seconds (counted from the last line drawn)
+        if self._timer is not None:
+            self.after_cancel(self._timer)
+        self._timer = self.after(int(self.timeout*1000), self.destroy)
+
+    def _draw(self, key, text):
+        info = self.lines[key]
+        left = info.get('left', 0)
+        top = info.get('top', 0)
+        tag = self._tags[key]
+        self.canvas.delete(tag)
+        # Draw a semi-opaque background box if possible (approximate using a filled rectangle)
+        try:
+            self.canvas.create_rectangle(left, top, info.get('right', left)+4, info.get('bottom', top)+4, fill='yellow', outline='', tags=tag)
+        except Exception:
+            pass
+        # Place text on top
+        self.canvas.create_text(left+2, top+2, anchor='nw', text=text, fill='black', font=(None, 12), tags=tag)
+
+    def set_translation(self, key, text):
+        # Desenho incremental: cada linha aparece assim que a tradução dela chega
+        if not text or key not in self.lines or not self.winfo_exists():
+            return
+        self._draw(key, text)
+        self._restart_timer()
 
 
 if __name__ == "__main__":
+    # Necessário no .exe (PyInstaller) para o worker do Argos em processo separado
+    multiprocessing.freeze_support()
+    if service.SERVICE_FLAG in sys.argv:
+        # O mesmo executável também roda o serviço local de tradução
+        sys.exit(service.main())
     app = TranslatorApp()
     app.mainloop()
@@ -0,0 +1,127 @@
+import os
+import threading
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+
+from translator_backends import Backend
+from translator_langid import detect
+
+# Backend offline com argostranslate. A inferência roda num processo separado (a GUI não trava),
+# os pacotes instalados são carregados uma vez e os modelos ficam em memória entre as chamadas.
+#   TRANSLATOR_OFFLINE=0 desliga, =1 dá prioridade ao offline, padrão "auto" (usado como último recurso)
+#   ARGOS_THREADS limita as threads de CPU do worker
+OFFLINE_MODE = os.getenv("TRANSLATOR_OFFLINE", "auto")
+ARGOS_THREADS = int(os.getenv("ARGOS_THREADS", str(max(1, min(4, (os.cpu_count() or 2) // 2)))))
+
+# Estado do processo worker
+_languages = None
+_translations = {}
+
+
+def _init_worker(threads):
+    # Roda uma vez no worker, antes de importar o ctranslate2/torch
+    threads = str(threads)
+    os.environ.setdefault("ARGOS_DEVICE_TYPE", "cpu")
+    os.environ["OMP_NUM_THREADS"] = threads
+    os.environ["MKL_NUM_THREADS"] = threads
+    os.environ["ARGOS_INTER_THREADS"] = "1"
+    os.environ["ARGOS_INTRA_THREADS"] = threads
+
+
+def _load_languages():
+    global _languages
+    if _languages is None:
+        import argostranslate.translate
+        _languages = {lang.code: lang for lang in argostranslate.translate.get_installed_languages()}
+    return _languages
+
+
+def _worker_pairs():
+    languages = _load_languages()
+    pairs = []
+    for code, lang in languages.items():
+        for target in languages:
+            if target != code and lang.get_translation(languages[target]) is not None:
+                pairs.append((code, target))
+    return pairs
+
+
+def _worker_translate(texts, source_lang, target_lang):
+    key = (source_lang, target_lang)
+    translation = _translations.get(key)
+    if translation is None:
+        languages = _load_languages()
+        if source_lang not in languages or target_lang not in languages:
+            raise RuntimeError(f"Pacote Argos não instalado para {source_lang}->{target_lang}")
+        translation = languages[source_lang].get_translation(languages[target_lang])
+        if translation is None:
+            raise RuntimeError(f"Pacote Argos não instalado para {source_lang}->{target_lang}")
+        _translations[key] = translation
+    return [translation.translate(t) for t in texts]
+
+
+class ArgosBackend(Backend):
+    name = "argos"
+    max_items = 64
+    max_chars = 20000
+
+    def __init__(self, threads=ARGOS_THREADS):
+        self.threads = threads
+        self._executor = None
+        self._pairs = None
+        self._lock = threading.Lock()
+
+    def available(self):
+        return OFFLINE_MODE != "0" and importlib.util.find_spec("argostranslate") is not None
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # Um único worker: os modelos ficam carregados nele e não são duplicados na memória
+                self._executor = ProcessPoolExecutor(max_workers=1, initializer=_init_worker, initargs=(self.threads,))
+            return self._executor
+
+    def preload(self):
+        # Sobe o worker e carrega os pacotes instalados em segundo plano
+        future = self._pool().submit(_worker_pairs)
+        future.add_done_callback(self._store_pairs)
+        return future
+
+    def _store_pairs(self, future):
+        try:
+            self._pairs = set(future.result())
+        except Exception:
+            self._pairs = set()
+
+    def pairs(self):
+        if self._pairs is None:
+            self._store_pairs(self.preload())
+        return self._pairs
+
+    def _resolve_source(self, texts, target_lang, source_lang):
+        if source_lang != "auto":
+            return source_lang
+        guessed, confidence = detect(" ".join(texts)[:2000])
+        if guessed and confidence >= 0.5:
+            return guessed
+        # Sem pista: se só um idioma de origem traduz para o destino, usa esse
+        sources = sorted(src for src, tgt in self.pairs() if tgt == target_lang)
+        if len(sources) == 1:
+            return sources[0]
+        raise RuntimeError("argos: informe o idioma de origem (não foi possível detectar)")
+
+    def translate(self, text, target_lang, source_lang="auto"):
+        return self.translate_batch([text], target_lang, source_lang)[0]
+
+    def translate_batch(self, texts, target_lang, source_lang="auto"):
+        source_lang = self._resolve_source(texts, target_lang, source_lang)
+        if source_lang == target_lang:
+            return [(t, source_lang) for t in texts]
+        translated = self._pool().submit(_worker_translate, list(texts), source_lang, target_lang).result()
+        return [(t, source_lang) for t in translated]
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
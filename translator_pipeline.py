@@ -0,0 +1,128 @@
+import os
+import re
+import queue
+import itertools
+import threading
+
+from translator_langid import confident_language
+
+# Estágio entre o observador de clipboard e a tradução: agrupa rajadas de cópias (debounce),
+# fica só com o valor mais novo (coalesce), descarta o que foi superado e ignora conteúdo que
+# não vale a pena traduzir. A fila é limitada e as métricas contam descartes e coalescências.
+DEBOUNCE_SECONDS = float(os.getenv("CLIPBOARD_DEBOUNCE", "0.35"))
+MAX_CHARS = int(os.getenv("CLIPBOARD_MAX_CHARS", "20000"))
+QUEUE_SIZE = 8
+
+_URL_RE = re.compile(r"^\s*(?:(?:https?|ftp)://|www\.|mailto:)\S+\s*$", re.IGNORECASE)
+_NUMBER_RE = re.compile(r"^[\s\d.,:;/%+\-−–()#$€£R]*$")
+_CODE_CHARS = set("{}[]();=<>/\\|&*_$#@")
+# Só na primeira linha não vazia e com a pontuação de código junto da palavra-chave:
+# "let me know", "import duties apply" ou "class starts at 9" continuam sendo texto
+_CODE_START_RE = re.compile(
+    r"\s*(?:def \w+\s*\(|class \w+\s*[(:{]|import [\w.]+\s*(?:$|[;,]| as )|from [\w.]+ import "
+    r"|function\s*\w*\s*\(|(?:const|let|var) \w+\s*=|(?:public|private) [\w<>\[\], ]+[({;=]"
+    r"|#include\s*[<\"]|SELECT .+ FROM |<\w+[^>]*>)"
+)
+
+
+def looks_like_code(text):
+    first = next((line for line in text.splitlines() if line.strip()), "")
+    if _CODE_START_RE.match(first):
+        return True
+    stripped = [c for c in text if not c.isspace()]
+    if len(stripped) < 12:
+        return False
+    return sum(1 for c in stripped if c in _CODE_CHARS) / len(stripped) > 0.12
+
+
+def skip_reason(text, target_lang=None, max_chars=MAX_CHARS):
+    # Motivo para não traduzir, ou None se o texto deve seguir para a tradução
+    if not text or not text.strip():
+        return "empty"
+    if len(text) > max_chars:
+        return "too_large"
+    if _URL_RE.match(text):
+        return "url"
+    if _NUMBER_RE.match(text):
+        return "number"
+    if looks_like_code(text):
+        return "code"
+    if target_lang and target_lang != "auto" and confident_language(text) == target_lang:
+        return "already_target"
+    return None
+
+
+class ClipboardPipeline(threading.Thread):
+    def __init__(self, handler, target_lang=None, on_skip=None, debounce=DEBOUNCE_SECONDS,
+                 max_chars=MAX_CHARS, maxsize=QUEUE_SIZE):
+        # handler(texto) recebe só o valor final de cada rajada; deve retornar rápido (ex.: agendar no motor)
+        super().__init__(daemon=True)
+        self.handler = handler
+        self.target_lang = target_lang or (lambda: None)
+        self.on_skip = on_skip
+        self.debounce = debounce
+        self.max_chars = max_chars
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self.metrics = {"received": 0, "coalesced": 0, "dropped": 0, "skipped": 0, "dispatched": 0}
+        self.skip_reasons = {}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.metrics[name] = self.metrics.get(name, 0) + amount
+
+    def submit(self, text):
+        # Nunca bloqueia o observador: com a fila cheia, descarta o item mais antigo
+        self._count("received")
+        item = (next(self._seq), text)
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self._count("dropped")
+                except queue.Empty:
+                    pass
+
+    def stop(self):
+        self.submit(None)
+
+    def run(self):
+        while True:
+            item = self._queue.get()
+            if item[1] is None:
+                return
+            # Debounce: espera um intervalo sem novas cópias, ficando sempre com a mais recente
+            while True:
+                try:
+                    newer = self._queue.get(timeout=self.debounce)
+                except queue.Empty:
+                    break
+                if newer[1] is None:
+                    return
+                item = newer
+                self._count("coalesced")
+            text = item[1]
+            reason = skip_reason(text, self.target_lang(), self.max_chars)
+            if reason:
+                self._count("skipped")
+                with self._lock:
+                    self.skip_reasons[reason] = self.skip_reasons.get(reason, 0) + 1
+                if self.on_skip is not None:
+                    try:
+                        self.on_skip(text, reason)
+                    except Exception:
+                        pass
+                continue
+            self._count("dispatched")
+            try:
+                self.handler(text)
+            except Exception:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return dict(self.metrics, skip_reasons=dict(self.skip_reasons), queued=self._queue.qsize())
@@ -0,0 +1,238 @@
+import os
+import json
+import time
+import atexit
+import threading
+from pathlib import Path
+
+# Limites por backend do lado do cliente: balde de fichas de requisições/s e de caracteres/min,
+# cota mensal de caracteres para as chaves pagas (uso salvo em disco entre execuções) e pausa
+# automática quando o provedor sinaliza bloqueio (429). O registro usa isso para decidir entre
+# mandar já, esperar um pouco ou passar para outro backend.
+USAGE_PATH = Path(os.getenv("TRANSLATOR_USAGE_PATH", "translator_usage.json"))
+MAX_WAIT = float(os.getenv("TRANSLATOR_RATE_MAX_WAIT", "5"))  # espera máxima por ficha antes de desistir
+BAN_COOLDOWN = 60.0  # segundos de pausa após um 429 sem Retry-After (dobra se repetir)
+MAX_BAN_COOLDOWN = 900.0
+SAVE_INTERVAL = 5.0  # segundos entre gravações do uso
+
+# (requisições/s, caracteres/min, cota de caracteres/mês); 0 = sem limite.
+# google_web: sem chave, bloqueia rápido se abusar; Azure F0: 2M caracteres/mês (~33k/min);
+# Google Cloud: 500k caracteres/mês gratuitos.
+DEFAULT_LIMITS = {
+    "google_web": (2.0, 30000, 0),
+    "google_cloud": (10.0, 0, 500000),
+    "azure": (10.0, 33000, 2000000),
+    "libre": (5.0, 0, 0),
+}
+
+
+def _env_limits(name):
+    # TRANSLATOR_RATE_<NOME> (req/s), TRANSLATOR_CHARS_<NOME> (caracteres/min), TRANSLATOR_QUOTA_<NOME> (caracteres/mês)
+    rps, cpm, quota = DEFAULT_LIMITS.get(name, (0, 0, 0))
+    key = name.upper()
+    return (
+        float(os.getenv(f"TRANSLATOR_RATE_{key}", rps)),
+        float(os.getenv(f"TRANSLATOR_CHARS_{key}", cpm)),
+        int(os.getenv(f"TRANSLATOR_QUOTA_{key}", quota)),
+    )
+
+
+class TokenBucket:
+    # `rate` fichas por segundo, até `capacity` acumuladas. reserve() pode deixar o saldo negativo:
+    # devolve quanto esperar até a reserva valer, sem dormir (serve tanto para threads quanto asyncio)
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, n=1):
+        if self.rate <= 0:
+            return 0.0
+        with self.lock:
+            self._refill()
+            return max(0.0, (min(n, self.capacity) - self.tokens) / self.rate)
+
+    def reserve(self, n=1, max_wait=None):
+        # Pedidos maiores que a capacidade contam como a capacidade inteira (senão nunca passariam)
+        if self.rate <= 0:
+            return 0.0
+        with self.lock:
+            self._refill()
+            n = min(n, self.capacity)
+            wait = max(0.0, (n - self.tokens) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                return None
+            self.tokens -= n
+            return wait
+
+    def acquire(self, n=1):
+        wait = self.reserve(n)
+        if wait:
+            time.sleep(wait)
+
+
+class UsageStore:
+    # Caracteres e requisições por backend no mês corrente, em JSON; zera sozinho na virada do mês
+    def __init__(self, path=USAGE_PATH):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.month = time.strftime("%Y-%m")
+        self.usage = {}
+        self._dirty = False
+        self._saved = 0.0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("month") == self.month:
+                self.usage = data.get("backends", {})
+        except Exception:
+            pass
+
+    def _roll(self):
+        month = time.strftime("%Y-%m")
+        if month != self.month:
+            self.month = month
+            self.usage = {}
+
+    def get(self, name):
+        with self.lock:
+            self._roll()
+            return self.usage.get(name, {}).get("chars", 0)
+
+    def add(self, name, chars):
+        with self.lock:
+            self._roll()
+            entry = self.usage.setdefault(name, {"chars": 0, "requests": 0})
+            entry["chars"] += chars
+            entry["requests"] += 1
+            self._dirty = True
+            due = time.monotonic() - self._saved >= SAVE_INTERVAL
+        if due:
+            self.save()
+
+    def save(self):
+        with self.lock:
+            if not self._dirty:
+                return
+            payload = json.dumps({"month": self.month, "backends": self.usage}, indent=2)
+            self._dirty = False
+            self._saved = time.monotonic()
+        try:
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(payload, encoding="utf-8")
+            os.replace(tmp, self.path)
+        except Exception:
+            pass
+
+
+def is_throttle_error(error):
+    # 429 do requests/httpx ou TooManyRequests do deep-translator (só status e tipo: o texto da
+    # mensagem pode ter "429" numa porta ou num ID)
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    return status == 429 or "TooManyRequests" in type(error).__name__
+
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("Retry-After"))
+    except Exception:
+        return None
+
+
+class BackendLimiter:
+    def __init__(self, name, rps=0, chars_per_minute=0, monthly_quota=0, usage=None):
+        self.name = name
+        self.requests = TokenBucket(rps)
+        self.chars = TokenBucket(chars_per_minute / 60.0, capacity=chars_per_minute) if chars_per_minute else None
+        self.monthly_quota = monthly_quota
+        self.usage = usage
+        self.blocked_until = 0.0
+        self.cooldown = BAN_COOLDOWN
+        self.throttled = 0
+
+    def _blocked_for(self):
+        return max(0.0, self.blocked_until - time.monotonic())
+
+    def _over_quota(self, chars):
+        return bool(self.monthly_quota and self.usage is not None
+                    and self.usage.get(self.name) + chars > self.monthly_quota)
+
+    def wait_estimate(self, chars):
+        # Quanto esperar para poder enviar `chars` agora (inf = cota do mês esgotada)
+        if self._over_quota(chars):
+            return float("inf")
+        wait = max(self._blocked_for(), self.requests.wait_time(1))
+        if self.chars is not None:
+            wait = max(wait, self.chars.wait_time(chars))
+        return wait
+
+    def reserve(self, chars, max_wait=MAX_WAIT, max_char_wait=None):
+        # Segundos até poder enviar (já reservado), ou None: cota esgotada, bloqueado ou espera > max_wait.
+        # A espera do limite de caracteres/min só é vazão: por padrão não tem teto (um lote ou streaming
+        # grande espera o balde encher em vez de falhar em todos os backends)
+        if self._over_quota(chars) or self._blocked_for() > max_wait:
+            return None
+        if self.chars is not None and max_char_wait is not None and self.chars.wait_time(chars) > max_char_wait:
+            return None
+        wait = self.requests.reserve(1, max_wait)
+        if wait is None:
+            return None
+        if self.chars is not None:
+            wait = max(wait, self.chars.reserve(chars))
+        return max(wait, self._blocked_for())
+
+    def reserve_now(self, chars):
+        # Reserva só se dá para enviar já (corrida e primeira passada do failover)
+        return self.reserve(chars, 0, max_char_wait=0)
+
+    def record(self, chars):
+        self.cooldown = BAN_COOLDOWN
+        if self.usage is not None:
+            self.usage.add(self.name, chars)
+
+    def on_error(self, error):
+        # Provedor pediu para parar: pausa o backend (Retry-After ou pausa crescente) e o failover segue para outro
+        if not is_throttle_error(error):
+            return
+        self.throttled += 1
+        pause = _retry_after(error) or self.cooldown
+        self.cooldown = min(MAX_BAN_COOLDOWN, self.cooldown * 2)
+        self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+
+    def snapshot(self):
+        return {
+            "month_chars": self.usage.get(self.name) if self.usage is not None else None,
+            "monthly_quota": self.monthly_quota or None,
+            "blocked_for": round(self._blocked_for(), 1),
+            "throttled": self.throttled,
+        }
+
+
+_usage = None
+_usage_lock = threading.Lock()
+
+
+def get_usage_store():
+    global _usage
+    with _usage_lock:
+        if _usage is None:
+            _usage = UsageStore()
+            atexit.register(_usage.save)
+        return _usage
+
+
+def limiter_for(name):
+    # Limitador com os valores padrão/variáveis de ambiente; None se o backend não tem limite algum
+    rps, cpm, quota = _env_limits(name)
+    if not (rps or cpm or quota):
+        return None
+    return BackendLimiter(name, rps, cpm, quota, get_usage_store())
@@ -0,0 +1,416 @@
+import os
+import sys
+import hmac
+import json
+import time
+import subprocess
+import threading
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import translator_startup as startup
+import translator_backends as backends
+import translator_batch as batch
+import translator_memory as memory
+import translator_metrics as metrics
+from translator_cache import get_cache, make_key
+
+# Serviço local de tradução: um processo com o registro de backends, o cache e o pool de conexões,
+# exposto em HTTP só em 127.0.0.1. Launcher, popup Tk e OCR viram clientes finos e compartilham o
+# estado quente (trocar de interface não descarta nada). Pedidos idênticos em andamento são
+# coalescidos (single-flight): só o primeiro vai ao backend, os demais esperam a mesma resposta.
+SERVICE_ENABLED = os.getenv("TRANSLATOR_SERVICE", "1") != "0"
+HOST = "127.0.0.1"
+PORT = int(os.getenv("TRANSLATOR_SERVICE_PORT", "8765"))
+START_TIMEOUT = float(os.getenv("TRANSLATOR_SERVICE_START_TIMEOUT", "8"))  # segundos esperando o serviço subir
+IDLE_TIMEOUT = float(os.getenv("TRANSLATOR_SERVICE_IDLE", "1800"))  # encerra após ficar ocioso (0 = nunca)
+SERVICE_FLAG = "--service"  # no .exe (PyInstaller) o serviço é o próprio executável com esta opção
+# Segredo compartilhado com as interfaces, num arquivo ao lado das configurações: uma página web aberta no
+# navegador consegue mandar POST para 127.0.0.1, mas não sabe o token (e não passa da checagem de Host/Origin)
+TOKEN_PATH = Path(os.getenv("TRANSLATOR_SERVICE_TOKEN_PATH", "translator_service.token"))
+TOKEN_HEADER = "X-Translator-Token"
+
+_token = None
+_token_lock = threading.Lock()
+
+
+def _read_token():
+    try:
+        return TOKEN_PATH.read_text(encoding="utf-8").strip() or None
+    except OSError:
+        return None
+
+
+def _create_token():
+    import secrets
+    token = secrets.token_urlsafe(32)
+    try:
+        # O_EXCL: se o serviço e uma interface criarem ao mesmo tempo, vale o primeiro; 0o600: só o usuário lê
+        fd = os.open(TOKEN_PATH, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        for _ in range(20):
+            existing = _read_token()
+            if existing:
+                return existing
+            time.sleep(0.05)
+        return None
+    except OSError:
+        return token
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+    return token
+
+
+def service_token(reload=False):
+    # Token do arquivo, criado na primeira vez; reload=True relê (serviço novo com outro arquivo)
+    global _token
+    with _token_lock:
+        if _token is None or reload:
+            _token = _read_token() or _create_token()
+        return _token
+
+
+class SingleFlight:
+    # Uma execução por chave: chamadas concorrentes com a mesma chave recebem o mesmo resultado
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            owner = future is None
+            if owner:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+                metrics.inc("service_coalesced")
+        if not owner:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+        future.set_result(result)
+        return result
+
+
+class TranslationService:
+    def __init__(self, registry, cache=None):
+        self.registry = registry
+        self.cache = cache
+        self.flight = SingleFlight()
+        self.started = time.time()
+        self.last_request = time.monotonic()
+        self.requests = 0
+
+    def _touch(self):
+        self.last_request = time.monotonic()
+        self.requests += 1
+
+    def translate(self, text, target_lang, source_lang="auto", backend=None, use_cache=True):
+        self._touch()
+        text = (text or "").strip()
+        if not text:
+            return None
+        key = ("one", make_key(text, source_lang, target_lang, backend or "auto"), use_cache)
+        return self.flight.do(key, lambda: self._translate(text, target_lang, source_lang, backend, use_cache))
+
+    def _translate(self, text, target_lang, source_lang, backend, use_cache):
+        cache = self.cache if use_cache else None
+        return batch.translate_one(text, target_lang, self.registry, cache, source_lang, backend)
+
+    def translate_many(self, texts, target_lang, source_lang="auto", backend=None, use_cache=True):
+        self._touch()
+        cache = self.cache if use_cache else None
+        key = ("many", make_key("\x1e".join(texts), source_lang, target_lang, backend or "auto"), use_cache)
+        return self.flight.do(key, lambda: batch.translate_many(texts, target_lang, self.registry, cache,
+                                                                 source_lang, backend))
+
+    def translate_targets(self, text, target_langs, source_lang="auto", backend=None, use_cache=True):
+        self._touch()
+        cache = self.cache if use_cache else None
+        key = ("targets", make_key(text, source_lang, ",".join(target_langs), backend or "auto"), use_cache)
+        return self.flight.do(key, lambda: batch.translate_targets(text, target_langs, self.registry, cache,
+                                                                    source_lang, backend))
+
+    def health(self):
+        return {
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "coalesced": self.flight.coalesced,
+            "max_segment_chars": self.registry.max_segment_chars(),
+            "backends": self.registry.stats(),
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "memory": memory.get_memory().stats() if memory.get_memory() is not None else None,
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive com os clientes
+    # Resposta bufferizada (enviada de uma vez ao fim do pedido): cabeçalho e corpo em envios separados
+    # esbarram em Nagle + ACK atrasado no keep-alive e custavam ~40 ms por tradução
+    wbufsize = 64 * 1024
+    service = None
+    token = None
+
+    def _allowed(self, need_token=True):
+        # Host fixo (contra DNS rebinding), sem Origin (pedidos de páginas web sempre trazem) e o token
+        port = self.server.server_address[1]
+        if self.headers.get("Host") not in (f"127.0.0.1:{port}", f"localhost:{port}"):
+            return False
+        if self.headers.get("Origin") is not None:
+            return False
+        if not need_token:
+            return True
+        return bool(self.token) and hmac.compare_digest(self.headers.get(TOKEN_HEADER, ""), self.token)
+
+    def _deny(self):
+        # O corpo não é lido: a conexão não pode ser reaproveitada
+        self.close_connection = True
+        self._reply(403, {"error": "acesso negado"})
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _reply_text(self, status, text):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        # Leitura sem token (is_running, Prometheus), mas só de clientes locais
+        if not self._allowed(need_token=False):
+            self._deny()
+        elif self.path == "/health":
+            self._reply(200, self.service.health())
+        elif self.path == "/metrics":
+            # Para o Prometheus (ou curl); /metrics.json traz o mesmo em JSON
+            self._reply_text(200, metrics.to_prometheus(metrics.get_metrics().snapshot()))
+        elif self.path == "/metrics.json":
+            self._reply(200, metrics.get_metrics().snapshot())
+        else:
+            self._reply(404, {"error": "não encontrado"})
+
+    def do_POST(self):
+        if not self._allowed():
+            self._deny()
+            return
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+            req = json.loads(self.rfile.read(length) or b"{}")
+            options = dict(
+                source_lang=req.get("source", "auto"),
+                backend=req.get("backend"),
+                use_cache=req.get("use_cache", True),
+            )
+            if self.path == "/translate":
+                with metrics.timer("service_request", path=self.path):
+                    result = self.service.translate(req.get("text", ""), req["target"], **options)
+                self._reply(200, {"result": result})
+            elif self.path == "/translate_many":
+                with metrics.timer("service_request", path=self.path):
+                    results = self.service.translate_many(req.get("texts", []), req["target"], **options)
+                self._reply(200, {"results": results})
+            elif self.path == "/translate_targets":
+                with metrics.timer("service_request", path=self.path):
+                    results = self.service.translate_targets(req.get("text", ""), req.get("targets", []), **options)
+                self._reply(200, {"results": results})
+            else:
+                self._reply(404, {"error": "não encontrado"})
+        except Exception as e:
+            self._reply(500, {"error": str(e)})
+
+
+def serve(host=HOST, port=PORT, idle_timeout=IDLE_TIMEOUT, config=None):
+    # Configuração dos provedores vem do núcleo (importado aqui: translator_core usa este módulo como cliente)
+    from translator_core import Config
+    registry = (config or Config.from_env()).build_registry()
+    service = TranslationService(registry, get_cache())
+    handler = type("Handler", (_Handler,), {"service": service, "token": service_token()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    # Porta já aberta (os clientes conectam); conexões com os provedores, cache e modelos aquecem em paralelo
+    # (sem relatório de abertura: o arquivo de TRANSLATOR_STARTUP_PROFILE é da interface que o iniciou)
+    startup.warm_up(startup.translation_steps(lambda: registry, get_local_cache=get_cache), report_when_done=False)
+    if idle_timeout > 0:
+        def watch_idle():
+            while time.monotonic() - service.last_request < idle_timeout:
+                time.sleep(min(60.0, idle_timeout))
+            server.shutdown()
+        threading.Thread(target=watch_idle, daemon=True).start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        backends.close_sessions()
+        cache = get_cache()
+        if cache is not None:
+            cache.close()
+
+
+# --- cliente ----------------------------------------------------------------
+
+def service_url(port=PORT):
+    return f"http://{HOST}:{port}"
+
+
+def is_running(url=None, timeout=0.5):
+    import requests  # clientes importam este módulo na abertura; requests só quando for usado
+    try:
+        return requests.get((url or service_url()) + "/health", timeout=timeout).ok
+    except requests.RequestException:
+        return False
+
+
+def fetch_metrics(url=None, timeout=1.0):
+    # Snapshot das métricas do serviço (onde ficam backends, cache e memória quando as UIs são clientes)
+    import requests
+    try:
+        r = requests.get((url or service_url()) + "/metrics.json", timeout=timeout)
+        return r.json() if r.ok else None
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def service_command():
+    if getattr(sys, "frozen", False):
+        return [sys.executable, SERVICE_FLAG]
+    return [sys.executable, str(Path(__file__).resolve())]
+
+
+def start_service():
+    kwargs = dict(stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if sys.platform == "win32":
+        kwargs["creationflags"] = 0x00000008  # DETACHED_PROCESS
+    else:
+        kwargs["start_new_session"] = True
+    subprocess.Popen(service_command(), **kwargs)
+
+
+_connect_lock = threading.Lock()
+
+
+def connect(timeout=START_TIMEOUT):
+    # URL do serviço, iniciando-o se ainda não estiver rodando; None se desligado ou se não subir a tempo
+    if not SERVICE_ENABLED:
+        return None
+    url = service_url()
+    with _connect_lock:
+        if is_running(url):
+            return url
+        try:
+            start_service()
+        except Exception:
+            return None
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if is_running(url):
+                return url
+            time.sleep(0.1)
+    return None
+
+
+class RemoteBackend(backends.Backend):
+    # Backend que delega ao serviço local; cache, idioma e failover acontecem lá
+    name = "service"
+    max_items = 100
+    multi_target = True  # o serviço decide entre uma requisição (Azure) ou uma por destino
+
+    def __init__(self, url):
+        self.url = url
+        self.max_chars = 5000
+        try:
+            # Pela sessão do backend: a conexão aberta aqui já fica no pool para a primeira tradução
+            self.max_chars = backends.get_session(self.name).get(url + "/health", timeout=2).json()["max_segment_chars"]
+        except Exception:
+            pass
+
+    def _post(self, path, payload):
+        import requests
+        session = backends.get_session(self.name)
+        # O serviço pode tentar vários backends: espera mais que o timeout de um só
+        timeout = backends.TIMEOUT * 3
+
+        def post(token):
+            return session.post(self.url + path, json=payload, headers={TOKEN_HEADER: token or ""}, timeout=timeout)
+
+        try:
+            r = post(service_token())
+        except requests.ConnectionError:
+            # Serviço encerrado (ocioso ou fechado): sobe de novo e repete uma vez
+            if connect() is None:
+                raise
+            r = post(service_token())
+        if r.status_code == 403:
+            # Arquivo do token recriado desde a última leitura
+            r = post(service_token(reload=True))
+        data = r.json()
+        if not r.ok:
+            raise RuntimeError(data.get("error") or f"serviço respondeu {r.status_code}")
+        return data
+
+    def translate(self, text, target_lang, source_lang="auto"):
+        result = self._post("/translate", {"text": text, "target": target_lang, "source": source_lang})["result"]
+        return tuple(result) if result else (text, "")
+
+    def translate_batch(self, texts, target_lang, source_lang="auto"):
+        results = self._post("/translate_many", {"texts": texts, "target": target_lang, "source": source_lang})
+        return [tuple(r) if r else (t, "") for t, r in zip(texts, results["results"])]
+
+    def translate_targets(self, text, target_langs, source_lang="auto"):
+        results = self._post("/translate_targets", {"text": text, "targets": list(target_langs),
+                                                    "source": source_lang})["results"]
+        if any(not results.get(target) for target in target_langs):
+            raise RuntimeError("serviço não traduziu todos os idiomas de destino")
+        src = next((results[target][1] for target in target_langs if results[target][1]), "")
+        return {target: results[target][0] for target in target_langs}, src
+
+
+def client_registry():
+    # Registro só com o serviço (modo failover: quem decide corrida/failover entre provedores é o serviço).
+    # None quando o serviço está desligado ou não subiu: o chamador usa os backends no próprio processo.
+    url = connect()
+    if url is None:
+        return None
+    registry = backends.BackendRegistry(mode="failover")
+    registry.register(RemoteBackend(url))
+    return registry
+
+
+def uses_service(registry):
+    return registry.get(RemoteBackend.name) is not None
+
+
+def main():
+    try:
+        serve()
+    except OSError:
+        # Porta ocupada: outro serviço já está rodando
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    # Necessário no .exe (PyInstaller) para o worker do Argos em processo separado
+    multiprocessing.freeze_support()
+    sys.exit(main())
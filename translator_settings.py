@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import atexit
+import threading
+from pathlib import Path
+
+# Configurações do launcher: o estado fica em memória (ler e mudar não tocam o disco) e uma thread
+# regrava o JSON FLUSH_DELAY depois da última mudança. Arrastar o slider de fonte vira uma gravação
+# só; numa sequência longa de mudanças grava ao menos a cada MAX_DELAY. A gravação é atômica
+# (arquivo .tmp + os.replace): quem lê vê o arquivo antigo ou o novo, nunca pela metade.
+FLUSH_DELAY = 0.3  # segundos sem mudanças antes de gravar
+MAX_DELAY = 2.0  # segundos que uma mudança pode esperar durante uma rajada contínua
+RETRY_DELAY = 1.0  # segundos entre tentativas quando a gravação falha (ex.: arquivo preso no Windows)
+
+
+def atomic_write_json(path, data):
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class SettingsStore:
+    def __init__(self, path, defaults=None, delay=FLUSH_DELAY, max_delay=MAX_DELAY):
+        self.path = Path(path)
+        self.delay = delay
+        self.max_delay = max_delay
+        self._data = dict(defaults or {})
+        self._data.update(self._read())
+        # Uma condição protege o estado e acorda o gravador; a gravação em si tem lock próprio
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._version = 0  # muda a cada alteração em memória
+        self._saved = 0  # última versão gravada
+        self._first_change = None
+        self._last_change = 0.0
+        self._closed = False
+        self._writer = None
+        self.writes = 0
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def get(self, key, default=None):
+        with self._cond:
+            return self._data.get(key, default)
+
+    def __getitem__(self, key):
+        with self._cond:
+            return self._data[key]
+
+    def __setitem__(self, key, value):
+        self.update({key: value})
+
+    def __contains__(self, key):
+        with self._cond:
+            return key in self._data
+
+    def snapshot(self):
+        with self._cond:
+            return dict(self._data)
+
+    def update(self, values):
+        with self._cond:
+            changed = {k: v for k, v in values.items() if k not in self._data or self._data[k] != v}
+            if not changed:
+                # O slider repete o mesmo valor várias vezes: nada a gravar
+                return
+            self._data.update(changed)
+            self._changed()
+
+    def toggle(self, key):
+        # Inverte um booleano e devolve o novo valor; atômico entre a thread da bandeja e a da UI
+        with self._cond:
+            value = not self._data.get(key, False)
+            self._data[key] = value
+            self._changed()
+            return value
+
+    def _changed(self):
+        # Chamado com self._cond adquirido
+        now = time.monotonic()
+        self._version += 1
+        self._last_change = now
+        if self._first_change is None:
+            self._first_change = now
+        if self._writer is None and not self._closed:
+            self._writer = threading.Thread(target=self._write_loop, name="settings-writer", daemon=True)
+            self._writer.start()
+        self._cond.notify_all()
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                while self._version == self._saved and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                # Espera a rajada acabar (delay sem mudanças), limitado a max_delay desde a primeira
+                while not self._closed:
+                    now = time.monotonic()
+                    due = min(self._last_change + self.delay, (self._first_change or now) + self.max_delay)
+                    if now >= due:
+                        break
+                    self._cond.wait(due - now)
+                if self._closed:
+                    return
+            if not self._write_pending():
+                time.sleep(RETRY_DELAY)
+
+    def _write_pending(self):
+        # Grava a versão atual se ainda não foi gravada; True se o arquivo está em dia
+        with self._write_lock:
+            with self._cond:
+                if self._version == self._saved:
+                    return True
+                version = self._version
+                data = dict(self._data)
+                self._first_change = None
+            try:
+                atomic_write_json(self.path, data)
+            except Exception:
+                with self._cond:
+                    if self._first_change is None:
+                        self._first_change = time.monotonic()
+                return False
+            with self._cond:
+                self._saved = max(self._saved, version)
+                self.writes += 1
+            return True
+
+    def flush(self):
+        # Grava agora o que estiver pendente (na thread de quem chama)
+        return self._write_pending()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            writer = self._writer
+        if writer is not None:
+            writer.join(timeout=2.0)
+        self.flush()
+
+
+def open_settings(path, defaults=None):
+    # Carrega o arquivo e garante a última gravação ao sair do processo
+    store = SettingsStore(path, defaults)
+    atexit.register(store.close)
+    return store
@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+import time
+import threading
+
+# Abertura rápida: as interfaces mostram a janela primeiro e deixam o que é pesado (conexão com o
+# serviço, motor, cache, workers do OCR, modelos) para uma fase de aquecimento em segundo plano.
+# Este módulo deve ser o primeiro importado pelo script de entrada: marca o início, registra os
+# marcos ("janela", cada etapa do aquecimento) e, com TRANSLATOR_STARTUP_PROFILE, mede o tempo de
+# importação de cada módulo (como `python -X importtime`, mas funciona também no .exe do PyInstaller).
+#   TRANSLATOR_STARTUP_PROFILE=1             relatório no stderr
+#   TRANSLATOR_STARTUP_PROFILE=perfil.json   relatório em arquivo (útil no .exe sem console)
+STARTED = time.perf_counter()
+PROFILE = os.getenv("TRANSLATOR_STARTUP_PROFILE", "")
+TOP_IMPORTS = 25
+
+_marks = []
+_imports = {}  # módulo -> [ms acumulado (com sub-importações), ms próprio, na thread principal?]
+_local = threading.local()  # pilha de importações em andamento, por thread
+_lock = threading.Lock()
+
+
+def elapsed_ms():
+    return (time.perf_counter() - STARTED) * 1000
+
+
+def mark(label):
+    with _lock:
+        _marks.append((label, round(elapsed_ms(), 1), threading.current_thread().name))
+
+
+class _TimedLoader:
+    # Envolve o loader original e mede exec_module; o tempo próprio desconta as importações aninhadas
+    def __init__(self, loader, name):
+        self.loader = loader
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(self.loader, attr)
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        stack = _local.__dict__.setdefault("stack", [])
+        start = time.perf_counter()
+        stack.append(0.0)
+        try:
+            self.loader.exec_module(module)
+        finally:
+            total = (time.perf_counter() - start) * 1000
+            nested = stack.pop()
+            if stack:
+                stack[-1] += total
+            main_thread = threading.current_thread() is threading.main_thread()
+            with _lock:
+                _imports[self.name] = [round(total, 2), round(total - nested, 2), main_thread]
+
+
+class _TimingFinder:
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, name)
+                return spec
+        return None
+
+
+def enable_import_profile():
+    if PROFILE and not any(isinstance(f, _TimingFinder) for f in sys.meta_path):
+        sys.meta_path.insert(0, _TimingFinder())
+
+
+def warm_up(steps, on_done=None, report_when_done=True):
+    # steps: [(nome, função)], em sequência numa thread daemon; falhas são ignoradas (a etapa
+    # acontece de novo sob demanda no primeiro uso). Cada etapa vira um marco "warm:<nome>".
+    # Também aceita uma função que devolve a lista, chamada já na thread (importa o núcleo fora da UI).
+    def run():
+        try:
+            todo = steps() if callable(steps) else steps
+        except Exception:
+            todo = []
+        mark("warm:início")
+        for name, fn in todo:
+            try:
+                fn()
+            except Exception:
+                pass
+            mark(f"warm:{name}")
+        if on_done is not None:
+            try:
+                on_done()
+            except Exception:
+                pass
+        if PROFILE and report_when_done:
+            write_report()
+
+    thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def translation_steps(get_registry, get_engine=None, get_local_cache=None):
+    # Etapas comuns às interfaces (e ao serviço), na ordem em que a primeira tradução precisa delas.
+    # Os módulos de tradução são importados aqui dentro, já na thread de aquecimento.
+    def cache():
+        local = get_local_cache() if get_local_cache is not None else None
+        if local is not None:
+            local.warm()
+
+    def memory():
+        import translator_memory
+        tm = translator_memory.get_memory()
+        if tm is not None:
+            tm.warm()
+
+    def langid():
+        import translator_langid
+        translator_langid.warm()
+
+    steps = [("registro", get_registry)]
+    if get_engine is not None:
+        steps.append(("motor", get_engine))
+    steps += [
+        ("cache", cache),
+        ("conexões", lambda: get_registry().preconnect()),
+        ("memória", memory),
+        ("idiomas", langid),
+    ]
+    return steps
+
+
+def report():
+    with _lock:
+        imports = sorted(_imports.items(), key=lambda item: item[1][0], reverse=True)
+        marks = list(_marks)
+    # Soma dos tempos próprios na thread principal: quanto as importações atrasaram a janela
+    blocking = sum(own for _, (_, own, main) in imports if main)
+    return {
+        "marks": [{"label": label, "ms": ms, "thread": thread} for label, ms, thread in marks],
+        "imports_main_thread_ms": round(blocking, 1),
+        "imports": [{"module": name, "cumulative_ms": total, "self_ms": own, "main_thread": main}
+                    for name, (total, own, main) in imports[:TOP_IMPORTS]],
+        "modules_loaded": len(sys.modules),
+    }
+
+
+def format_report(data):
+    lines = ["Abertura (ms desde o início do processo):"]
+    lines += [f"  {m['ms']:>9.1f}  {m['label']}" for m in data["marks"]]
+    if data["imports"]:
+        lines.append(f"Importações na thread principal: {data['imports_main_thread_ms']:.1f} ms; mais lentas:")
+        lines += [f"  {i['cumulative_ms']:>9.1f}  {i['self_ms']:>8.1f}  {i['module']}{'' if i['main_thread'] else ' (2º plano)'}"
+                  for i in data["imports"]]
+    return "\n".join(lines)
+
+
+def write_report():
+    data = report()
+    try:
+        if PROFILE == "1":
+            print(format_report(data), file=sys.stderr)
+        else:
+            with open(PROFILE, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+    except Exception:
+        pass
+
+
+enable_import_profile()
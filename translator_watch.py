@@ -0,0 +1,123 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from translator_capture import grab, to_gray, prepare
+from translator_ocr import get_ocr_engine
+
+# Modo "observar região" (legendas, diálogos de jogos, chats): recaptura a região num intervalo,
+# compara os quadros por médias de blocos (barato), faz OCR só das faixas que mudaram e manda
+# para tradução apenas as linhas novas. As traduções passam pelo cache como qualquer outra.
+WATCH_INTERVAL = float(os.getenv("WATCH_INTERVAL", "0.5"))  # segundos entre capturas
+TILE = 16  # lado do bloco, em pixels, para detectar mudanças
+TILE_THRESHOLD = 6.0  # diferença média de cinza (0-255) que conta como mudança
+SEEN_LINES = 500  # quantas linhas recentes lembrar para não traduzir de novo
+
+
+def tile_means(gray, tile=TILE):
+    # Média de cada bloco tile x tile com somas vetorizadas (reduceat), sem laços em Python
+    height, width = gray.shape
+    rows = np.arange(0, height, tile)
+    cols = np.arange(0, width, tile)
+    sums = np.add.reduceat(np.add.reduceat(gray.astype(np.uint32), rows, axis=0), cols, axis=1)
+    row_counts = np.diff(np.append(rows, height))
+    col_counts = np.diff(np.append(cols, width))
+    return sums / np.outer(row_counts, col_counts)
+
+
+def changed_bands(previous, current, threshold=TILE_THRESHOLD):
+    # Faixas horizontais (linhas de blocos) alteradas, agrupadas em intervalos contíguos [ini, fim)
+    if previous is None or previous.shape != current.shape:
+        return [(0, current.shape[0])]
+    changed = np.abs(current - previous).max(axis=1) > threshold
+    bands = []
+    start = None
+    for i, flag in enumerate(changed):
+        if flag and start is None:
+            start = i
+        elif not flag and start is not None:
+            bands.append((start, i))
+            start = None
+    if start is not None:
+        bands.append((start, len(changed)))
+    return bands
+
+
+class RegionWatcher(threading.Thread):
+    def __init__(self, bbox, translate_many, target_lang, on_lines, on_error=None, interval=WATCH_INTERVAL):
+        # translate_many(textos, destino) -> [(tradução, origem)]; on_lines([(linha, tradução), ...])
+        super().__init__(daemon=True)
+        self.bbox = bbox
+        self.translate_many = translate_many
+        self.target_lang = target_lang
+        self.on_lines = on_lines
+        self.on_error = on_error
+        self.interval = interval
+        self._previous = None
+        self._band_texts = []  # [(faixa_ini, faixa_fim, texto)] na ordem vertical
+        self._seen = OrderedDict()
+        self._stop_event = threading.Event()
+        self.frames = 0
+        self.ocr_runs = 0
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _ocr_bands(self, gray, bands):
+        ocr = get_ocr_engine()
+        height = gray.shape[0]
+        for start, end in bands:
+            # Uma faixa de margem para não cortar letras na borda do bloco
+            top = max(0, (start - 1) * TILE)
+            bottom = min(height, (end + 1) * TILE)
+            image, _ = prepare(gray[top:bottom])
+            text = ocr.image_to_string(image)
+            self.ocr_runs += 1
+            kept = [b for b in self._band_texts if b[1] <= start - 1 or b[0] >= end + 1]
+            kept.append((start - 1, end + 1, text))
+            self._band_texts = sorted(kept)
+
+    def _new_lines(self):
+        lines = []
+        for _, _, text in self._band_texts:
+            lines.extend(line.strip() for line in text.splitlines() if line.strip())
+        fresh = []
+        for line in lines:
+            if line in self._seen:
+                self._seen.move_to_end(line)
+                continue
+            self._seen[line] = True
+            fresh.append(line)
+        while len(self._seen) > SEEN_LINES:
+            self._seen.popitem(last=False)
+        return fresh
+
+    def step(self):
+        self.frames += 1
+        gray = to_gray(grab(self.bbox))
+        means = tile_means(gray)
+        bands = changed_bands(self._previous, means)
+        self._previous = means
+        if not bands:
+            return []
+        self._ocr_bands(gray, bands)
+        fresh = self._new_lines()
+        if not fresh:
+            return []
+        results = self.translate_many(fresh, self.target_lang())
+        return [(line, result[0] if result else "") for line, result in zip(fresh, results)]
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                pairs = self.step()
+                if pairs:
+                    self.on_lines(pairs)
+            except Exception as e:
+                # Erro de captura/OCR tende a se repetir a cada quadro: encerra a observação
+                if self.on_error is not None:
+                    self.on_error(e)
+                return
+            self._stop_event.wait(self.interval)